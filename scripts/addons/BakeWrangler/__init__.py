@@ -62,6 +62,7 @@ class BakeWrangler_Preferences(bpy.types.AddonPreferences):
     def_margin: bpy.props.IntProperty(name="Default Margin", description="The margin that new Mesh nodes will use when created", default=0, min=0, subtype='PIXEL')
     def_mask_margin: bpy.props.IntProperty(name="Default Mask Margin", description="The mask margin that new Mesh nodes will use when created", default=0, min=0, subtype='PIXEL')    
     ignore_vis: bpy.props.BoolProperty(name="Objects Always Visible", description="Enable to ignore the visibility of selected objects when baking, making them visible regardless of settings in blender", default=False)
+    bake_workers: bpy.props.IntProperty(name="Parallel Bake Processes", description="Maximum number of background Blender processes used to bake independent outputs at the same time", default=1, min=1, soft_max=32)
     
     # Ouput prefs
     def_format: bpy.props.EnumProperty(name="Default Output Format", description="The format new Output nodes will use when created", items=nodes.node_tree.BakeWrangler_Output_Image_Path.img_format, default='PNG')
@@ -71,6 +72,7 @@ class BakeWrangler_Preferences(bpy.types.AddonPreferences):
     def_outname: bpy.props.StringProperty(name="Default Output Name", description="The name new Output nodes will use when created", default="Image", subtype='FILE_NAME')
     make_dirs: bpy.props.BoolProperty(name="Create Paths", description="If selected path doesn't exist, try to create it", default=False)
     save_pass: bpy.props.BoolProperty(name="Save each Pass", description="Save output image after each bake pass, instead of after all contributing passes", default=False)
+    bake_cache: bpy.props.BoolProperty(name="Reuse Unchanged Passes", description="Keep baked passes in a cache folder beside the outputs and only bake passes whose objects, materials or settings changed", default=True)
     
     # Dev prefs
     debug: bpy.props.BoolProperty(name="Debug", description="Enable additional debugging output", default=False)
@@ -121,6 +123,7 @@ class BakeWrangler_Preferences(bpy.types.AddonPreferences):
         col.prop(self, "def_mask_margin", text="Mask Margin")
         col.prop(self, "def_raydist", text="Ray Distance")
         col.prop(self, "ignore_vis")
+        col.prop(self, "bake_workers")
         
         # Output prefs
         colout = layout.column(align=False)
@@ -136,6 +139,7 @@ class BakeWrangler_Preferences(bpy.types.AddonPreferences):
         col2.prop(self, "def_outname", text="Name")
         col.prop(self, "make_dirs")
         col.prop(self, "save_pass")
+        col.prop(self, "bake_cache")
         
         # Dev prefs
         layout.prop(self, "debug")
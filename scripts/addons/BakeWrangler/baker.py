@@ -1,9 +1,13 @@
 import os.path
 import bpy
+import json
+import numpy
+import hashlib
 from datetime import datetime
 try:
     from BakeWrangler.nodes import node_tree
     from BakeWrangler.nodes.node_tree import _print
+    from BakeWrangler.nodes.node_tree import _send
     from BakeWrangler.nodes.node_tree import material_recursor
     from BakeWrangler.nodes.node_tree import follow_input_link
     from BakeWrangler.nodes.node_tree import gather_output_links
@@ -12,6 +16,7 @@ except:
     sys.path.append(os.path.dirname(os.path.abspath(__file__)))
     from nodes import node_tree
     from nodes.node_tree import _print
+    from nodes.node_tree import _send
     from nodes.node_tree import material_recursor
     from nodes.node_tree import follow_input_link
     from nodes.node_tree import gather_output_links
@@ -29,7 +34,7 @@ class bake_solution():
 
 
 # Process the node tree with the given node as the starting point
-def process_tree(tree_name, node_name):
+def process_tree(tree_name, node_name, outputs=None):
     # Create a base scene to work from that has every object in it
     global base_scene
     global mesh_scene
@@ -82,10 +87,21 @@ def process_tree(tree_name, node_name):
                 if input.islinked() and input.valid:
                     bakes[bake].inputs[input.name] = [follow_input_link(input.links[0]).from_socket.name, follow_input_link(input.links[0]).from_node]
                 
+    # Only create the requested outputs when this process is one job of a parallel bake
+    if outputs is not None:
+        for bake in list(bakes.keys()):
+            if bake not in outputs:
+                del bakes[bake]
+    
     # Perform passes needed for each output group
     _print("> Processing [%s]: Creating %i images" % (node.get_name(), len(bakes.keys())), tag=True)
     _print(">", tag=True)
     error = 0
+    passes_done = 0
+    passes_total = 0
+    for bake in bakes.keys():
+        passes_total += len(set(data[1].name for data in bakes[bake].inputs.values()))
+    _send("progress", done=passes_done, total=passes_total)
     for bake in bakes.keys():
         solution = bakes[bake]
         node = solution.node
@@ -96,12 +112,29 @@ def process_tree(tree_name, node_name):
             data = solution.inputs[chan]
             if data[1].name not in solution.passed.keys():
                 _print(">  Pass: [%s] " % (data[1].get_name()), tag=True, wrap=False)
-                err, img_bake, img_mask = process_bake_pass_input(data[1], output_format)
+                start = datetime.now()
+                cache_dir = os.path.join(os.path.realpath(node.img_path), ".bakewrangler")
+                fingerprint = None
+                cached = None
+                if usecache:
+                    fingerprint = pass_fingerprint(data[1], output_format)
+                    cached = load_cached_pass(cache_dir, data[1], output_format, fingerprint)
+                if cached:
+                    _print(" [Unchanged, using cached bake]", tag=True)
+                    err = False
+                    img_bake, img_mask = cached
+                else:
+                    err, img_bake, img_mask = process_bake_pass_input(data[1], output_format)
+                    if usecache and not err:
+                        store_cached_pass(cache_dir, data[1], fingerprint, img_bake, img_mask)
                 # Don't process a bake that returned an error
                 if not err:
                     solution.passed[data[1].name] = [img_bake, img_mask]
                 else:
                     solution.passed[data[1].name] = [None, None]
+                passes_done += 1
+                _send("pass", output=node.name, name=data[1].get_name(), seconds=(datetime.now() - start).total_seconds(), error=bool(err))
+                _send("progress", done=passes_done, total=passes_total)
             if savepass:
                 # Save output after each pass
                 imgs = solution.passed[data[1].name]
@@ -199,19 +232,7 @@ def process_bake_pass_input(node, format):
     _print(" [Mesh Nodes (%i)]" % (len(bake_mesh)), tag=True)
     
     # Generate the bake and mask images
-    img_bake = bpy.data.images.new(node.get_name(), width=bake_settings["x_res"], height=bake_settings["y_res"])
-    img_bake.alpha_mode = 'NONE'
-    if format["img_use_float"]:
-        img_bake.use_generated_float = True
-    img_bake.colorspace_settings.name = format['img_color_space']
-    if bake_type in ['NORMAL', 'CURVATURE'] or (bake_type == 'MULTIRES' and bake_settings["multi_pass"] == 'NORMALS'):
-        img_bake.generated_color = (0.5, 0.5, 1.0, 1.0)
-    
-    if use_mask:
-        img_mask = bpy.data.images.new("mask_" + node.get_name(), width=bake_settings["x_res"], height=bake_settings["y_res"])
-        img_mask.alpha_mode = 'NONE'
-        img_mask.colorspace_settings.name = 'Non-Color'
-        img_mask.colorspace_settings.is_data = True
+    img_bake, img_mask = create_pass_images(node, format)
     
     # Begin processing bake meshes
     for mesh in bake_mesh:
@@ -371,6 +392,26 @@ def process_bake_pass_input(node, format):
 
 
 
+# Create the images a bake pass node bakes into
+def create_pass_images(node, format):
+    img_bake = bpy.data.images.new(node.get_name(), width=node.bake_xres, height=node.bake_yres)
+    img_bake.alpha_mode = 'NONE'
+    if format["img_use_float"]:
+        img_bake.use_generated_float = True
+    img_bake.colorspace_settings.name = format['img_color_space']
+    if node.bake_pass in ['NORMAL', 'CURVATURE'] or (node.bake_pass == 'MULTIRES' and node.multi_pass == 'NORMALS'):
+        img_bake.generated_color = (0.5, 0.5, 1.0, 1.0)
+    
+    img_mask = None
+    if node.use_mask:
+        img_mask = bpy.data.images.new("mask_" + node.get_name(), width=node.bake_xres, height=node.bake_yres)
+        img_mask.alpha_mode = 'NONE'
+        img_mask.colorspace_settings.name = 'Non-Color'
+        img_mask.colorspace_settings.is_data = True
+    return [img_bake, img_mask]
+
+
+
 # Takes an output node along with a bake and optional mask which are composited and saved
 def process_bake_pass_output(node, bake, mask, format, in_chan, out_chan):
     err = False
@@ -505,9 +546,9 @@ def process_bake_pass_output(node, bake, mask, format, in_chan, out_chan):
         # Just copy pixels
         if len(mux_image.pixels) == len(bake.pixels):
             if out_chan == "Color":
-                mux_image.pixels = bake.pixels[:]
+                copy_pixels(bake, mux_image)
             elif orig_exists:
-                mux_image.pixels = orig_image.pixels[:]
+                copy_pixels(orig_image, mux_image)
             mux_image.update()
         else:
             _print(">   -Copying pixels to output: Input/Output pixel count mismatch", tag=True)
@@ -680,7 +721,7 @@ def process_solution(solution, format, channel=None):
     else:
         # Just copy pixels
         if orig_exists and len(mux_image.pixels) == len(orig_image.pixels):
-            mux_image.pixels = orig_image.pixels[:]
+            copy_pixels(orig_image, mux_image)
             mux_image.update()
         else:
             _print(">  -Copying pixels to output: Input/Output pixel count mismatch", tag=True)
@@ -961,20 +1002,20 @@ def bake_post(img_bake, bake_type, settings, format):
 # Create correct alpha channel values in output image
 def alpha_pass(in_chan, out_chan, bake, mask, orig, mux):
     stride = 4
-    out_px = list(mux.pixels)
+    out_px = get_pixels(mux)
     orig_px = None
     mask_px = None
     src_chan = 3
 
     # If the output channel isn't Alpha, then just copy the original alpha values to the mux
     if out_chan != "A":
-        in_px = orig.pixels[:]
+        in_px = get_pixels(orig)
     # Otherwise copy the input channel values from bake to mux (respecting mask if in play)
     else:
-        in_px = bake.pixels[:]
+        in_px = get_pixels(bake)
         if mask:
-            orig_px = orig.pixels[:]
-            mask_px = mask.pixels[:]
+            orig_px = get_pixels(orig)
+            mask_px = get_pixels(mask)
         if in_chan in ["Color", "Value"]:
             src_chan = -1
         elif in_chan == "R":
@@ -985,30 +1026,261 @@ def alpha_pass(in_chan, out_chan, bake, mask, orig, mux):
             src_chan = 2
             
     # Sanity check
-    if len(in_px) != len(out_px) or (mask and (len(orig_px) != len(in_px) or len(mask_px) != len(in_px))):
+    if len(in_px) != len(out_px) or (mask_px is not None and (len(orig_px) != len(in_px) or len(mask_px) != len(in_px))):
         _print("Input/Output pixel count mismatch", tag=True)
         return True
     
-    # Write channel
-    for pixel in range(int(len(out_px)/stride)):
-        position = pixel * stride
-        alpha_ch = position + 3
-        srce_pos = position + src_chan
-        if mask_px == None or mask_px[position]:
-            if src_chan != -1:
-                out_px[alpha_ch] = in_px[srce_pos]
-            else:
-                out_px[alpha_ch] = pixel_value(in_px[position:position+3])
-        else:
-            out_px[alpha_ch] = orig_px[alpha_ch]
+    # Write channel, operating on whole columns of the (pixel, channel) views
+    out_view = out_px.reshape(-1, stride)
+    in_view = in_px.reshape(-1, stride)
+    if src_chan != -1:
+        alpha = in_view[:, src_chan]
+    else:
+        alpha = in_view[:, :3].max(axis=1).clip(min=0)
+    if mask_px is not None:
+        masked = mask_px.reshape(-1, stride)[:, 0] != 0
+        alpha = numpy.where(masked, alpha, orig_px.reshape(-1, stride)[:, 3])
+    out_view[:, 3] = alpha
     
     # Copy the changes back into the mux
-    mux.pixels = out_px[:]
+    mux.pixels.foreach_set(out_px)
     mux.update()
     return False
 
 
 
+# Read all pixel values of an image into a flat float32 array
+def get_pixels(image):
+    pixels = numpy.empty(len(image.pixels), dtype=numpy.float32)
+    image.pixels.foreach_get(pixels)
+    return pixels
+
+
+
+# Copy pixel values between images of the same size without going through python lists
+def copy_pixels(source, target):
+    target.pixels.foreach_set(get_pixels(source))
+
+
+
+# Fingerprint of everything that goes into a bake pass: pass settings, meshes, evaluated geometry, materials
+# and the format of the generated images. Passes with an unchanged fingerprint don't need to be baked again.
+def pass_fingerprint(node, format):
+    sha = hashlib.sha1()
+    depsgraph = bpy.context.evaluated_depsgraph_get()
+    sha.update(("frame=%i;" % (base_scene.frame_current)).encode())
+    sha.update(("float=%r;space=%r;" % (format["img_use_float"], format["img_color_space"])).encode())
+    hash_properties(sha, node, node_skip_props)
+    if node.use_world:
+        world = node.the_world if node.the_world else active_scene.world
+        if world:
+            hash_id(sha, world, depsgraph)
+    if node.cpy_render:
+        hash_id(sha, node.cpy_from if node.cpy_from else active_scene, depsgraph)
+    
+    for input in node.inputs:
+        if input.islinked() and input.valid:
+            mesh = follow_input_link(input.links[0]).from_node
+            sha.update(("mesh=%s;" % (mesh.name)).encode())
+            hash_properties(sha, mesh, node_skip_props)
+            for set in ['TARGET', 'SOURCE', 'SCENE']:
+                sha.update(set.encode())
+                for entry in mesh.get_objects(set):
+                    for item in entry:
+                        if isinstance(item, bpy.types.ID):
+                            hash_id(sha, item, depsgraph)
+                        else:
+                            sha.update(repr(item).encode())
+    return sha.hexdigest()
+
+
+
+# Node properties that don't change the result of a bake
+node_skip_props = {'rna_type', 'location', 'width', 'width_hidden', 'height', 'dimensions', 'select', 'show_options',
+                   'show_preview', 'show_texture', 'label', 'color', 'use_custom_color', 'parent', 'adv_settings', 'internal_links'}
+
+
+
+# Add the values of all properties of a struct to the hash, pointers to data blocks only add their name
+def hash_properties(sha, struct, skip):
+    for prop in struct.bl_rna.properties:
+        if prop.identifier in skip or prop.type == 'COLLECTION':
+            continue
+        try:
+            value = getattr(struct, prop.identifier)
+        except:
+            continue
+        if prop.type == 'POINTER':
+            value = value.name if isinstance(value, bpy.types.ID) else None
+        elif getattr(prop, "is_array", False):
+            value = [tuple(item) if hasattr(item, "__len__") else item for item in value]
+        sha.update(("%s=%r;" % (prop.identifier, value)).encode())
+
+
+
+# Add a data block to the hash, including evaluated geometry, materials and images it uses
+def hash_id(sha, id, depsgraph, visited=None):
+    if visited is None:
+        visited = set()
+    if id.as_pointer() in visited:
+        return
+    visited.add(id.as_pointer())
+    sha.update(("%s:%s;" % (type(id).__name__, id.name)).encode())
+    
+    if isinstance(id, bpy.types.Object):
+        sha.update(numpy.array(id.matrix_world, dtype=numpy.float32).tobytes())
+        if id.data:
+            hash_properties(sha, id.data, {'rna_type'})
+        if id.type in ['MESH', 'CURVE', 'SURFACE', 'META', 'FONT']:
+            evaluated = id.evaluated_get(depsgraph)
+            mesh = evaluated.to_mesh()
+            if mesh:
+                hash_mesh(sha, mesh)
+            evaluated.to_mesh_clear()
+        for slot in id.material_slots:
+            if slot.material:
+                hash_id(sha, slot.material, depsgraph, visited)
+    elif isinstance(id, bpy.types.Image):
+        path = bpy.path.abspath(id.filepath, library=id.library)
+        mtime = os.path.getmtime(path) if os.path.exists(path) else None
+        packed = id.packed_file.size if id.packed_file else None
+        sha.update(("%r;%r;%r;%r;%r;" % (path, mtime, packed, id.source, id.colorspace_settings.name)).encode())
+        if id.is_dirty or id.source == 'GENERATED':
+            sha.update(get_pixels(id).tobytes())
+    elif isinstance(id, bpy.types.Scene):
+        for settings in [id.render, getattr(id, "cycles", None)]:
+            if settings:
+                hash_properties(sha, settings, {'rna_type'})
+    else:
+        hash_properties(sha, id, {'rna_type', 'users', 'use_fake_user', 'is_evaluated', 'original', 'tag', 'is_library_indirect'})
+    
+    # Materials, worlds and lights can have shader node trees
+    if getattr(id, "node_tree", None):
+        hash_node_tree(sha, id.node_tree, depsgraph, visited)
+
+
+
+# Add the geometry of an evaluated mesh to the hash
+def hash_mesh(sha, mesh):
+    for data, attr, dtype, size in [(mesh.vertices, "co", numpy.float32, 3),
+                                    (mesh.loops, "vertex_index", numpy.int32, 1),
+                                    (mesh.polygons, "loop_start", numpy.int32, 1),
+                                    (mesh.polygons, "material_index", numpy.int32, 1),
+                                    (mesh.polygons, "use_smooth", numpy.bool_, 1)]:
+        values = numpy.empty(len(data) * size, dtype=dtype)
+        data.foreach_get(attr, values)
+        sha.update(values.tobytes())
+    for layer in mesh.uv_layers:
+        sha.update(layer.name.encode())
+        uvs = numpy.empty(len(layer.data) * 2, dtype=numpy.float32)
+        layer.data.foreach_get("uv", uvs)
+        sha.update(uvs.tobytes())
+    sha.update(repr(mesh.uv_layers.active.name if mesh.uv_layers.active else None).encode())
+
+
+
+# Add nodes, their settings, unlinked input values and links of a node tree to the hash
+def hash_node_tree(sha, tree, depsgraph, visited):
+    for node in sorted(tree.nodes, key=lambda node: node.name):
+        sha.update(("node=%s:%s;" % (node.name, node.bl_idname)).encode())
+        hash_properties(sha, node, node_skip_props)
+        for input in node.inputs:
+            if hasattr(input, "default_value") and not input.is_linked:
+                value = input.default_value
+                if hasattr(value, "__len__"):
+                    value = tuple(value)
+                sha.update(("%s=%r;" % (input.identifier, value)).encode())
+        for id in [getattr(node, "image", None), getattr(node, "node_tree", None), getattr(node, "object", None)]:
+            if isinstance(id, bpy.types.NodeTree):
+                if id.as_pointer() not in visited:
+                    visited.add(id.as_pointer())
+                    hash_node_tree(sha, id, depsgraph, visited)
+            elif isinstance(id, bpy.types.ID):
+                hash_id(sha, id, depsgraph, visited)
+    for link in tree.links:
+        sha.update(("link=%s:%s>%s:%s;" % (link.from_node.name, link.from_socket.identifier, link.to_node.name, link.to_socket.identifier)).encode())
+
+
+
+# Load the images of a pass from the cache if its manifest has the same fingerprint
+def load_cached_pass(cache_dir, node, format, fingerprint):
+    entry = read_manifest(cache_dir, node)
+    if not entry or entry["fingerprint"] != fingerprint:
+        return None
+    img_bake, img_mask = create_pass_images(node, format)
+    for img, key in [(img_bake, "bake"), (img_mask, "mask")]:
+        if img:
+            path = os.path.join(cache_dir, entry.get(key) or "")
+            if not entry.get(key) or not os.path.exists(path):
+                return None
+            pixels = numpy.load(path)
+            if pixels.dtype == numpy.uint8:
+                pixels = pixels.astype(numpy.float32) / 255
+            if len(pixels) != len(img.pixels):
+                return None
+            img.pixels.foreach_set(pixels)
+            img.update()
+    return [img_bake, img_mask]
+
+
+
+# Save the images of a pass and record its fingerprint in the manifest of the pass
+def store_cached_pass(cache_dir, node, fingerprint, img_bake, img_mask):
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        pass_key = manifest_key(node)
+        old_entry = read_manifest(cache_dir, node)
+        entry = {"fingerprint": fingerprint, "baked": datetime.now().isoformat()}
+        for img, key in [(img_bake, "bake"), (img_mask, "mask")]:
+            if img:
+                pixels = get_pixels(img)
+                # Byte images only hold 256 values per channel, which can be stored without loss
+                if not img.is_float:
+                    pixels = numpy.round(pixels * 255).astype(numpy.uint8)
+                name = "%s_%s_%s.npy" % (pass_key, fingerprint, key)
+                replace_file(os.path.join(cache_dir, name), lambda file: numpy.save(file, pixels))
+                entry[key] = name
+        replace_file(os.path.join(cache_dir, pass_key + ".json"), lambda file: file.write(json.dumps(entry, indent=1).encode("utf-8")))
+        # Files of the previous bake are named after this pass, so no other pass uses them
+        if old_entry and old_entry["fingerprint"] != fingerprint:
+            for key in ["bake", "mask"]:
+                if old_entry.get(key) and old_entry[key] != entry.get(key):
+                    try:
+                        os.remove(os.path.join(cache_dir, old_entry[key]))
+                    except FileNotFoundError:
+                        # Another process baking the same pass removed it already
+                        pass
+    except OSError as error:
+        _print(">   -Could not store pass in bake cache: %s" % (error), tag=True)
+
+
+
+# Every pass has its own manifest with the fingerprint and cached files of its last bake, so that processes
+# baking different passes at the same time never write to the same file
+def manifest_key(node):
+    name = node.get_name()
+    return "%s_%s" % (bpy.path.clean_name(name), hashlib.sha1(name.encode("utf-8")).hexdigest()[:8])
+
+
+
+def read_manifest(cache_dir, node):
+    try:
+        with open(os.path.join(cache_dir, manifest_key(node) + ".json"), "r", encoding="utf-8") as file:
+            return json.load(file)
+    except (OSError, ValueError):
+        return None
+
+
+
+# Write to a temporary file first, so other processes never read a partially written file
+def replace_file(path, write):
+    temp = "%s.%i.tmp" % (path, os.getpid())
+    with open(temp, "wb") as file:
+        write(file)
+    os.replace(temp, path)
+
+
+
 # Clear an existing image to all black all transparent
 def clear_image(solution):
     # Proceed if clear is set
@@ -1031,16 +1303,6 @@ def clear_image(solution):
 
 
 
-# Take a list of values and return the highest
-def pixel_value(channels):
-    value = 0
-    for val in channels:
-        if val > value:
-            value = val
-    return value
-
-
-
 # Apply image format settings to scenes output settings
 def apply_output_format(target_settings, format):
     # Configure output image settings
@@ -1431,6 +1693,14 @@ def main():
         "-v", "--ignorevis", dest="ignorevis", type=int, required=False,
         help="Treat all selected objects as visibile",
     )
+    parser.add_argument(
+        "-o", "--outputs", dest="outputs", type=str, required=False,
+        help="JSON list of output node names to limit the bake to",
+    )
+    parser.add_argument(
+        "-c", "--usecache", dest="usecache", type=int, required=False,
+        help="Reuse passes that are unchanged since the last bake",
+    )
     parser.add_argument(
         "-d", "--debug", dest="debug", type=int, required=False,
         help="Enable debug messages",
@@ -1458,6 +1728,12 @@ def main():
     else:
         ignorevis = False
         
+    global usecache
+    if args.usecache:
+        usecache = bool(args.usecache)
+    else:
+        usecache = False
+        
     global debug
     if args.debug:
         debug = bool(args.debug)
@@ -1490,13 +1766,14 @@ def main():
     output_scene = file_to.scenes[1]
     
     # Start processing bakery node tree
-    err = process_tree(args.tree, args.node)
-    
-    # Send end tag
-    if err:
-        _print("<ERRORS>", tag=True)
-    else:
-        _print("<FINISH>", tag=True)
+    outputs = None
+    if args.outputs:
+        import json
+        outputs = json.loads(args.outputs)
+    err = process_tree(args.tree, args.node, outputs)
+    
+    # Send end message
+    _send("finish", success=not err)
         
     # Save changes to the file for debugging and exit
     bpy.ops.wm.save_mainfile(filepath=bpy.data.filepath, exit=True)
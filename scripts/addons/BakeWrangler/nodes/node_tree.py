@@ -1,31 +1,29 @@
 import os
 import sys
+import json
+import shutil
 import threading, queue
 import subprocess
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 import bpy
 from bpy.types import NodeTree, Node, NodeSocket, NodeSocketColor, NodeSocketFloat
 
 
 
+# Messages from the background baker are sent to the UI as single JSON lines starting with this marker
+MSG_MARKER = "<BWMSG>"
+
+
+
 # Message formatter
 def _print(str, node=None, ret=False, tag=False, wrap=True, enque=None, textdata="BakeWrangler"):
     output = "%s" % (str)
     endl = ''
-    flsh = False
     
     if node:
         output = "[%s]: %s" % (node.get_name(), output)
         
-    if tag:
-        output.replace("<", "<_")
-        output = "<%s>%s" % ("PBAKE", output)
-        flsh = True
-        if wrap:
-            output = "%s</%s>" % (output, "PWRAP")
-        else:
-            output = "%s</%s>" % (output, "PBAKE")
-        
     if wrap:
         endl = '\n'
         
@@ -46,12 +44,34 @@ def _print(str, node=None, ret=False, tag=False, wrap=True, enque=None, textdata
         tout = "%s%s" % (output, endl)
         text.write(tout)
     
-    print(output, end=endl, flush=flsh)
+    if tag:
+        # Tagged messages are read by the UI from the background process
+        _send("log", text=output, end=endl)
+    else:
+        print(output, end=endl)
+
+
+
+# Send a structured message from the background baker to the UI
+def _send(msg_type, **data):
+    data["type"] = msg_type
+    print(MSG_MARKER + json.dumps(data), flush=True)
+
+
+
+# Decode a line of background process output, returns None for lines that aren't messages
+def _parse_message(line):
+    if not line.startswith(MSG_MARKER):
+        return None
+    try:
+        return json.loads(line[len(MSG_MARKER):])
+    except ValueError:
+        return None
 
 
 
 # Preference reader
-default_true  = ["text_msgs", "clear_msgs", "wind_msgs", "def_filter_mesh", "def_filter_curve", "def_filter_surface",
+default_true  = ["text_msgs", "clear_msgs", "wind_msgs", "bake_cache", "def_filter_mesh", "def_filter_curve", "def_filter_surface",
                  "def_filter_meta", "def_filter_font", "def_filter_light",]
 default_false = ["def_filter_collection", "def_show_adv", "ignore_vis", "save_pass", "make_dirs",]
 default_res   = ["def_xres", "def_yres", "def_xout", "def_yout",]
@@ -84,6 +104,8 @@ def _prefs(key):
             return 0 # CPU
         elif key == 'def_samples':
             return 1
+        elif key == 'bake_workers':
+            return 1
         elif key == 'def_format':
             return 2 # PNG
         elif key == 'def_raydist':
@@ -144,6 +166,37 @@ def gather_output_links(output):
 
 
 
+# Gather the names of the output nodes a bake started from the given node will write to
+def gather_bake_outputs(node):
+    outputs = []
+    if node.bl_idname == 'BakeWrangler_Bake_Pass':
+        for output in node.outputs:
+            for link in gather_output_links(output):
+                if link.to_socket.valid and link.to_node.name not in outputs:
+                    outputs.append(link.to_node.name)
+    elif node.bl_idname == 'BakeWrangler_Output_Image_Path':
+        outputs.append(node.name)
+    elif node.bl_idname == 'BakeWrangler_Output_Batch_Bake':
+        for input in node.inputs:
+            if input.islinked() and input.valid:
+                name = follow_input_link(input.links[0]).from_node.name
+                if name not in outputs:
+                    outputs.append(name)
+    return outputs
+
+
+
+# Split output node names into jobs, outputs that write to the same image file have to be baked together
+def group_bake_outputs(tree, outputs):
+    jobs = {}
+    for name in outputs:
+        output = tree.nodes[name]
+        file_path = os.path.normcase(os.path.join(os.path.abspath(output.img_path), output.name_with_ext()))
+        jobs.setdefault(file_path, []).append(name)
+    return list(jobs.values())
+
+
+
 #
 # Bake Wrangler Operators
 #
@@ -206,7 +259,11 @@ class BakeWrangler_Operator_BakePass(BakeWrangler_Operator, bpy.types.Operator):
     _success = False
     _finish = False
     _lock = threading.Lock()
+    _log_lock = threading.Lock()
     _queue = queue.SimpleQueue()
+    _jobs_done = 0
+    _procs = []
+    _progress = {}
     stopping = False
     
     open_ed = None
@@ -219,25 +276,31 @@ class BakeWrangler_Operator_BakePass(BakeWrangler_Operator, bpy.types.Operator):
     bake_proc = None
     was_dirty = False
     img_list = []
+    jobs = []
     
     # Stop this bake if it's currently running
     def stop(self, kill=True):
         if self._thread and self._thread.is_alive() and kill:
             with self._lock:
+                if not self._kill:
+                    _print("Bake canceled, terminating process...", enque=self._queue)
                 self.stopping = self._kill = True
+                for sub in self._procs:
+                    if sub.poll() == None:
+                        sub.kill()
         return self.stopping
     
-    # Runs a blender subprocess
+    # Runs the bake in one or more background blender processes
     def thread(self, node_name, tree_name, file_name, exec_name, script_name):
         tree = bpy.data.node_groups[self.tree]
         node = tree.nodes[self.node]
         debug = _prefs('debug')
         savepass = _prefs('save_pass')
         ignorevis = _prefs('ignore_vis')
-             
-        _print("Launching background process:", node=node, enque=self._queue)
-        _print("================================================================================", enque=self._queue)
-        sub = subprocess.Popen([
+        usecache = _prefs('bake_cache')
+        workers = min(_prefs('bake_workers'), len(self.jobs))
+        
+        args = [
             exec_name,
             file_name,
             "--background",
@@ -248,70 +311,102 @@ class BakeWrangler_Operator_BakePass(BakeWrangler_Operator, bpy.types.Operator):
             "--debug", str(int(debug)),
             "--savepass", str(int(savepass)),
             "--ignorevis", str(int(ignorevis)),
-            ], stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True, encoding="utf-8", errors="replace")
-        
-        # Read output from subprocess and print tagged lines
-        out = ""
-        kill = False
-        while sub.poll() == None:
-            # Check for kill flag
-            if self._lock.acquire(blocking=False):
-                if self._kill:
-                    _print("Bake canceled, terminating process...", enque=self._queue)
-                    sub.kill()
-                    out, err = sub.communicate()
-                    kill = True
-                self._lock.release()
+            "--usecache", str(int(usecache)),
+            ]
+        
+        if workers <= 1:
+            _print("Launching background process:", node=node, enque=self._queue)
+            _print("================================================================================", enque=self._queue)
+            self._finish, self._success = self.run_process(args)
+            _print("================================================================================", enque=self._queue)
+            _print("Background process ended", node=node, enque=self._queue)
+        else:
+            # Every image file is an independent job, each process gets its own copy of the blend file
+            _print("Launching %i background processes for %i jobs:" % (workers, len(self.jobs)), node=node, enque=self._queue)
+            _print("================================================================================", enque=self._queue)
+            self._jobs_done = 0
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                results = list(pool.map(lambda job: self.run_job(job[0], job[1], args), enumerate(self.jobs)))
+            self._finish = all(result[0] for result in results)
+            self._success = all(result[1] for result in results)
+            _print("================================================================================", enque=self._queue)
+            _print("Background processes ended", node=node, enque=self._queue)
+    
+    # Bake the outputs of one image file in their own process
+    def run_job(self, index, output_names, args):
+        with self._lock:
+            if self._kill:
+                return [False, False]
+        start = datetime.now()
+        job_file = "%s_job%03i.blend" % (os.path.splitext(args[1])[0], index)
+        shutil.copyfile(args[1], job_file)
+        job_args = [args[0], job_file] + args[2:] + ["--outputs", json.dumps(output_names)]
+        job_name = ", ".join(output_names)
+        try:
+            finish, success = self.run_process(job_args, prefix="[%s] " % (job_name))
+        finally:
+            # Output of the job is already in the shared log, the copy is not needed anymore
+            try:
+                os.remove(job_file)
+            except OSError:
+                pass
+        with self._log_lock:
+            self._jobs_done += 1
+            state = "Success" if finish and success else ("Errors" if finish else "Failed")
+            _print("Job %i/%i [%s]: %s after %s" % (self._jobs_done, len(self.jobs), job_name, state, str(datetime.now() - start)), enque=self._queue)
+        return [finish, success]
+    
+    # Runs a blender subprocess and returns if it finished and if it finished without errors
+    def run_process(self, args, prefix=""):
+        sub = subprocess.Popen(args, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True, encoding="utf-8", errors="replace", bufsize=1)
+        with self._lock:
+            self._procs.append(sub)
+            if self._kill:
+                sub.kill()
+        
+        # Read output line by line, messages are displayed and everything goes to the log
+        finish = False
+        success = False
+        line_start = True
+        for line in sub.stdout:
+            out = line
+            msg = _parse_message(line)
+            if msg is not None:
+                out = ""
+                if msg["type"] == "log":
+                    out = msg["text"] + msg["end"]
+                    _print(("%s%s" % (prefix, out)) if line_start else out, enque=self._queue, wrap=False)
+                    line_start = msg["end"] != ""
+                elif msg["type"] == "progress":
+                    with self._log_lock:
+                        self._progress[prefix] = [msg["done"], msg["total"]]
+                elif msg["type"] == "pass" and msg["error"]:
+                    out = "Error in pass [%s] of output [%s]\n" % (msg["name"], msg["output"])
+                elif msg["type"] == "finish":
+                    finish = True
+                    success = msg["success"]
             
-            if not kill:
-                out = sub.stdout.read(1)
-                # Collect tagged lines and display them in console
-                if out == '<':
-                    out += sub.stdout.read(6)
-                    if out == "<PBAKE>":
-                        tag_end = False
-                        tag_line = ""
-                        out = ""
-                        tag_out = ""
-                        # Read until end tag is found
-                        while not tag_end:
-                            tag = sub.stdout.read(1)
-                            
-                            if tag == '<':
-                                tag_line = sub.stdout.read(1)
-                                if tag_line != '_':
-                                    tag_line = tag + tag_line + sub.stdout.read(6)
-                                    if tag_line == "</PBAKE>":
-                                        tag_end = True
-                                        out += '\n'
-                                    elif tag_line == "</PWRAP>":
-                                        tag_end = True
-                                        tag_out += '\n'
-                                        #sys.stdout.write('\n')
-                                        #sys.stdout.flush()
-                                    elif tag_line == "<FINISH>":
-                                        tag_line += sub.stdout.read(8)
-                                        tag_end = True
-                                        self._success = True
-                                        self._finish = True
-                                    elif tag_line == "<ERRORS>":
-                                        tag_line += sub.stdout.read(8)
-                                        tag_end = True
-                                        self._success = False
-                                        self._finish = True
-                            if tag != '' and not tag_end:
-                                tag_out += tag
-                                #sys.stdout.write(tag_line)
-                                #sys.stdout.flush()
-                                out += tag
-                        _print(tag_out, enque=self._queue, wrap=False)
-        
             # Write to log
             if out != '' and self.blend_log:
-                self.blend_log.write(out)
-                self.blend_log.flush()
-        _print("================================================================================", enque=self._queue)
-        _print("Background process ended", node=node, enque=self._queue)
+                with self._log_lock:
+                    self.blend_log.write(out)
+                    self.blend_log.flush()
+        sub.wait()
+        return [finish, success]
+    
+    # Progress of all running processes as text with an estimate of the remaining time
+    def progress_text(self):
+        with self._log_lock:
+            done = sum(progress[0] for progress in self._progress.values())
+            total = sum(progress[1] for progress in self._progress.values())
+        if total == 0 or self.start == None:
+            return "Preparing..."
+        text = "%i/%i passes (%i%%)" % (done, total, 100 * done / total)
+        if done > 0:
+            elapsed = datetime.now() - self.start
+            remaining = elapsed * (total - done) / done
+            text += ", %s left" % (str(remaining - timedelta(microseconds=remaining.microseconds)))
+        return text
 
     # Event handler
     def modal(self, context, event):
@@ -321,6 +416,8 @@ class BakeWrangler_Operator_BakePass(BakeWrangler_Operator, bpy.types.Operator):
         # Check if the bake thread has ended every timer event
         if event.type == 'TIMER':
             self.print_queue(context)
+            if self.node_ed:
+                self.node_ed.tag_redraw()
             # Reapply dirt by pushing something to undo stack (not ideal)
             if self.was_dirty and not bpy.data.is_dirty:
                 bpy.ops.node.select_all(action='INVERT')
@@ -461,6 +558,9 @@ class BakeWrangler_Operator_BakePass(BakeWrangler_Operator, bpy.types.Operator):
         # Create a thread which will launch a background instance of blender running a script that does all the work.
         # Process is complete when thread exits. Will need full path to blender, node, temp file and proc script.
         blend_exec = bpy.path.abspath(bpy.app.binary_path)
+        self.jobs = group_bake_outputs(tree, gather_bake_outputs(node))
+        self._procs = []
+        self._progress = {}
         self._thread = threading.Thread(target=self.thread, args=(self.node, self.tree, self.blend_copy, blend_exec, self.bake_proc,))
         
         # Get a list of image file names that will be updated by the bake so they can be reloaded on success
@@ -917,6 +1017,7 @@ class BakeWrangler_Tree_Node:
                     op = layout.operator("bake_wrangler_op.bake_stop", icon='CANCEL')
                     op.tree = self.id_data.name
                     op.node = self.name
+                    layout.label(text=self.id_data.baking.progress_text())
             else:
                 layout.operator("bake_wrangler_op.dummy", icon=icon, text=label)
         else:
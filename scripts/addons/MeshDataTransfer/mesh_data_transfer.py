@@ -37,6 +37,9 @@ class MeshData (object):
         self.transfer_bmesh = None
 
         self.vertex_map = {}  # the corrispondance map of the uv_vertices to the mesh vert id
+        self.vertex_ids = None  # np.array with the first mesh vert id of every transfer vertex
+        self.triangles = None  # np.array with the transfer vertex ids of every transfer face
+        self.transfer_coords = None  # np.array with the coordinates of the transfer vertices
 
 
         #self.get_mesh_data()
@@ -107,17 +110,25 @@ class MeshData (object):
             return
         v_count = len(self.mesh.vertices)
         weights = np.zeros (v_count , dtype=np.float32)
-        for v in self.mesh.vertices:
-            groups = v.groups
-            for group in groups:
-                i = group.group
-                if i == v_group:
-                    v_index = v.index
-                    weight = group.weight
-                    weights[v_index] = weight
+        entries = [(v.index, g.weight) for v in self.mesh.vertices for g in v.groups if g.group == v_group]
+        if entries:
+            v_ids, values = zip(*entries)
+            weights[list(v_ids)] = values
         weights.shape = (v_count, 1)
         return weights
 
+    def get_vertex_weight_entries(self):
+        """
+        Read all the vertex groups assignments in a single pass. The assignments are only
+        exposed per vertex, so this is still a python loop over the vertices
+        :return: np.arrays with the group index, the vertex index and the weight of every assignment
+        """
+        entries = [(g.group, v.index, g.weight) for v in self.mesh.vertices for g in v.groups]
+        if not entries:
+            return np.zeros(0, dtype=np.int), np.zeros(0, dtype=np.int), np.zeros(0, dtype=np.float32)
+        group_ids, v_ids, values = zip(*entries)
+        return np.array(group_ids, dtype=np.int), np.array(v_ids, dtype=np.int), np.array(values, dtype=np.float32)
+
 
     def get_vertex_groups_weights(self, ignore_locked = False):
         v_groups = self.vertex_groups
@@ -130,13 +141,8 @@ class MeshData (object):
         weights = np.zeros ((v_count * v_groups_count) , dtype=np.float32)
         weights.shape = (v_groups_count, v_count)
 
-        for v in self.mesh.vertices:
-            groups = v.groups
-            for group in groups:
-                i = group.group
-                v_index = v.index
-                weight = group.weight
-                weights[i , v_index] = weight
+        group_ids, v_ids, values = self.get_vertex_weight_entries()
+        weights[group_ids, v_ids] = values
         if ignore_locked:
             array = self.get_locked_vertex_groups_array()
             return weights[array]
@@ -152,9 +158,9 @@ class MeshData (object):
             group_weights = weights[i]
             v_ids = np.nonzero(group_weights)[0]
             v_group = self.obj.vertex_groups.new(name=group_name)
-            for v_id in v_ids:
-                value = group_weights[v_id]
-                v_group.add((int(v_id),), value, "REPLACE")
+            # Blender has no bulk setter for vertex weights, add() only takes one weight per call
+            for v_id, value in zip(v_ids.tolist(), group_weights[v_ids].tolist()):
+                v_group.add((v_id,), value, "REPLACE")
 
     def store_shape_keys_values(self):
         values= list()
@@ -247,6 +253,20 @@ class MeshData (object):
         # self.transfer_bmesh.to_mesh(mesh)
 
         self.bvhtree = BVHTree.FromBMesh(self.transfer_bmesh)
+        self.build_transfer_arrays()
+
+    def build_transfer_arrays(self):
+        """
+        Store the transfer bmesh topology in np.arrays so the hits of the BVHTree
+        can be resolved without looking up the bmesh faces one by one
+        """
+        bm = self.transfer_bmesh
+        bm.verts.ensure_lookup_table()
+        bm.faces.ensure_lookup_table()
+        v_count = len(bm.verts)
+        self.vertex_ids = np.array([self.vertex_map[i][0] for i in range(v_count)], dtype=np.int)
+        self.transfer_coords = np.array([v.co for v in bm.verts], dtype=np.float32).reshape(v_count, 3)
+        self.triangles = np.array([[v.index for v in f.verts[:3]] for f in bm.faces], dtype=np.int).reshape(-1, 3)
 
     def generate_bmesh(self, deformed=True, world_space=True):
         """
@@ -350,6 +370,9 @@ class MeshData (object):
 
 
 class MeshDataTransfer (object):
+    # amount of vertices projected before the results are stored
+    cast_chunk_size = 65536
+
     def __init__(self, source, target, uv_space=False, deformed_source=False,
                  deformed_target=False, world_space=False, search_method="RAYCAST",
                  topology=False, vertex_group = None, invert_vertex_group = False, exclude_locked_groups = False,
@@ -518,19 +541,14 @@ class MeshDataTransfer (object):
         target_weights = np.zeros((target_weights_shape[0] * target_weights_shape[1]), dtype=np.float32)
         target_weights.shape = target_weights_shape
         masked_vertices = self.get_vertices_mask ()
-        #unpacking array
+        #interpolating the weights of the hit triangles corners
         for i in range(len(weights_names)):
-            source_weight = np.zeros((source_weights[i].shape[0]*3), dtype=np.float32)
-            source_weight.shape = (source_weights[i].shape[0], 3)
-            source_weight[:, 0] = source_weights[i]
-            source_weight[:, 1] = source_weights[i]
-            source_weight[:, 2] = source_weights[i]
-            transferred_weights = self.get_transferred_vert_coords(source_weight)
+            transferred_weights = (source_weights[i][self.related_ids] * self.barycentric_coords).sum(axis=1)
             # filter on vertex group
             if isinstance (masked_vertices , (np.ndarray , np.generic)):
-                transferred_weights = transferred_weights * masked_vertices
+                transferred_weights = transferred_weights * masked_vertices[:, 0]
 
-            target_weights[i] = transferred_weights[:, 0]
+            target_weights[i] = transferred_weights
         self.target.set_vertex_groups_weights(target_weights, weights_names)
         return True
 
@@ -654,12 +672,10 @@ class MeshDataTransfer (object):
 
     def cast_verts(self):
         '''
-        Ray cast the vertices of the
-        :param search_method:
+        Ray cast the vertices of the target on the source in chunks
+        and resolve the hit triangles through the source transfer arrays
         :return:
         '''
-
-        self.target.transfer_bmesh.verts.ensure_lookup_table ()
         v_count = len (self.target.mesh.vertices)
         # np array with coordinates
         self.ray_casted = np.zeros(v_count * 3, dtype=np.float32)
@@ -672,42 +688,54 @@ class MeshDataTransfer (object):
         self.related_ids = np.zeros(v_count * 3, dtype=np.int)
         self.related_ids.shape = (v_count, 3)
 
-        self.source.transfer_bmesh.faces.ensure_lookup_table()
-
         # np bool array with hit verts
         self.missed_projections = np.ones(v_count * 3, dtype=np.bool)
         self.missed_projections.shape = (v_count, 3)
-        v_normal = Vector((0.0,0.0, 1.0))
-        for v in self.target.transfer_bmesh.verts:
-            v_ids = self.target.vertex_map[v.index]  # gets the correspondent vert to the UV_mesh
 
-            if self.search_method == "CLOSEST":
-                projection = self.source.bvhtree.find_nearest (v.co)
+        transfer_verts = self.target.transfer_bmesh.verts[:]
+        hit_locations = np.zeros((len(transfer_verts), 3), dtype=np.float32)
+        hit_triangles = np.full(len(transfer_verts), -1, dtype=np.int)
+        for start in range(0, len(transfer_verts), self.cast_chunk_size):
+            end = start + self.cast_chunk_size
+            self.cast_chunk(transfer_verts[start:end], hit_locations[start:end], hit_triangles[start:end])
+
+        target_ids = self.target.vertex_ids  # gets the correspondent vert to the UV_mesh
+        self.ray_casted[target_ids] = hit_locations
+
+        hit = hit_triangles >= 0
+        hit_ids = target_ids[hit]
+        hit_corners = self.source.triangles[hit_triangles[hit]]
+        self.missed_projections[hit_ids] = False
+        self.hit_faces[hit_ids] = self.source.transfer_coords[hit_corners]
+        # getting the related vertex ids
+        self.related_ids[hit_ids] = self.source.vertex_ids[hit_corners]
+        return self.ray_casted, self.hit_faces, self.related_ids
+
+    def cast_chunk(self, verts, locations, triangles):
+        """
+        Project a chunk of the target vertices on the source BVHTree
+        :param verts: bmesh vertices of the target
+        :param locations: np.array receiving the hit locations, the vertex position on a miss
+        :param triangles: np.array receiving the hit triangle ids, -1 on a miss
+        """
+        bvhtree = self.source.bvhtree
+        find_nearest = self.search_method == "CLOSEST"
+        v_normal = Vector((0.0,0.0, 1.0))
+        for i, v in enumerate(verts):
+            if find_nearest:
+                projection = bvhtree.find_nearest (v.co)
             else:
                 if not self.uv_space:
                     v_normal = v.normal
-                projection = self.source.bvhtree.ray_cast (v.co, v_normal)
+                projection = bvhtree.ray_cast (v.co, v_normal)
                 # project in the opposite direction if the ray misses
                 if not projection[0]:
-                    projection = self.source.bvhtree.ray_cast (v.co, (v_normal*-1.0))
+                    projection = bvhtree.ray_cast (v.co, (v_normal*-1.0))
             if projection[0]:
-                for v_id in v_ids:
-                    self.ray_casted[v_id] = projection[0]
-                    self.missed_projections[v_id] = False
-                    face = self.source.transfer_bmesh.faces[projection[2]]
-                    self.hit_faces[v_id] = (face.verts[0].co , face.verts[1].co , face.verts[2].co)
-                    # getting the related vertex ids
-                    v1_id, v2_id, v3_id = face.verts[0].index , face.verts[1].index , face.verts[2].index
-                    v1_id = self.source.vertex_map[v1_id][0]
-                    v2_id = self.source.vertex_map[v2_id][0]
-                    v3_id = self.source.vertex_map[v3_id][0]
-                    v_array = np.array ([v1_id , v2_id , v3_id])
-
-                    self.related_ids[v_id] = v_array
+                locations[i] = projection[0]
+                triangles[i] = projection[2]
             else:
-                for v_id in v_ids:
-                    self.ray_casted[v_id] = v.co
-        return self.ray_casted, self.hit_faces, self.related_ids
+                locations[i] = v.co
 
     @staticmethod
     def get_barycentric_coords(verts_co, triangles):
@@ -5,8 +5,9 @@ import os
 import sys
 
 import mathutils
+from mathutils.kdtree import KDTree
 
-from . import geometry, global_def, utils
+from . import geometry, global_def
 # Add vendor directory to module search path
 parent_dir = os.path.abspath(os.path.dirname(__file__))
 nx_dir = os.path.join(parent_dir, 'networkx')
@@ -169,42 +170,37 @@ class Island:
         # targetIslands.remove(self)
         activeUvLayer = global_def.bm.loops.layers.uv.active
 
+        # spatial index of all target uvs, so every loop needs one lookup
+        # instead of a comparison with every target loop
+        targetUvVerts = []
+        for targetIsland in targetIslands:
+            for targetFace_id in targetIsland:
+                targetFace = global_def.bm.faces[targetFace_id]
+                for targetLoop in targetFace.loops:
+                    targetUvVerts.append(targetLoop[activeUvLayer])
+        if len(targetUvVerts) == 0:
+            return
+
+        kdTree = KDTree(len(targetUvVerts))
+        for index, targetUvVert in enumerate(targetUvVerts):
+            u, v = targetUvVert.uv
+            kdTree.insert((u, v, 0.0), index)
+        kdTree.balance()
+
         for face_id in self.faceList:
             face = global_def.bm.faces[face_id]
 
             for loop in face.loops:
                 selectedUVvert = loop[activeUvLayer]
-                uvList = []
-
-                for targetIsland in targetIslands:
-                    for targetFace_id in targetIsland:
-                        targetFace = global_def.bm.faces[targetFace_id]
-                        for targetLoop in targetFace.loops:
-                            # take the a reference vert
-                            targetUvVert = targetLoop[activeUvLayer].uv
-                            # get a selected vert and calc it's distance from
-                            # the ref
-                            # add it to uvList
-                            dist = round(
-                                utils.vectorDistance(selectedUVvert.uv,
-                                                     targetUvVert), 10)
-                            uvList.append((dist, targetLoop[activeUvLayer]))
-
-                # for every vert in uvList take the ones with the shortest
-                # distnace from ref
-                minDist = uvList[0][0]
-                bestMatcher = 0
-
-                # 1st pass get lower dist
-                for bestDist in uvList:
-                    if bestDist[0] <= minDist:
-                        minDist = bestDist[0]
-
-                # 2nd pass get the only ones with a match
-                for bestVert in uvList:
-                    if bestVert[0] <= minDist:
-                        bestMatcherList.append((bestVert[0], selectedUVvert,
-                                                bestVert[1]))
+                u, v = selectedUVvert.uv
+                co = (u, v, 0.0)
+
+                # take all the target verts with the shortest distance
+                minDist = round(kdTree.find(co)[2], 10)
+                for _, index, dist in kdTree.find_range(co, minDist + 1e-10):
+                    if round(dist, 10) <= minDist:
+                        bestMatcherList.append((minDist, selectedUVvert,
+                                                targetUvVerts[index]))
 
         for bestMatcher in bestMatcherList:
             if bestMatcher[0] <= threshold:
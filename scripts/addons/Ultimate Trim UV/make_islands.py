@@ -16,11 +16,48 @@
 #
 # ##### END GPL LICENSE BLOCK #####
 
-from collections import defaultdict
+import bpy
 
 # from global_def import *
 from . import global_def, island, utils
 
+# islands of the last scan, reused while the mesh and its uv keys stay the same
+_cache = {"key": None, "islands": None}
+
+
+def _findRoot(parents, item):
+    """Return the root of item, compressing the path on the way."""
+    root = item
+    while parents[root] != root:
+        root = parents[root]
+    while parents[item] != root:
+        parents[item], item = root, parents[item]
+    return root
+
+
+def _buildIslands(faceIndices, loopKeys):
+    """Group faces that share a (uv, vertex) key with union-find.
+
+    :param faceIndices: the face index of every loop.
+    :param loopKeys: the (u, v, vertex index) key of every loop.
+    :return: a list of sets of face indexes.
+    """
+    parents = {}
+    faceByKey = {}
+    for faceIndex, key in zip(faceIndices, loopKeys):
+        parents.setdefault(faceIndex, faceIndex)
+        other = faceByKey.setdefault(key, faceIndex)
+        if other != faceIndex:
+            rootA = _findRoot(parents, faceIndex)
+            rootB = _findRoot(parents, other)
+            if rootA != rootB:
+                parents[rootA] = rootB
+
+    islands = {}
+    for faceIndex in parents:
+        islands.setdefault(_findRoot(parents, faceIndex), set()).add(faceIndex)
+    return list(islands.values())
+
 
 class MakeIslands:
     """Create and get Island.
@@ -31,54 +68,36 @@ class MakeIslands:
     def __init__(self):
         """Scan the uv data and create the islands."""
         utils.InitBMesh()
-        self.__islands = []
         self.__bm = global_def.bm
         self.__uvlayer = global_def.uvlayer
 
         self.__selectedIslands = set()
         self.__hiddenFaces = set()
 
-        face_to_verts = defaultdict(set)
-        vert_to_faces = defaultdict(set)
-
+        uvlayer = self.__uvlayer
+        faceIndices = []
+        loopKeys = []
         for face in self.__bm.faces:
+            faceIndex = face.index
+            faceSelected = face.select
+            if not faceSelected:
+                self.__hiddenFaces.add(faceIndex)
             for loop in face.loops:
-                vertID = loop[self.__uvlayer].uv.to_tuple(5), loop.vert.index
-                face_to_verts[face.index].add(vertID)
-                vert_to_faces[vertID].add(face.index)
-
-                if face.select:
-                    if loop[self.__uvlayer].select:
-                        self.__selectedIslands.add(face.index)
-                else:
-                    self.__hiddenFaces.add(face.index)
-
-        faces_left = set(face_to_verts.keys())
-
-        while len(faces_left) > 0:
-            face_id = list(faces_left)[0]
-            current_island = set()
-
-            face_to_visit = [face_id]
-            faces_left.remove(face_id)
-
-            # BDF search of face
-            while len(face_to_visit) > 0:
-                current_island.add(face_id)
-                cur_face = face_to_visit.pop(0)
-                # and add all faces that share uvs with this face
-                verts = face_to_verts[cur_face]
-                # search for connected faces: faces that have same vertex index
-                # and same uv
-                for vert in verts:
-                    connected_faces = vert_to_faces[vert]
-                    for face in connected_faces:
-                        current_island.add(face)
-                        if face in faces_left:
-                            face_to_visit.append(face)
-                            faces_left.remove(face)
-            # finally add the discovered island to the list of islands
-            self.__islands.append(island.Island(current_island))
+                loopUV = loop[uvlayer]
+                u, v = loopUV.uv.to_tuple(5)
+                faceIndices.append(faceIndex)
+                loopKeys.append((u, v, loop.vert.index))
+                if faceSelected and loopUV.select:
+                    self.__selectedIslands.add(faceIndex)
+
+        # the islands only depend on the keys, so a redo of an operator
+        # on unchanged uvs does not have to group the faces again
+        key = (bpy.context.edit_object.data.as_pointer(), uvlayer.name,
+               hash(tuple(faceIndices)), hash(tuple(loopKeys)))
+        if _cache["key"] != key:
+            _cache["key"] = key
+            _cache["islands"] = [island.Island(faces) for faces in _buildIslands(faceIndices, loopKeys)]
+        self.__islands = _cache["islands"]
 
     def getIslands(self):
         """Return all the uv islands found.
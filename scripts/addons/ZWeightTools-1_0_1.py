@@ -9,7 +9,8 @@ bl_info = {
     "category": "3D View"
     }
 
-import bpy, bmesh, math, inspect, time
+import bpy, bmesh, inspect, time, numpy
+from mathutils import kdtree
 from timeit import default_timer as timer
 from bpy.props import (BoolVectorProperty,FloatVectorProperty,IntProperty,StringProperty, BoolProperty, EnumProperty, PointerProperty,FloatProperty)
 from bpy.types import (PropertyGroup,Panel,Operator)
@@ -52,11 +53,8 @@ class GradOps(object):
 
     def isInGroup(self,bm,vLst,actInd,wlay):
         #Make sure all verts are in vertex group
-        vs = [ v.index for v in bpy.context.object.data.vertices if actInd in [ vg.group for vg in v.groups ] ]
         for v in vLst:
-            try:
-                v[wlay][actInd]
-            except:
+            if actInd not in v[wlay]:
                 self.assignVWeight(bm,v,0.0,actInd,wlay,False)
 
     def arrangeVerts(self,selVerts,actVert,actInd,wlay):
@@ -67,7 +65,6 @@ class GradOps(object):
         totEdgeLen = 0
         eLen = 0
         grad = GradOps()
-        selVertsLen = len(selVerts).real
 
         ###REORDER###
         #Append to orderVerts
@@ -76,7 +73,6 @@ class GradOps(object):
 
         #Remove from selVerts
         selVerts.remove(actVert)
-        print([v.index for v in selVerts])
 
         #for loop checking edges for actVert first
         for l in actVert.link_loops:
@@ -98,19 +94,13 @@ class GradOps(object):
 
         #Go through all connted verts and check to see if in selVerts
         i = 1
-        print(selVertsLen)
         while selVerts:
             selVerts.remove(actVert)
-            print('Removed',actVert.index)
-            print([v.index for v in selVerts])
-            print(i,actVert.index)
             test = True
             for l in actVert.link_loops:
-                print('-',l.index)
                 nv = l.link_loop_next.vert
                 pv = l.link_loop_prev.vert
                 if nv in selVerts:
-                    print('--',nv.index)
                     actVert = nv
                     orderVerts.append(nv)
                     eLst.append(l.edge)
@@ -118,7 +108,6 @@ class GradOps(object):
                     test = False
                     break
                 elif pv in selVerts:
-                    print('--',pv.index)
                     actVert = pv
                     orderVerts.append(pv)
                     eLst.append(l.edge)
@@ -200,113 +189,78 @@ class GradOps(object):
             verts[wlay][actInd] = weight
 
     def gradWeightLinear(self,bm,orderVerts,numer,rev,maxWeight,thrAwa,actInd,wlay):
-        obj = bpy.context.object
-        grad = GradOps()
+        chg = numer / (len(orderVerts) - 1)
+        if rev:
+            orderVerts.reverse()
+        #Weights of all ordered verts at once
+        newWeights = maxWeight - chg * numpy.arange(len(orderVerts))
         if bpy.context.scene.vweight_tools.rangeEnum == 'SEL':
-            i = 0
-            chg = numer / (len(orderVerts) - 1)
-            if rev:
-                orderVerts.reverse()
-            for v in orderVerts:
-                subAm = chg * i
-                newWeight = maxWeight - subAm
+            for v, newWeight in zip(orderVerts, newWeights.tolist()):
                 self.assignVWeight(bm,v,newWeight,actInd,wlay,False)
-                i+=1
         else:
-            restOfOriginalLoop = []
-            for v in thrAwa:
-                if v not in orderVerts:
-                    restOfOriginalLoop.append(v)
-            lpTwoInd = []
-            #self.deselAll()
-            chg = numer / (len(orderVerts) - 1)
-            selectedVerts = []
-            if rev:
-                orderVerts.reverse()
-            for i, v in enumerate(orderVerts):
-                #self.deselAll()
-                for e in v.link_edges:
-                    if e.other_vert(v) not in orderVerts and e.other_vert(v) not in restOfOriginalLoop:
-                        v2 = e.other_vert(v)
-                        verts = [v,v2]
-                        vs = grad.loopSel(verts)
-                        subAm = chg * i
-                        newWeight = maxWeight - subAm
-                        self.assignVWeight(bm,vs,newWeight,actInd,wlay,True)
-                        selectedVerts.append(vs)
-                        i+=1
-                        break
-            for list in selectedVerts:
-                for v in list:
-                    if not v.select:
-                        v.select = True
+            self.gradParallelLoops(bm,orderVerts,newWeights,thrAwa,actInd,wlay,True)
 
     def gradWeightLength(self,bm,orderVerts,numer,totEdgeLen,eLst,rev,maxWeight,thrAwa,minWeight,actInd,wlay):
-        #Variables
-        obj = bpy.context.object
-        grad = GradOps()
-        eLen = 0
+        #Reverse list or not
+        if not rev:
+            orderVerts.reverse()
+            eLst.reverse()
+        #Weights of all ordered verts at once, from the length along the selected verts
+        avg = maxWeight-minWeight
+        eLens = numpy.cumsum([0.0] + [e.calc_length() for e in eLst])[:len(orderVerts)]
+        newWeights = avg * (eLens/totEdgeLen) + minWeight
 
         #Decide between just selected verts or parallel loops
         if bpy.context.scene.vweight_tools.rangeEnum == 'SEL':
-            #Reverse list or not
-            if not rev:
-                orderVerts.reverse()
-                eLst.reverse()
-            #get Average
-            avg = maxWeight-minWeight
-            for i, v in enumerate(orderVerts):
-                num = i - 1
-                if num < 0:
-                    num = 0
-                if i == 0:
-                    newWeight = minWeight
-                else:
-                    #get length between two neighboring selected verts
-                    eLen += eLst[num].calc_length()
-                    newWeight = avg * (eLen/totEdgeLen) + minWeight
+            for v, newWeight in zip(orderVerts, newWeights.tolist()):
                 self.assignVWeight(bm,v,newWeight,actInd,wlay,False)
-                i += 1
         else:
-            restOfOriginalLoop = []
-            for v in thrAwa:
-                if v not in orderVerts:
-                    restOfOriginalLoop.append(v)
-            if not rev:
-                orderVerts.reverse()
-                eLst.reverse()
-
-            avg = maxWeight-minWeight
-            selectedVerts = []
-            #wm = bpy.context.window_manager
-            #wm.progress_begin(0,100)
-            for i, v in enumerate(orderVerts):
-                for l in v.link_loops:
-                    v2 = l.link_loop_next.vert
-                    if v2 not in orderVerts and v2 not in restOfOriginalLoop:
-                        verts = [v,v2]
-                        loopsrt = timer()
-                        vs = grad.loopSel(verts)
-                        num = i - 1
-                        if num < 0:
-                            num = 0
-                        if i == 0:
-                            newWeight = minWeight
-                        else:
-                            eLen += eLst[num].calc_length()
-                            newWeight = (avg * (eLen/totEdgeLen)) + minWeight
-                        self.assignVWeight(bm,vs, newWeight,actInd,wlay,True)
-                        selectedVerts.append(vs)
-                        i+=1
-                        break
-                #updte = (i/len(orderVerts)*100)
-                #wm.progress_update(updte)
-            #wm.progress_end()
-
-            for list in selectedVerts:
-                for v in list:
-                    if not v.select:
-                        v.select = True
+            self.gradParallelLoops(bm,orderVerts,newWeights,thrAwa,actInd,wlay,False)
+
+    def gradParallelLoops(self,bm,orderVerts,newWeights,thrAwa,actInd,wlay,byEdges):
+        #Assign the weight of every ordered vert to the edge loop leaving it
+        grad = GradOps()
+        skipVerts = set(orderVerts).union(thrAwa)
+        selectedVerts = []
+        for v, newWeight in zip(orderVerts, newWeights.tolist()):
+            if byEdges:
+                neighbors = [e.other_vert(v) for e in v.link_edges]
+            else:
+                neighbors = [l.link_loop_next.vert for l in v.link_loops]
+            for v2 in neighbors:
+                if v2 not in skipVerts:
+                    vs = grad.loopSel([v,v2])
+                    self.assignVWeight(bm,vs,newWeight,actInd,wlay,True)
+                    selectedVerts.append(vs)
+                    break
+
+        for list in selectedVerts:
+            for v in list:
+                if not v.select:
+                    v.select = True
+
+def readWeightMatrix(verts,wlay,groupCount):
+    """Read the deform weights of verts into a (verts, groups) matrix and a matrix of the assigned groups"""
+    rows, cols, values = [], [], []
+    for i, v in enumerate(verts):
+        for key, weight in v[wlay].items():
+            rows.append(i)
+            cols.append(key)
+            values.append(weight)
+    if cols:
+        groupCount = max(groupCount, max(cols) + 1)
+    weights = numpy.zeros((len(verts), groupCount))
+    assigned = numpy.zeros((len(verts), groupCount), dtype=bool)
+    weights[rows, cols] = values
+    assigned[rows, cols] = True
+    return weights, assigned
+
+def writeWeightMatrix(verts,wlay,weights,mask):
+    """Write the weights where mask is True back to the deform layer of verts"""
+    rows, cols = numpy.nonzero(mask)
+    for row, col, weight in zip(rows.tolist(), cols.tolist(), weights[rows, cols].tolist()):
+        verts[row][wlay][col] = weight
+
 def init_bm():
     if bpy.context.mode == "EDIT_MESH":
         bm = bmesh.from_edit_mesh(bpy.context.object.data)
@@ -323,8 +277,6 @@ class MESH_OT_WeightGradient(Operator):
     bl_options = {"UNDO"}
 
     def execute(self, context):
-        print()
-        total = timer()
         #Variables
         wTool = bpy.context.scene.vweight_tools
         obj = bpy.context.object
@@ -399,8 +351,6 @@ class MESH_OT_WeightGradient(Operator):
             grad.gradWeightLength(bm,orderVerts,numer,totEdgeLen,eLst,rev,maxWeight,selVerts,minWeight,actInd,wlay)
             #print('Length:',timer()-start)
         me.update()
-        print(timer()-total)
-        print()
 
         return {"FINISHED"}
 
@@ -638,11 +588,6 @@ class MESH_OT_copyNearest(Operator):
     def poll(cls, context):
         return len(context.object.vertex_groups) > 1
 
-    def calcDist(self,v1,v2):
-        vco = v1.co
-        nvco = v2.co
-        return math.sqrt( (vco[0] - nvco[0])**2 + (vco[1] - nvco[1])**2 + (vco[2] - nvco[2])**2)
-
     def execute(self, context):
         ob = context.object
         me = ob.data
@@ -653,23 +598,18 @@ class MESH_OT_copyNearest(Operator):
         vlst = [v for v in bm.verts if actInd in v[wlay] and not v.select]
         selv = [v for v in bm.verts if v.select]
 
+        if not vlst:
+            self.report({'ERROR'},'No unselected vertex in the active vertex group to copy from')
+            return {'CANCELLED'}
+
+        #Find the nearest vertex in a KDTree of the verts to copy from
+        kd = kdtree.KDTree(len(vlst))
+        for i, nv in enumerate(vlst):
+            kd.insert(nv.co, i)
+        kd.balance()
+
         for v in selv:
-            nearestVert = None
-            nearestVertDist = None
-            curDist = None
-            for nv in vlst:
-                if nearestVert == None:
-                    nearestVert = nv
-                    nearestVertDist = self.calcDist(v,nv)
-                    curDist = self.calcDist(v,nearestVert)
-                else:
-                    newDist = self.calcDist(v,nv)
-                    if newDist < curDist:
-                        nearestVert = nv
-                        nearestVertDist = newDist
-                        curDist = self.calcDist(v,nearestVert)
-                        if curDist == 0.0:
-                            break
+            nearestVert = vlst[kd.find(v.co)[1]]
             v[wlay][actInd] = nearestVert[wlay][actInd]
         me.update()
         return{'FINISHED'}
@@ -711,35 +651,21 @@ class MESH_OT_Normalize(Operator):
         wlay = bm.verts.layers.deform.verify()
         selVerts = [v for v in bm.verts if v.select]
         wTool=bpy.context.scene.vweight_tools
+        weights, assigned = readWeightMatrix(selVerts,wlay,len(bpy.context.edit_object.vertex_groups))
         if wTool.normBool:
-            for v in selVerts:
-                if aVGInd in v[wlay]:
-                    weight = v[wlay][aVGInd]
-                    for key in v[wlay].keys():
-                        if key != aVGInd:
-                            curweight = v[wlay][key]
-                            if curweight == 0.0:
-                                nweight = weight
-                            else:
-                                nweight = curweight*(1-weight)
-                            v[wlay][key] = nweight
-                else:
-                    weight = 0.0
-                    for key in v[wlay].keys():
-                        if key != aVGInd:
-                            curweight = v[wlay][key]
-                            if curweight == 0.0:
-                                nweight = weight
-                            else:
-                                nweight = curweight
-                            v[wlay][key] = nweight
+            if aVGInd < 0:
+                return{'FINISHED'}
+            #Only verts in the active group change, the other groups make room for its weight
+            actWeights = weights[:, [aVGInd]]
+            mask = assigned & assigned[:, [aVGInd]]
+            mask[:, aVGInd] = False
+            newWeights = numpy.where(weights == 0.0, actWeights, weights*(1-actWeights))
         else:
-            for v in selVerts:
-                sumweight = 0
-                for weight in v[wlay].values():
-                    sumweight+=weight
-                for key in v[wlay].keys():
-                    v[wlay][key] = v[wlay][key]/sumweight
+            #Verts whose weights add up to 0 can not be normalized
+            sumWeights = weights.sum(axis=1, keepdims=True)
+            mask = assigned & (sumWeights != 0.0)
+            newWeights = weights / numpy.where(sumWeights == 0.0, 1.0, sumWeights)
+        writeWeightMatrix(selVerts,wlay,newWeights,mask)
         bpy.context.object.data.update()
 
         return{'FINISHED'}
@@ -0,0 +1,114 @@
+import os
+import numpy
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+# frames that are analysed together, limits the memory of the windowed samples
+framesPerChunk = 512
+
+def calculateFrequencyRangeAmplitudes(samples, sampleRate, fps, frequencyRanges,
+                                      frameAmount = None, useThreads = True):
+    '''
+    Short time fourier transform with one window per frame.
+    Returns an array with shape (frameAmount, len(frequencyRanges)) that contains
+    the amplitude of a sine wave with the same energy as the frequency range.
+    '''
+    chunks = list(iterFrequencyRangeAmplitudeChunks(samples, sampleRate, fps,
+                  frequencyRanges, frameAmount, useThreads))
+    if len(chunks) == 0:
+        return numpy.zeros((0, len(frequencyRanges)), dtype = numpy.float32)
+    return numpy.concatenate(chunks).astype(numpy.float32)
+
+def iterFrequencyRangeAmplitudeChunks(samples, sampleRate, fps, frequencyRanges,
+                                      frameAmount = None, useThreads = True):
+    '''
+    Same as calculateFrequencyRangeAmplitudes but yields the rows in chunks
+    of framesPerChunk frames, so that the caller can report the progress.
+    Closing the generator early stops the calculation.
+    '''
+    samples = numpy.asarray(samples, dtype = numpy.float32)
+    hopSize = sampleRate / fps
+    if frameAmount is None:
+        frameAmount = getFrameAmount(len(samples), sampleRate, fps)
+
+    windowSize = getWindowSize(hopSize)
+    window = numpy.hanning(windowSize).astype(numpy.float32)
+    scale = 4 / (windowSize * numpy.sum(window ** 2))
+
+    # windows are centered on the middle of their frame
+    padded = numpy.concatenate((numpy.zeros(windowSize, dtype = numpy.float32), samples,
+                                numpy.zeros(windowSize * 2, dtype = numpy.float32)))
+    starts = numpy.arange(frameAmount) * hopSize + hopSize / 2 - windowSize / 2 + windowSize
+    starts = numpy.clip(numpy.round(starts).astype(numpy.int64), 0, len(padded) - windowSize)
+
+    lowIndices, highIndices = getBinIndices(frequencyRanges, sampleRate, windowSize)
+
+    def calculateChunk(chunkStart):
+        chunkStarts = starts[chunkStart:chunkStart + framesPerChunk]
+        frames = padded[chunkStarts[:, numpy.newaxis] + numpy.arange(windowSize)]
+        power = numpy.abs(numpy.fft.rfft(frames * window, axis = 1)) ** 2
+        summedPower = numpy.concatenate((numpy.zeros((len(power), 1)), numpy.cumsum(power, axis = 1)), axis = 1)
+        bandPower = summedPower[:, highIndices] - summedPower[:, lowIndices]
+        return numpy.sqrt(bandPower * scale).astype(numpy.float32)
+
+    chunkStarts = range(0, frameAmount, framesPerChunk)
+    if not useThreads or len(chunkStarts) <= 1:
+        for start in chunkStarts:
+            yield calculateChunk(start)
+        return
+
+    # the fft releases the GIL, so the chunks can be calculated at the same time;
+    # only a few chunks are submitted in advance so that stopping early is fast
+    workerAmount = os.cpu_count() or 1
+    executor = ThreadPoolExecutor(max_workers = workerAmount)
+    pending = deque()
+    try:
+        for start in chunkStarts:
+            pending.append(executor.submit(calculateChunk, start))
+            if len(pending) >= workerAmount * 2:
+                yield pending.popleft().result()
+        while len(pending) > 0:
+            yield pending.popleft().result()
+    finally:
+        for future in pending:
+            future.cancel()
+        executor.shutdown()
+
+def getFrameAmount(sampleAmount, sampleRate, fps):
+    return int(numpy.ceil(sampleAmount / (sampleRate / fps)))
+
+def getWindowSize(hopSize):
+    '''Power of two that covers at least two frames.'''
+    return max(256, 2 ** int(numpy.ceil(numpy.log2(hopSize * 2))))
+
+def getBinIndices(frequencyRanges, sampleRate, windowSize):
+    binAmount = windowSize // 2 + 1
+    binWidth = sampleRate / windowSize
+    lowIndices, highIndices = [], []
+    for low, high in frequencyRanges:
+        lowIndex = min(max(int(numpy.ceil(low / binWidth)), 0), binAmount)
+        highIndex = min(max(int(numpy.ceil(high / binWidth)), lowIndex), binAmount)
+        lowIndices.append(lowIndex)
+        highIndices.append(highIndex)
+    return numpy.array(lowIndices), numpy.array(highIndices)
+
+def applyEnvelope(amplitudes, fps, attack, release):
+    '''
+    Smooths the amplitudes of every column over time. Rising values approach
+    the target with the attack time, falling values with the release time.
+    '''
+    attackFactor = getSmoothingFactor(attack, fps)
+    releaseFactor = getSmoothingFactor(release, fps)
+
+    result = numpy.empty_like(amplitudes)
+    current = numpy.zeros(amplitudes.shape[1:], dtype = amplitudes.dtype)
+    for i, target in enumerate(amplitudes):
+        factor = numpy.where(target > current, attackFactor, releaseFactor)
+        current = target + (current - target) * factor
+        result[i] = current
+    return result
+
+def getSmoothingFactor(duration, fps):
+    if duration <= 0:
+        return 0.0
+    return float(numpy.exp(-1 / (duration * fps)))
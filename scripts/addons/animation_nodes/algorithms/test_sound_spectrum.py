@@ -0,0 +1,37 @@
+import numpy
+from unittest import TestCase
+from . sound_spectrum import calculateFrequencyRangeAmplitudes, iterFrequencyRangeAmplitudeChunks, applyEnvelope, framesPerChunk
+
+class TestFrequencyRangeAmplitudes(TestCase):
+    def testSineWave(self):
+        sampleRate = 44100
+        time = numpy.arange(sampleRate * 2) / sampleRate
+        samples = 0.5 * numpy.sin(2 * numpy.pi * 440 * time)
+        amplitudes = calculateFrequencyRangeAmplitudes(samples, sampleRate, 25, [(400, 500), (1000, 2000)])
+        self.assertEqual(amplitudes.shape, (50, 2))
+        self.assertAlmostEqual(float(amplitudes[25, 0]), 0.5, places = 3)
+        self.assertAlmostEqual(float(amplitudes[25, 1]), 0.0, places = 3)
+
+    def testChunksAreEqual(self):
+        samples = numpy.random.RandomState(0).uniform(-1, 1, 44100 * 30)
+        ranges = [(0, 100), (100, 5000)]
+        a = calculateFrequencyRangeAmplitudes(samples, 44100, 24, ranges, useThreads = False)
+        b = calculateFrequencyRangeAmplitudes(samples, 44100, 24, ranges, useThreads = True)
+        self.assertTrue(numpy.allclose(a, b))
+
+    def testChunkSizes(self):
+        samples = numpy.zeros(44100 * 60)
+        chunks = list(iterFrequencyRangeAmplitudeChunks(samples, 44100, 24, [(0, 100)]))
+        self.assertEqual(sum(len(chunk) for chunk in chunks), 60 * 24)
+        self.assertTrue(all(len(chunk) == framesPerChunk for chunk in chunks[:-1]))
+
+class TestEnvelope(TestCase):
+    def testNoSmoothing(self):
+        amplitudes = numpy.array([[0], [1], [0]], dtype = numpy.float32)
+        self.assertEqual(applyEnvelope(amplitudes, 24, 0, 0).tolist(), [[0], [1], [0]])
+
+    def testRelease(self):
+        amplitudes = numpy.array([[1], [0], [0]], dtype = numpy.float32)
+        result = applyEnvelope(amplitudes, 24, 0, 1)
+        self.assertEqual(result[0, 0], 1)
+        self.assertTrue(1 > result[1, 0] > result[2, 0] > 0)
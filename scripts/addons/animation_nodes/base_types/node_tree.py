@@ -3,10 +3,14 @@ import time
 from bpy.props import *
 from .. utils.handlers import eventHandler
 from .. utils.nodes import getAnimationNodeTrees
+from . tree_frame_cache import FrameCacheProperties
 from . tree_auto_execution import AutoExecutionProperties
 from .. events import treeChanged, isRendering, propertyChanged
 from .. utils.blender_ui import iterActiveScreens, isViewportRendering
 from .. preferences import getBlenderVersion, getAnimationNodesVersion
+from .. execution.measurements import getTimeline
+from .. execution.frame_cache import applyCachedFrame
+from .. execution.auto_execution import dependsOnUpdatedIDs
 from .. tree_info import getNetworksByNodeTree, getSubprogramNetworksByNodeTree
 from .. execution.units import getMainUnitsByNodeTree, setupExecutionUnits, finishExecutionUnits
 
@@ -42,6 +46,7 @@ class AnimationNodeTree(bpy.types.NodeTree):
     bl_icon = "ONIONSKIN_ON"
 
     autoExecution: PointerProperty(type = AutoExecutionProperties)
+    frameCache: PointerProperty(type = FrameCacheProperties)
     lastExecutionInfo: PointerProperty(type = LastTreeExecutionInfo)
 
     globalScene: PointerProperty(type = bpy.types.Scene, name = "Scene",
@@ -50,9 +55,9 @@ class AnimationNodeTree(bpy.types.NodeTree):
     editNodeLabels: BoolProperty(name = "Edit Node Labels", default = False)
 
     def update(self):
-        treeChanged()
+        treeChanged(self)
 
-    def canAutoExecute(self, events):
+    def canAutoExecute(self, events, updatedIDs = None):
         def isAnimationPlaying():
             return any([screen.is_animation_playing for screen in iterActiveScreens()])
 
@@ -73,7 +78,8 @@ class AnimationNodeTree(bpy.types.NodeTree):
             if isAnimationPlaying():
                 if (a.sceneUpdate or a.frameChanged) and "Frame" in events: return True
             elif not isViewportRendering():
-                if "Scene" in events and a.sceneUpdate: return True
+                if "Scene" in events and a.sceneUpdate:
+                    if self.isAffectedBySceneUpdate(events, updatedIDs): return True
             if "Frame" in events and a.frameChanged: return True
             if "Property" in events and a.propertyChanged: return True
             if "Tree" in events and a.treeChanged: return True
@@ -82,8 +88,15 @@ class AnimationNodeTree(bpy.types.NodeTree):
 
         return customTriggerHasBeenActivated
 
+    def isAffectedBySceneUpdate(self, events, updatedIDs):
+        # scene updates happen all the time, most of them change nothing the tree reads
+        if updatedIDs is None: return True
+        if events.intersection({"Frame", "Property", "Tree", "File", "Addon"}): return True
+        return dependsOnUpdatedIDs(self, updatedIDs)
+
     def autoExecute(self):
-        self._execute()
+        if not applyCachedFrame(self):
+            self._execute()
         self.autoExecution.lastExecutionTimestamp = time.clock()
 
     def execute(self):
@@ -98,6 +111,7 @@ class AnimationNodeTree(bpy.types.NodeTree):
             return
 
         allExecutionsSuccessfull = True
+        getTimeline().startExecution()
 
         start = time.perf_counter()
         for unit in units:
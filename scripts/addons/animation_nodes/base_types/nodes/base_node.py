@@ -55,7 +55,18 @@ class AnimationNode:
     onlySearchTags = False
 
     # can contain: 'NO_EXECUTION', 'NOT_IN_SUBPROGRAM',
-    #              'NO_AUTO_EXECUTION'
+    #              'NO_AUTO_EXECUTION', 'IGNORES_ID_UPDATES',
+    #              'UNKNOWN_DEPENDENCIES', 'KEEPS_INPUTS',
+    #              'WRITES_BLENDER_DATA'
+    # 'IGNORES_ID_UPDATES': changes of the IDs passed into the node do not
+    #                       change its result, e.g. it only writes to them
+    # 'UNKNOWN_DEPENDENCIES': the node reads Blender data that is not passed
+    #                         in through its sockets
+    # 'KEEPS_INPUTS': the node stores references to its input data that are
+    #                 used after the execution, e.g. for drawing
+    # 'WRITES_BLENDER_DATA': the execution changes Blender data, trees with
+    #                        such nodes can only use the frame cache when
+    #                        the node has frame cache code
     options = set()
 
     # can be "NONE", "ALWAYS" or "HIDDEN_ONLY"
@@ -135,6 +146,9 @@ class AnimationNode:
     def getBakeCode(self):
         return []
 
+    def getFrameCacheCode(self):
+        return []
+
     def getUsedModules(self):
         return []
 
@@ -552,7 +566,7 @@ class AnimationNode:
     # Code Generation
     ####################################################
 
-    def getLocalExecutionCode(self, required, bake = False):
+    def getLocalExecutionCode(self, required, bake = False, recordFrame = False):
         inputVariables = self.getInputSocketVariables()
         outputVariables = self.getOutputSocketVariables()
 
@@ -564,6 +578,8 @@ class AnimationNode:
 
         if bake:
             code = "\n".join((code, toString(self.getBakeCode())))
+        if recordFrame:
+            code = "\n".join((code, toString(self.getFrameCacheCode())))
 
         return self.applyCodeEffects(code, required)
 
@@ -37,12 +37,16 @@ class SocketLoopProperties(bpy.types.PropertyGroup):
 class SocketExecutionProperties(bpy.types.PropertyGroup):
     bl_idname = "an_SocketExecutionProperties"
     neededCopies: IntProperty(default = 0, min = 0)
+    avoidedCopies: IntProperty(default = 0, min = 0)
 
 colorOverwritePerSocket = dict()
 
 class AnimationNodeSocket:
     storable = True
     comparable = False
+    # the value only depends on properties of the socket that call propertyChanged,
+    # so it does not have to be loaded again before every execution
+    staticValue = False
     _isAnimationNodeSocket = True
 
     def textChanged(self, context):
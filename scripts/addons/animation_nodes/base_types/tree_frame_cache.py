@@ -0,0 +1,14 @@
+import bpy
+from bpy.props import *
+
+class FrameCacheProperties(bpy.types.PropertyGroup):
+    bl_idname = "an_FrameCacheProperties"
+
+    enabled: BoolProperty(default = False, name = "Enabled",
+        description = "Apply cached frames instead of executing the tree")
+
+    directory: StringProperty(name = "Directory", default = "//an_cache", subtype = "DIR_PATH",
+        description = "Folder of the cache file (temporary folder when the file is not saved)")
+
+    startFrame: IntProperty(name = "Start Frame", default = 1)
+    endFrame: IntProperty(name = "End Frame", default = 250)
@@ -0,0 +1,226 @@
+'''
+Headless benchmark runner for Animation Nodes trees.
+
+Usage:
+    blender -b file.blend --python-expr "import animation_nodes.benchmark as b; b.runFromCommandLine()" -- \
+        --output result.json [--trees A B] [--frames 1 250] [--repetitions 3] \
+        [--mode MEASURE|DEFAULT] [--memory] [--compare baseline.json] [--threshold 1.2]
+
+With --memory the peak Python memory is measured in an extra pass after the
+timed executions, because tracing allocations slows down the execution.
+
+With --compare the process exits with code 1 when a tree or node got slower
+than threshold times its median time in the baseline file.
+'''
+
+import bpy
+import sys
+import json
+import time
+import argparse
+import tracemalloc
+from collections import defaultdict
+from . import problems
+from . utils.nodes import getAnimationNodeTrees
+from . execution.measurements import getTimeline
+from . preferences import getExecutionCodeSettings, getBlenderVersion, getAnimationNodesVersion
+
+def runFromCommandLine():
+    arguments = parseArguments(getScriptArguments())
+    result = runBenchmark(
+        treeNames = arguments.trees,
+        frames = getFrames(arguments.frames),
+        repetitions = arguments.repetitions,
+        mode = arguments.mode,
+        measureMemory = arguments.memory)
+
+    with open(arguments.output, "w") as f:
+        json.dump(result, f, indent = 2)
+    print("Benchmark result written to {}".format(arguments.output))
+
+    if arguments.compare is not None:
+        with open(arguments.compare) as f:
+            baseline = json.load(f)
+        slowdowns = findSlowdowns(baseline, result, arguments.threshold)
+        for message in slowdowns:
+            print("SLOWDOWN: " + message)
+        if len(slowdowns) > 0:
+            sys.exit(1)
+
+def getScriptArguments():
+    if "--" in sys.argv:
+        return sys.argv[sys.argv.index("--") + 1:]
+    return []
+
+def parseArguments(argv):
+    parser = argparse.ArgumentParser(prog = "animation_nodes.benchmark")
+    parser.add_argument("--output", required = True, help = "Path of the json result file")
+    parser.add_argument("--trees", nargs = "*", default = None, help = "Names of the trees (default: all)")
+    parser.add_argument("--frames", nargs = 2, type = int, default = None,
+        metavar = ("START", "END"), help = "Frame range (default: scene range)")
+    parser.add_argument("--repetitions", type = int, default = 1, help = "Executions per frame")
+    parser.add_argument("--mode", choices = ("MEASURE", "DEFAULT"), default = "MEASURE",
+        help = "MEASURE also reports per-node times but adds a small overhead")
+    parser.add_argument("--memory", action = "store_true",
+        help = "Measure the peak Python memory in an extra untimed pass")
+    parser.add_argument("--compare", default = None, help = "Baseline json file")
+    parser.add_argument("--threshold", type = float, default = 1.2,
+        help = "Allowed ratio between new and baseline median time")
+    return parser.parse_args(argv)
+
+def getFrames(frameRange):
+    if frameRange is None:
+        scene = bpy.context.scene
+        return list(range(scene.frame_start, scene.frame_end + 1))
+    return list(range(frameRange[0], frameRange[1] + 1))
+
+
+# Benchmark
+##########################################
+
+def runBenchmark(treeNames = None, frames = [1], repetitions = 1, mode = "MEASURE", measureMemory = False):
+    from . update import updateEverything
+    from . execution.measurements import resetMeasurements, resetTimeline
+
+    settings = getExecutionCodeSettings()
+    oldMode = settings.type
+    settings.type = mode
+
+    try:
+        updateEverything()
+        if not problems.canExecute():
+            raise Exception("The node trees cannot be executed in this file")
+
+        nodeTrees = getBenchmarkTrees(treeNames)
+        resetMeasurements()
+        resetTimeline()
+
+        timesByTree = defaultdict(list)
+        nodeTimes = defaultdict(list)
+        scene = bpy.context.scene
+
+        for frame in frames:
+            scene.frame_set(frame)
+            getTimeline().frame = frame
+            for nodeTree in nodeTrees:
+                for _ in range(repetitions):
+                    start = time.perf_counter()
+                    nodeTree.execute()
+                    end = time.perf_counter()
+                    timesByTree[nodeTree.name].append(end - start)
+                    drainTimeline(nodeTimes)
+
+        peakMemory = measurePeakMemory(nodeTrees, frames) if measureMemory else None
+    finally:
+        if tracemalloc.is_tracing():
+            tracemalloc.stop()
+        settings.type = oldMode
+
+    return {
+        "file" : bpy.data.filepath,
+        "blenderVersion" : list(getBlenderVersion()),
+        "animationNodesVersion" : list(getAnimationNodesVersion()),
+        "mode" : mode,
+        "frames" : [frames[0], frames[-1]] if len(frames) > 0 else [],
+        "repetitions" : repetitions,
+        "peakPythonMemory" : peakMemory,
+        "peakProcessMemory" : getPeakProcessMemory(),
+        "trees" : {name : getStatistics(times) for name, times in timesByTree.items()},
+        "nodes" : getNodeResults(nodeTimes)
+    }
+
+def drainTimeline(nodeTimes):
+    '''
+    The timeline is a ring buffer, so it is emptied after every execution.
+    Otherwise the oldest events would be dropped silently in long benchmarks.
+    '''
+    events = getTimeline().events
+    if len(events) == events.maxlen:
+        raise Exception("A single execution created more than {:,d} timeline events, "
+                        "per-node statistics would be incomplete".format(events.maxlen))
+    for event in events:
+        nodeTimes[event.identifier].append(event.duration)
+    events.clear()
+
+def measurePeakMemory(nodeTrees, frames):
+    '''Executes every tree once per frame while allocations are traced.'''
+    scene = bpy.context.scene
+    tracemalloc.start()
+    for frame in frames:
+        scene.frame_set(frame)
+        for nodeTree in nodeTrees:
+            nodeTree.execute()
+    _, peakMemory = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peakMemory
+
+def getBenchmarkTrees(treeNames):
+    nodeTrees = getAnimationNodeTrees()
+    if treeNames is None:
+        return nodeTrees
+    treeByName = {nodeTree.name : nodeTree for nodeTree in nodeTrees}
+    for name in treeNames:
+        if name not in treeByName:
+            raise Exception("There is no Animation Nodes tree called {}".format(repr(name)))
+    return [treeByName[name] for name in treeNames]
+
+def getNodeResults(nodeTimes):
+    from . tree_info import getNodeByIdentifier
+    results = {}
+    for identifier, times in nodeTimes.items():
+        result = getStatistics(times)
+        try:
+            node = getNodeByIdentifier(identifier)
+            result["name"] = node.name
+            result["tree"] = node.nodeTree.name
+        except: pass
+        results[identifier] = result
+    return results
+
+def getStatistics(times):
+    times = sorted(times)
+    return {
+        "calls" : len(times),
+        "total" : sum(times),
+        "min" : times[0],
+        "max" : times[-1],
+        "mean" : sum(times) / len(times),
+        "p50" : getPercentile(times, 50),
+        "p90" : getPercentile(times, 90),
+        "p99" : getPercentile(times, 99)
+    }
+
+def getPercentile(sortedValues, percent):
+    '''Linear interpolation between the closest ranks.'''
+    position = (len(sortedValues) - 1) * percent / 100
+    lower = int(position)
+    upper = min(lower + 1, len(sortedValues) - 1)
+    factor = position - lower
+    return sortedValues[lower] * (1 - factor) + sortedValues[upper] * factor
+
+def getPeakProcessMemory():
+    try:
+        import resource
+        # kilobytes on Linux, bytes on macOS
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == "darwin" else peak * 1024
+    except:
+        return None
+
+
+# Comparison
+##########################################
+
+def findSlowdowns(baseline, result, threshold):
+    messages = []
+    for category in ("trees", "nodes"):
+        oldResults = baseline.get(category, {})
+        for key, newResult in result.get(category, {}).items():
+            if key not in oldResults: continue
+            oldTime = oldResults[key]["p50"]
+            newTime = newResult["p50"]
+            if oldTime > 0 and newTime / oldTime > threshold:
+                name = newResult.get("name", key)
+                messages.append("{} {}: {:.3f} ms -> {:.3f} ms ({:.2f}x)".format(
+                    category[:-1], repr(name), oldTime * 1000, newTime * 1000, newTime / oldTime))
+    return messages
@@ -2,8 +2,9 @@ import bpy
 import itertools
 from . import problems
 from . update import updateEverything
+from . utils.handlers import eventHandler
 from . utils.recursion import noRecursion
-from . utils.nodes import iterNodesInAnimationNodeTrees, getAnimationNodeTrees
+from . utils.nodes import iterAnimationNodeClasses, getAnimationNodeTrees
 from . execution.units import setupExecutionUnits, finishExecutionUnits
 from . execution.auto_execution import iterAutoExecutionNodeTrees, executeNodeTrees, afterExecution
 
@@ -34,18 +35,45 @@ def failsToWriteToIDClasses():
         return False
     except: return True
 
-oldNamesHash = 0
+
+# there is no handler for renamed nodes and trees, the message bus reports them
+# renames done with the Python API are not reported, as a cheap fallback the tree
+# names are compared on every event, nodes renamed that way are only noticed
+# with the next tree update
+namesChanged = True
+nameSubscriptionOwner = object()
+oldTreeNamesHash = 0
 
 def didNameChange():
-    global oldNamesHash
-    newHash = getNamesHash()
-    if newHash != oldNamesHash:
-        oldNamesHash = newHash
+    global namesChanged, oldTreeNamesHash
+    newHash = getTreeNamesHash()
+    if namesChanged or newHash != oldTreeNamesHash:
+        namesChanged = False
+        oldTreeNamesHash = newHash
         return True
     return False
 
-def getNamesHash():
-    names = set(itertools.chain(
-        (tree.name for tree in getAnimationNodeTrees()),
-        (node.name for node in iterNodesInAnimationNodeTrees())))
-    return names
+def getTreeNamesHash():
+    return hash(tuple(tree.name for tree in getAnimationNodeTrees()))
+
+def nameChanged():
+    global namesChanged
+    namesChanged = True
+
+@eventHandler("FILE_LOAD_POST")
+@eventHandler("UNDO_POST")
+@eventHandler("REDO_POST")
+def subscribeToNameChanges():
+    # subscriptions are removed when a file is loaded
+    from . base_types.node_tree import AnimationNodeTree
+    nameChanged()
+    bpy.msgbus.clear_by_owner(nameSubscriptionOwner)
+    for cls in itertools.chain([AnimationNodeTree], iterAnimationNodeClasses()):
+        bpy.msgbus.subscribe_rna(key = (cls, "name"), owner = nameSubscriptionOwner,
+                                 args = (), notify = nameChanged)
+
+def register():
+    subscribeToNameChanges()
+
+def unregister():
+    bpy.msgbus.clear_by_owner(nameSubscriptionOwner)
@@ -2,6 +2,10 @@ import bpy
 from . import tree_info
 from . import event_handler
 from . utils.handlers import eventHandler
+from . execution.units import socketValueChanged
+from . execution.auto_execution import resetDependencies
+from . execution.frame_cache import resetTreeSignatures
+from . execution.incremental import resetNodeCaches
 from . execution.measurements import resetMeasurements
 
 class EventState:
@@ -56,6 +60,11 @@ def frameChanged(scene):
 def propertyChanged(self = None, context = None):
     event.propertyChanged = True
     resetMeasurements()
+    resetNodeCaches()
+    resetDependencies()
+    resetTreeSignatures()
+    if getattr(self, "_isAnimationNodeSocket", False):
+        socketValueChanged(self)
 
 @eventHandler("FILE_LOAD_POST")
 def fileLoaded():
@@ -73,15 +82,15 @@ def addonChanged():
     treeChanged()
 
 def executionCodeChanged(self = None, context = None):
-    treeChanged()
+    treeChanged(self)
     propertyChanged()
 
 def networkChanged(self = None, context = None):
-    treeChanged()
+    treeChanged(self)
 
 def treeChanged(self = None, context = None):
     event.treeChanged = True
-    tree_info.treeChanged()
+    tree_info.treeChanged(getattr(self, "id_data", None))
 
 
 @eventHandler("RENDER_INIT")
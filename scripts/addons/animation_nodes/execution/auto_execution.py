@@ -2,12 +2,17 @@ import bpy
 from .. import problems
 from .. preferences import getPreferences
 from .. utils.blender_ui import redrawAll
-from .. utils.nodes import getAnimationNodeTrees
+from .. utils.handlers import eventHandler
+from .. tree_info import (getNetworksByNodeTree, getNetworkByIdentifier, isSocketLinked,
+                         iterLinkedSocketsWithNodes)
+from .. utils.nodes import getAnimationNodeTrees, createNodeByIdDict
+from . code_generator import socketValueIsStatic
 
 def iterAutoExecutionNodeTrees(events):
+    updatedIDs = popUpdatedIDPointers()
     if not problems.canExecute(): return
     for nodeTree in getAnimationNodeTrees():
-        if nodeTree.canAutoExecute(events):
+        if nodeTree.canAutoExecute(events, updatedIDs):
             yield nodeTree
 
 def executeNodeTrees(nodeTrees):
@@ -21,3 +26,125 @@ def afterExecution():
     from .. events import isRendering
     if not isRendering():
         redrawAll()
+
+
+# Dependencies
+##########################################
+
+# sockets of these types can pass IDs that are only known during the execution
+idDataTypes = {
+    "Object", "Object List", "Collection", "Collection List",
+    "Scene", "Scene List", "Text Block", "Text Block List", "Font", "Font List",
+    "Shape Key", "Shape Key List", "Sequence", "Sequence List",
+    "Particle System", "Particle System List"}
+
+updatedIDPointers = set()
+dependenciesByTreeName = {}
+
+@eventHandler("DEPSGRAPH_UPDATE_POST")
+def collectUpdatedIDs(depsgraph):
+    for update in depsgraph.updates:
+        updatedIDPointers.add(update.id.original.as_pointer())
+
+def popUpdatedIDPointers():
+    pointers = set(updatedIDPointers)
+    updatedIDPointers.clear()
+    return pointers
+
+@eventHandler("FILE_LOAD_POST")
+@eventHandler("UNDO_POST")
+@eventHandler("REDO_POST")
+def resetDependencies():
+    dependenciesByTreeName.clear()
+
+def dependsOnUpdatedIDs(nodeTree, updatedIDs):
+    dependencies = getTreeDependencies(nodeTree)
+    return dependencies is None or not dependencies.isdisjoint(updatedIDs)
+
+def getTreeDependencies(nodeTree):
+    if nodeTree.name not in dependenciesByTreeName:
+        try: dependencies = findTreeDependencies(nodeTree)
+        except: dependencies = None
+        dependenciesByTreeName[nodeTree.name] = dependencies
+    return dependenciesByTreeName[nodeTree.name]
+
+def findTreeDependencies(nodeTree):
+    '''
+    Pointers of the IDs that are read by the main networks of the tree and by
+    the subprograms they invoke. None when they are only known during the execution.
+    '''
+    nodeByID = createNodeByIdDict()
+    dependencies = set()
+    for node in iterNodesUsedByTree(nodeTree, nodeByID):
+        if "UNKNOWN_DEPENDENCIES" in node.options: return None
+        if "IGNORES_ID_UPDATES" in node.options: continue
+
+        for socket in node.inputs:
+            if isSocketLinked(socket, node):
+                if socket.dataType in idDataTypes:
+                    pointers = getPassedIDPointers(socket, node, nodeByID)
+                    if pointers is None: return None
+                    dependencies.update(pointers)
+            elif not socketValueIsStatic(socket):
+                dependencies.update(iterSocketIDPointers(socket))
+    return dependencies
+
+def getPassedIDPointers(socket, node, nodeByID):
+    '''
+    Follows a linked input back through nodes that pass their input through
+    unchanged (like Data Input) to the unlinked socket the IDs come from.
+    None when the IDs are computed during the execution.
+    '''
+    pointers = set()
+    for originSocket, originNode in iterLinkedSocketsWithNodes(socket, node, nodeByID):
+        passedInput = getPassedInputSocket(originSocket, originNode)
+        if passedInput is None:
+            return None
+        if isSocketLinked(passedInput, originNode):
+            passedPointers = getPassedIDPointers(passedInput, originNode, nodeByID)
+            if passedPointers is None: return None
+            pointers.update(passedPointers)
+        else:
+            pointers.update(iterSocketIDPointers(passedInput))
+    return pointers
+
+def getPassedInputSocket(outputSocket, node):
+    for inputIdentifier, outputIdentifier in node.iterInnerLinks():
+        if outputIdentifier == outputSocket.identifier:
+            return node.inputs[inputIdentifier]
+    return None
+
+def iterSocketIDPointers(socket):
+    yield from iterIDPointers(socket.getValue())
+    yield from iterIDPointers(getattr(socket, "object", None))
+
+def iterNodesUsedByTree(nodeTree, nodeByID):
+    networks = [network for network in getNetworksByNodeTree(nodeTree) if network.type == "Main"]
+    visitedIdentifiers = set()
+    while len(networks) > 0:
+        network = networks.pop()
+        yield from network.getAnimationNodes(nodeByID)
+
+        for identifier in network.getInvokedSubprogramIdentifiers(nodeByID):
+            if identifier in visitedIdentifiers: continue
+            visitedIdentifiers.add(identifier)
+            subprogram = getNetworkByIdentifier(identifier)
+            if subprogram is not None:
+                networks.append(subprogram)
+
+def iterIDPointers(value):
+    if isinstance(value, (list, tuple)):
+        for element in value:
+            yield from iterIDPointers(element)
+    elif isinstance(value, bpy.types.Collection):
+        yield value.as_pointer()
+        for object in value.all_objects:
+            yield from iterIDPointers(object)
+    elif isinstance(value, bpy.types.Object):
+        yield value.as_pointer()
+        if value.data is not None:
+            yield value.data.as_pointer()
+    elif isinstance(value, bpy.types.ID):
+        yield value.as_pointer()
+    elif isinstance(value, bpy.types.bpy_struct):
+        yield value.id_data.as_pointer()
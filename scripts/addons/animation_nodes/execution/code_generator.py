@@ -5,9 +5,10 @@ from .. utils.names import replaceVariableName
 from .. sockets.info import getAllowedInputDataTypes
 from .. sockets.implicit_conversion import getConversionCode
 from .. problems import NodeFailesToCreateExecutionCode
+from . frame_cache import isRecordingFrameCache
 from .. preferences import addonName, getExecutionCodeType
-from .. tree_info import (iterLinkedSocketsWithInfo, isSocketLinked,
-                          iterLinkedInputSocketsWithOriginDataType)
+from .. tree_info import (iterLinkedSocketsWithInfo, isSocketLinked, getOriginNodes,
+                          iterLinkedInputSocketsWithOriginDataType, iterLinkedSocketsWithNodes)
 
 
 
@@ -32,6 +33,13 @@ def getInitialVariables(nodes):
 def iterSetupCodeLines(nodes, variables):
     yield from iter_Imports(nodes)
     yield get_LoadMeasurementsDict()
+    mode = getExecutionCodeType()
+    if mode == "MEASURE":
+        yield get_LoadTimeline()
+    elif mode == "INCREMENTAL":
+        yield from iter_LoadNodeCaches()
+    elif mode == "BAKE":
+        yield get_LoadKeyframeRecorder()
     yield from iter_GetNodeReferences(nodes)
     yield from iter_GetSocketValues(nodes, variables)
 
@@ -47,7 +55,8 @@ def iter_Imports(nodes = []):
 def get_ImportModules(nodes):
     neededModules = {"bpy", "sys"}
     neededModules.update(getModulesNeededByNodes(nodes))
-    modulesString = ", ".join(neededModules)
+    # sorted, so that the same tree always creates the same code
+    modulesString = ", ".join(sorted(neededModules))
     return "import " + modulesString
 
 def getModulesNeededByNodes(nodes):
@@ -59,6 +68,16 @@ def getModulesNeededByNodes(nodes):
 def get_LoadMeasurementsDict():
     return "_node_execution_times = animation_nodes.execution.measurements.getMeasurementsDict()"
 
+def get_LoadTimeline():
+    return "_node_timeline = animation_nodes.execution.measurements.getTimeline()"
+
+def iter_LoadNodeCaches():
+    yield "_node_caches = animation_nodes.execution.incremental.getNodeCaches()"
+    yield "_get_fingerprint = animation_nodes.execution.incremental.getFingerprint"
+
+def get_LoadKeyframeRecorder():
+    return "_keyframe_recorder = animation_nodes.execution.keyframe_bake.getKeyframeRecorder()"
+
 def iter_GetNodeReferences(nodes):
     yield "nodes = bpy.data.node_groups[{}].nodes".format(repr(nodes[0].nodeTree.name))
     for node in nodes:
@@ -70,6 +89,22 @@ def iter_GetSocketValues(nodes, variables):
             if not isSocketLinked(socket, node):
                 yield getLoadSocketValueLine(socket, node, variables, i)
 
+def getSocketValueLoadLines(nodes, variables):
+    '''
+    Returns the variable name and load line of every unlinked socket by socket pointer.
+    Has to be called before the variables are changed by the execution code.
+    '''
+    linesBySocket = {}
+    for node in nodes:
+        for i, socket in enumerate(node.inputs):
+            if not isSocketLinked(socket, node):
+                line = getLoadSocketValueLine(socket, node, variables, i)
+                linesBySocket[socket.as_pointer()] = (variables[socket], line, socketValueIsStatic(socket))
+    return linesBySocket
+
+def socketValueIsStatic(socket):
+    return socket.staticValue or not hasattr(socket, "getValue")
+
 def getLoadSocketValueLine(socket, node, variables, index = None):
     return "{} = {}".format(variables[socket], getSocketValueExpression(socket, node, index))
 
@@ -108,6 +143,9 @@ def getFunction_IterNodeExecutionLines():
         return iterNodeExecutionLines_MeasureTimes
     elif mode == "BAKE":
         return iterNodeExecutionLines_Bake
+    elif mode == "INCREMENTAL":
+        # only main execution units skip nodes, see iterNodeExecutionLines_Incremental
+        return iterNodeExecutionLines_Basic
 
 def iterNodeExecutionLines_Basic(node, variables):
     yield from iterNodeCommentLines(node)
@@ -142,6 +180,9 @@ def iterNodeExecutionLines_MeasureTimes(node, variables):
         yield from iterRealNodeExecutionLines(node, variables)
         yield "_execution_end_time = getCurrentTime()"
         yield "_node_execution_times[{}].registerTime(_execution_end_time - _execution_start_time)".format(repr(node.identifier))
+        outputNames = [variables[socket] for socket in node.linkedOutputs]
+        yield "_node_timeline.record({}, _execution_start_time, _execution_end_time, ({}))".format(
+            repr(node.identifier), "".join(name + ", " for name in outputNames))
     except:
         handleExecutionCodeCreationException(node)
 
@@ -153,6 +194,73 @@ def iterNodeExecutionLines_Bake(node, variables):
     except:
         handleExecutionCodeCreationException(node)
 
+def iterNodeExecutionLines_Incremental(node, variables, nodeByID):
+    '''
+    The node is only executed when the versions of the origin nodes or the
+    fingerprints of the unlinked inputs changed. Otherwise the outputs of
+    the last execution are reused.
+    '''
+    yield from iterNodeCommentLines(node)
+    yield "_node_cache = _node_caches[{}]".format(repr(node.identifier))
+    try:
+        canBeSkipped = nodeExecutionCanBeSkipped(node)
+        if canBeSkipped:
+            keyExpression = getNodeCacheKeyExpression(node, variables, nodeByID)
+
+        executionLines = []
+        executionLines.extend(iterInputConversionLines(node, variables))
+        executionLines.extend(iterInputCopyLines(node, variables))
+        executionLines.extend(iterLinkedInputCopyLines(node, variables))
+        resolveInnerLinks(node, variables)
+        executionLines.extend(iterRealNodeExecutionLines(node, variables))
+        outputNames = [variables[socket] for socket in node.linkedOutputs]
+        outputsExpression = "({})".format("".join(name + ", " for name in outputNames))
+    except:
+        handleExecutionCodeCreationException(node)
+
+    if canBeSkipped:
+        yield "_node_key = " + keyExpression
+        yield "if _node_cache.key == _node_key:"
+        if len(outputNames) > 0:
+            yield "    {} = _node_cache.outputs".format(outputsExpression)
+        else:
+            yield "    pass"
+        yield "else:"
+        for line in executionLines:
+            yield "    " + line
+        yield "    _node_cache.store(_node_key, {})".format(outputsExpression)
+    else:
+        yield from executionLines
+        yield "_node_cache.store(None, {})".format(outputsExpression)
+
+def nodeExecutionCanBeSkipped(node):
+    if node.bl_idname == "an_InvokeSubprogramNode": return False
+    if any(True for _ in node.iterInnerLinks()): return False
+    # nodes without inputs get their data from somewhere else
+    return any(socket.dataType != "Node Control" for socket in node.inputs)
+
+def getNodeCacheKeyExpression(node, variables, nodeByID):
+    parts = []
+    originNodes = sorted(getOriginNodes(node, nodeByID), key = lambda n: n.identifier)
+    for originNode in originNodes:
+        parts.append("_node_caches[{}].version".format(repr(originNode.identifier)))
+    for socket in node.unlinkedInputs:
+        if socket.dataType != "Node Control":
+            parts.append("_get_fingerprint({})".format(variables[socket]))
+    return "({})".format("".join(part + ", " for part in parts))
+
+def iterLinkedInputCopyLines(node, variables):
+    '''
+    Cached outputs must not be modified, so every node
+    that modifies a linked input has to copy it first.
+    '''
+    for socket in node.inputs:
+        if socket.dataIsModified and socket.isCopyable() and isSocketLinked(socket, node):
+            newName = variables[socket] + "_copy"
+            line = getCopyLine(socket, newName, variables)
+            variables[socket] = newName
+            yield line
+
 def iterNodeCommentLines(node):
     yield ""
     yield "# Node: {} - {}".format(repr(node.nodeTree.name), repr(node.name))
@@ -190,7 +298,8 @@ def iterInputCopyLines(node, variables):
 
 def iterRealNodeExecutionLines(node, variables, bake = False):
     requiredOutputs = getRequiredOutputIdentifiers(node)
-    localCode = node.getLocalExecutionCode(requiredOutputs, bake)
+    recordFrame = isRecordingFrameCache(node.nodeTree)
+    localCode = node.getLocalExecutionCode(requiredOutputs, bake, recordFrame)
     globalCode = makeGlobalExecutionCode(localCode, node, variables)
     yield from globalCode.splitlines()
 
@@ -228,14 +337,20 @@ def resolveInnerLinks(node, variables):
     for inputName, outputName in node.iterInnerLinks():
         variables[outputs[outputName]] = variables[inputs[inputName]]
 
-def linkOutputSocketsToTargets(node, variables, nodeByID):
+def linkOutputSocketsToTargets(node, variables, nodeByID, executionOrder = None):
     for socket in node.linkedOutputs:
-        yield from linkSocketToTargets(socket, node, variables, nodeByID)
+        yield from linkSocketToTargets(socket, node, variables, nodeByID, executionOrder)
 
-def linkSocketToTargets(socket, node, variables, nodeByID):
-    targets = tuple(iterLinkedSocketsWithInfo(socket, node, nodeByID))
+def linkSocketToTargets(socket, node, variables, nodeByID, executionOrder = None):
+    targets, targetNodes = getTargetsWithNodes(socket, node, nodeByID)
     needACopy = getTargetsThatNeedACopy(socket, targets)
+    avoidedCopy = None
+    if executionOrder is not None and len(needACopy) > 0 and not socket.loop.copyAlways:
+        avoidedCopy = executionOrder.getTargetThatNeedsNoCopy(targets, targetNodes, needACopy)
+        if avoidedCopy is not None:
+            needACopy = [target for target in needACopy if target != avoidedCopy]
     socket.execution.neededCopies = len(needACopy)
+    socket.execution.avoidedCopies = int(avoidedCopy is not None)
 
     for target in targets:
         if target in needACopy:
@@ -243,6 +358,23 @@ def linkSocketToTargets(socket, node, variables, nodeByID):
         else:
             variables[target] = variables[socket]
 
+    if avoidedCopy is not None and getExecutionCodeType() == "MEASURE":
+        yield "_node_execution_times[{}].registerAvoidedCopy({})".format(repr(node.identifier), variables[socket])
+
+def getTargetsWithNodes(socket, node, nodeByID):
+    targets, targetNodes = [], []
+    for target, targetNode in iterLinkedSocketsWithNodes(socket, node, nodeByID):
+        targets.append(target)
+        targetNodes.append(targetNode)
+    return tuple(targets), targetNodes
+
+def linkOutputSocketsToTargets_WithoutCopies(node, variables, nodeByID):
+    for socket in node.linkedOutputs:
+        socket.execution.neededCopies = 0
+        socket.execution.avoidedCopies = 0
+        for target in iterLinkedSocketsWithInfo(socket, node, nodeByID):
+            variables[target] = variables[socket]
+
 def getTargetsThatNeedACopy(socket, targets):
     if not socket.isCopyable(): return []
     modifiedTargets = [target for target in targets if target.dataIsModified]
@@ -251,6 +383,44 @@ def getTargetsThatNeedACopy(socket, targets):
     if len(targets) > len(modifiedTargets): return modifiedTargets
     else: return modifiedTargets[1:]
 
+class ExecutionOrder:
+    '''
+    Order of nodes that are executed one after the other. A node that modifies
+    its input does not need a copy of the data when it is the last node that
+    uses it. Other targets of the same output and all nodes that depend on
+    them have to run before it and must not keep references to the data.
+    '''
+    def __init__(self, nodes, nodeByID):
+        self.positions = {node.identifier : i for i, node in enumerate(nodes)}
+        self.lastDependentPositions = dict(self.positions)
+        self.keepsData = {node.identifier for node in nodes if "KEEPS_INPUTS" in node.options}
+
+        for node in reversed(nodes):
+            for originNode in getOriginNodes(node, nodeByID):
+                identifier = originNode.identifier
+                if identifier not in self.positions: continue
+                self.lastDependentPositions[identifier] = max(
+                    self.lastDependentPositions[identifier],
+                    self.lastDependentPositions[node.identifier])
+                if node.identifier in self.keepsData:
+                    self.keepsData.add(identifier)
+
+    def getTargetThatNeedsNoCopy(self, targets, targetNodes, needACopy):
+        positions = [self.positions.get(node.identifier) for node in targetNodes]
+        if None in positions: return None
+
+        lastIndex = max(range(len(targets)), key = lambda i: positions[i])
+        if targets[lastIndex] not in needACopy: return None
+
+        for i, node in enumerate(targetNodes):
+            # targets that get a copy don't share the data
+            if i == lastIndex or targets[i] in needACopy: continue
+            if targets[i].dataIsModified: return None
+            if positions[i] == positions[lastIndex]: return None
+            if self.lastDependentPositions[node.identifier] >= positions[lastIndex]: return None
+            if node.identifier in self.keepsData: return None
+        return targets[lastIndex]
+
 def getCopyLine(fromSocket, targetName, variables):
     return "{} = {}".format(targetName, getCopyExpression(fromSocket, variables))
 
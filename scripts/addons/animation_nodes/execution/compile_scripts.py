@@ -1,20 +1,43 @@
+import os
+import bpy
 import sys
+import marshal
+import hashlib
+import importlib.util
+from collections import OrderedDict
 from .. problems import InvalidSyntax
+from .. utils.operators import makeOperator
 
-cache = {}
+# compiled code objects in memory, least recently used first
+cache = OrderedDict()
+memoryCacheSize = 500
 
-def compileScript(script, name = "<string>"):
-    # clear the cache once in a while
-    if len(cache) == 500:
-        cache.clear()
+# compiled code objects on disk, the least recently used are removed
+# when there are more than diskCacheSize + diskCacheSlack files
+diskCacheSize = 2000
+diskCacheSlack = 200
+diskCacheFileExtension = ".ancode"
+
+# amount of files in the cache directory, counted once and then tracked
+diskCacheFileAmount = None
 
+def compileScript(script, name = "<string>"):
     try:
-        scriptHash = hash(script)
-        if scriptHash not in cache:
-            compiledCode = compile(script, name, "exec")
-            cache[scriptHash] = compiledCode
+        key = getScriptKey(script, name)
+        if key in cache:
+            cache.move_to_end(key)
+            return cache[key]
 
-        return cache[scriptHash]
+        codeObject = loadCachedCodeObject(key)
+        if codeObject is None:
+            codeObject = compile(script, name, "exec")
+            storeCachedCodeObject(key, codeObject)
+
+        cache[key] = codeObject
+        if len(cache) > memoryCacheSize:
+            cache.popitem(last = False)
+
+        return codeObject
 
     except SyntaxError:
         lines = script.split("\n")
@@ -29,3 +52,103 @@ def compileScript(script, name = "<string>"):
         print("\n"*5)
 
         InvalidSyntax().report()
+
+def getScriptKey(script, name):
+    '''
+    Content address of a script. The interpreter magic number is part of the key
+    because marshalled code objects are not portable between Python versions.
+    '''
+    sha = hashlib.sha1(importlib.util.MAGIC_NUMBER)
+    sha.update(name.encode("utf-8", "replace"))
+    sha.update(b"\0")
+    sha.update(script.encode("utf-8", "replace"))
+    return sha.hexdigest()
+
+
+# Disk Cache
+##########################################
+
+def loadCachedCodeObject(key):
+    path = getCachedCodePath(key)
+    if path is None or not os.path.exists(path):
+        return None
+
+    try:
+        with open(path, "rb") as f:
+            codeObject = marshal.load(f)
+        # update the modification time so that the file is the most recently used
+        os.utime(path, None)
+        return codeObject
+    except:
+        removeFile(path)
+        return None
+
+def storeCachedCodeObject(key, codeObject):
+    path = getCachedCodePath(key)
+    if path is None:
+        return
+
+    global diskCacheFileAmount
+    try:
+        isNewFile = not os.path.exists(path)
+        temporaryPath = path + ".tmp"
+        with open(temporaryPath, "wb") as f:
+            marshal.dump(codeObject, f)
+        os.replace(temporaryPath, path)
+
+        if diskCacheFileAmount is None:
+            diskCacheFileAmount = len(getCachedCodeEntries())
+        elif isNewFile:
+            diskCacheFileAmount += 1
+
+        if diskCacheFileAmount > diskCacheSize + diskCacheSlack:
+            removeLeastRecentlyUsedFiles()
+    except:
+        pass
+
+def removeLeastRecentlyUsedFiles():
+    global diskCacheFileAmount
+    entries = getCachedCodeEntries()
+    entries.sort(key = lambda entry: entry.stat().st_mtime)
+    for entry in entries[:max(len(entries) - diskCacheSize, 0)]:
+        removeFile(entry.path)
+    diskCacheFileAmount = min(len(entries), diskCacheSize)
+
+def getCachedCodeEntries():
+    return [entry for entry in os.scandir(getCacheDirectory())
+            if entry.name.endswith(diskCacheFileExtension)]
+
+@makeOperator("an.clear_code_cache", "Clear Code Cache",
+    description = "Remove all compiled execution code from the disk cache")
+def clearDiskCache():
+    global diskCacheFileAmount
+    directory = getCacheDirectory()
+    if directory is None:
+        return
+    for entry in os.scandir(directory):
+        if entry.name.endswith(diskCacheFileExtension):
+            removeFile(entry.path)
+    diskCacheFileAmount = 0
+
+def getCachedCodePath(key):
+    directory = getCacheDirectory()
+    if directory is None:
+        return None
+    return os.path.join(directory, key + diskCacheFileExtension)
+
+def getCacheDirectory():
+    from .. preferences import codeCacheIsEnabled
+    if not codeCacheIsEnabled():
+        return None
+
+    try:
+        directory = bpy.utils.user_resource("CONFIG", os.path.join("animation_nodes", "code_cache"), create = True)
+    except:
+        return None
+    if directory == "" or not os.path.isdir(directory):
+        return None
+    return directory
+
+def removeFile(path):
+    try: os.remove(path)
+    except: pass
@@ -0,0 +1,534 @@
+'''
+Stores the data that output nodes write into Blender for every frame of a
+range, so that the frames can be applied again without executing the tree.
+
+A cache file has a header (magic, version, signature of the tree) followed by
+one record per frame. A record contains a pickled description of the outputs
+in which all numpy arrays are replaced by references into the raw array data
+that follows the description. The file is memory mapped for reading, so the
+arrays are not copied before they are written into Blender.
+'''
+
+import os
+import bpy
+import mmap
+import bmesh
+import numpy
+import pickle
+import struct
+import hashlib
+import tempfile
+from .. utils.handlers import eventHandler
+from .. tree_info import getNodeByIdentifier
+
+fileMagic = b"ANFC"
+fileVersion = 1
+headerStruct = struct.Struct("<4sI20s")
+recordStruct = struct.Struct("<iQQ")
+arrayMarker = "__array__"
+alignment = 8
+
+recordingTreeNames = set()
+recordedOutputs = None
+
+cacheFileByPath = {}
+signatureByTreeName = {}
+uncachedNodeNamesByTreeName = {}
+
+
+# Recording
+##########################################
+
+def isRecordingFrameCache(nodeTree):
+    return nodeTree.name in recordingTreeNames
+
+def recordOutput(node, kind, *args):
+    '''Called by the execution code of output nodes while a tree is recorded.'''
+    if recordedOutputs is None:
+        return
+    state = stateReaders[kind](*args)
+    if state is not None:
+        recordedOutputs.append((node.identifier, kind, state))
+
+def startRecording(nodeTree):
+    from .. update import updateEverything
+    updateEverything()
+    signature = getTreeSignature(nodeTree)
+
+    cacheFile = getCacheFile(nodeTree)
+    cacheFile.prepareWriting(signature)
+
+    recordingTreeNames.add(nodeTree.name)
+    regenerateTree(nodeTree)
+    return cacheFile
+
+def recordFrame(nodeTree, cacheFile, frame):
+    global recordedOutputs
+    recordedOutputs = []
+    try:
+        nodeTree.execute()
+        cacheFile.write(frame, recordedOutputs)
+    finally:
+        recordedOutputs = None
+
+def stopRecording(nodeTree, cacheFile):
+    recordingTreeNames.discard(nodeTree.name)
+    regenerateTree(nodeTree)
+    cacheFile.load()
+
+def regenerateTree(nodeTree):
+    from .. import tree_info
+    from .. update import updateEverything
+    tree_info.treeChanged(nodeTree)
+    updateEverything()
+
+
+# Playback
+##########################################
+
+def applyCachedFrame(nodeTree):
+    '''Returns True when the current frame has been applied from the cache.'''
+    if not nodeTree.frameCache.enabled or isRecordingFrameCache(nodeTree):
+        return False
+
+    if len(getUncachedOutputNodes(nodeTree)) > 0:
+        return False
+
+    cacheFile = getCacheFile(nodeTree)
+    frame = nodeTree.scene.frame_current
+    if not cacheFile.hasFrame(frame):
+        return False
+    if cacheFile.signature != getCachedTreeSignature(nodeTree):
+        return False
+
+    for identifier, kind, state in cacheFile.read(frame):
+        stateWriters[kind](identifier, state)
+    return True
+
+def getCachedFrameAmount(nodeTree):
+    cacheFile = getCacheFile(nodeTree)
+    if cacheFile.signature != getCachedTreeSignature(nodeTree):
+        return 0
+    return len(cacheFile.recordByFrame)
+
+def clearFrameCache(nodeTree):
+    getCacheFile(nodeTree).remove()
+
+
+# Supported Nodes
+##########################################
+
+def getUncachedOutputNodes(nodeTree):
+    '''
+    Names of the nodes that change Blender data without recording it. Their
+    changes would be lost when a cached frame replaces the execution.
+    '''
+    names = uncachedNodeNamesByTreeName.get(nodeTree.name)
+    if names is None:
+        names = findUncachedOutputNodes(nodeTree)
+        uncachedNodeNamesByTreeName[nodeTree.name] = names
+    return names
+
+def findUncachedOutputNodes(nodeTree):
+    from . auto_execution import iterNodesUsedByTree
+    from .. utils.nodes import createNodeByIdDict
+
+    names = []
+    for node in iterNodesUsedByTree(nodeTree, createNodeByIdDict()):
+        # script and expression nodes can change any data as well
+        writesData = not node.options.isdisjoint({"WRITES_BLENDER_DATA", "UNKNOWN_DEPENDENCIES"})
+        if writesData and len(node.getFrameCacheCode()) == 0:
+            names.append(node.name)
+    return names
+
+
+# Signature
+##########################################
+
+def getCachedTreeSignature(nodeTree):
+    signature = signatureByTreeName.get(nodeTree.name)
+    if signature is None:
+        signature = getTreeSignature(nodeTree)
+        signatureByTreeName[nodeTree.name] = signature
+    return signature
+
+def getTreeSignature(nodeTree):
+    '''
+    Changes when the execution code of the tree, a property of one of its
+    nodes or the value of one of its unlinked sockets changes. Cached frames
+    are only valid for one signature.
+    '''
+    from . units import getExecutionUnits
+
+    codes = []
+    for unit in getExecutionUnits():
+        if unit.network.treeName == nodeTree.name:
+            codes.extend(unit.getCodes())
+
+    sha = hashlib.sha1()
+    for code in sorted(codes):
+        sha.update(code.encode())
+    ignoredNames = getIgnoredNodePropertyNames()
+    for node in nodeTree.nodes:
+        if not getattr(node, "isAnimationNode", False):
+            continue
+        # properties of the node can be read during the execution
+        updateWithProperties(sha, node, ignoredNames)
+        for socket in node.inputs:
+            if not socket.is_linked:
+                sha.update(repr(socket.getProperty()).encode())
+    return sha.digest()
+
+def updateWithProperties(sha, struct, ignoredNames = ()):
+    for prop in struct.bl_rna.properties:
+        name = prop.identifier
+        if name == "rna_type" or name in ignoredNames:
+            continue
+        value = getattr(struct, name, None)
+        if prop.type == "POINTER":
+            if isinstance(value, bpy.types.ID):
+                sha.update(repr(value).encode())
+            elif value is not None:
+                updateWithProperties(sha, value)
+        elif prop.type == "COLLECTION":
+            for item in value:
+                updateWithProperties(sha, item)
+        else:
+            if getattr(prop, "array_length", 0) > 0:
+                value = tuple(value)
+            elif isinstance(value, set):
+                # enum flags, the order of a set is different in every session
+                value = tuple(sorted(value))
+            sha.update(repr((name, value)).encode())
+
+def getIgnoredNodePropertyNames():
+    # ui properties like location and width, sockets are hashed separately
+    return {prop.identifier for prop in bpy.types.Node.bl_rna.properties}
+
+def resetTreeSignatures():
+    signatureByTreeName.clear()
+    uncachedNodeNamesByTreeName.clear()
+
+
+# Cache File
+##########################################
+
+def getCacheFile(nodeTree):
+    path = getCachePath(nodeTree)
+    if path not in cacheFileByPath:
+        cacheFileByPath[path] = FrameCacheFile(path)
+    return cacheFileByPath[path]
+
+def getCachePath(nodeTree):
+    directory = nodeTree.frameCache.directory
+    if directory.startswith("//") and bpy.data.filepath == "":
+        directory = os.path.join(tempfile.gettempdir(), "animation_nodes_cache")
+    else:
+        directory = bpy.path.abspath(directory)
+    return os.path.join(directory, bpy.path.clean_name(nodeTree.name) + ".ancache")
+
+@eventHandler("FILE_LOAD_POST")
+def closeCacheFiles():
+    for cacheFile in cacheFileByPath.values():
+        cacheFile.close()
+    cacheFileByPath.clear()
+    resetTreeSignatures()
+
+class FrameCacheFile:
+    def __init__(self, path):
+        self.path = path
+        self.memoryMap = None
+        self.signature = None
+        self.recordByFrame = {}
+        self.load()
+
+    def load(self):
+        self.close()
+        if not os.path.isfile(self.path):
+            return
+        if os.path.getsize(self.path) < headerStruct.size:
+            return
+
+        with open(self.path, "rb") as f:
+            self.memoryMap = mmap.mmap(f.fileno(), 0, access = mmap.ACCESS_READ)
+
+        magic, version, signature = headerStruct.unpack_from(self.memoryMap, 0)
+        if magic != fileMagic or version != fileVersion:
+            self.close()
+            return
+        self.signature = signature
+
+        # later records of the same frame replace earlier ones
+        size = len(self.memoryMap)
+        position = headerStruct.size
+        while position + recordStruct.size <= size:
+            frame, descriptionSize, dataSize = recordStruct.unpack_from(self.memoryMap, position)
+            descriptionStart = position + recordStruct.size
+            dataStart = align(descriptionStart + descriptionSize)
+            if dataStart + dataSize > size:
+                break # incomplete record, e.g. when Blender crashed while writing
+            self.recordByFrame[frame] = (descriptionStart, descriptionSize, dataStart)
+            position = dataStart + dataSize
+
+    def close(self):
+        if self.memoryMap is not None:
+            try: self.memoryMap.close()
+            except BufferError: pass # arrays still use the memory, it is freed with them
+        self.memoryMap = None
+        self.signature = None
+        self.recordByFrame = {}
+
+    def hasFrame(self, frame):
+        return frame in self.recordByFrame
+
+    def read(self, frame):
+        descriptionStart, descriptionSize, dataStart = self.recordByFrame[frame]
+        description = pickle.loads(self.memoryMap[descriptionStart:descriptionStart + descriptionSize])
+        return restoreArrays(description, self.memoryMap, dataStart)
+
+    def prepareWriting(self, signature):
+        '''Frames recorded with another signature are removed.'''
+        keepRecords = self.signature == signature
+        # the file has to be closed before it can be truncated on Windows
+        self.close()
+        if not keepRecords:
+            os.makedirs(os.path.dirname(self.path), exist_ok = True)
+            with open(self.path, "wb") as f:
+                f.write(headerStruct.pack(fileMagic, fileVersion, signature))
+        self.signature = signature
+
+    def write(self, frame, outputs):
+        arrays = []
+        description = pickle.dumps(replaceArrays(outputs, arrays), protocol = pickle.HIGHEST_PROTOCOL)
+        dataSize = arrays[-1][0] + arrays[-1][1].nbytes if len(arrays) > 0 else 0
+
+        with open(self.path, "ab") as f:
+            position = f.tell()
+            f.write(recordStruct.pack(frame, len(description), dataSize))
+            f.write(description)
+            descriptionEnd = position + recordStruct.size + len(description)
+            dataStart = align(descriptionEnd)
+            f.write(bytes(dataStart - descriptionEnd))
+
+            written = 0
+            for offset, array in arrays:
+                f.write(bytes(offset - written))
+                f.write(array.tobytes())
+                written = offset + array.nbytes
+
+    def remove(self):
+        self.close()
+        if os.path.isfile(self.path):
+            os.remove(self.path)
+
+def align(position):
+    return (position + alignment - 1) // alignment * alignment
+
+def replaceArrays(value, arrays):
+    if isinstance(value, numpy.ndarray):
+        if len(arrays) == 0: offset = 0
+        else: offset = align(arrays[-1][0] + arrays[-1][1].nbytes)
+        arrays.append((offset, value))
+        return (arrayMarker, value.dtype.str, value.shape, offset)
+    elif isinstance(value, dict):
+        return {key : replaceArrays(item, arrays) for key, item in value.items()}
+    elif isinstance(value, (list, tuple)):
+        return type(value)(replaceArrays(item, arrays) for item in value)
+    return value
+
+def restoreArrays(value, buffer, dataStart):
+    if isArrayReference(value):
+        _, dtype, shape, offset = value
+        count = int(numpy.prod(shape))
+        return numpy.frombuffer(buffer, dtype, count, dataStart + offset).reshape(shape)
+    elif isinstance(value, dict):
+        return {key : restoreArrays(item, buffer, dataStart) for key, item in value.items()}
+    elif isinstance(value, (list, tuple)):
+        return type(value)(restoreArrays(item, buffer, dataStart) for item in value)
+    return value
+
+def isArrayReference(value):
+    return isinstance(value, tuple) and len(value) == 4 and value[0] == arrayMarker
+
+
+# Output States
+##########################################
+
+def getAttribute(collection, attribute, dtype, size = 1):
+    array = numpy.empty(len(collection) * size, dtype = dtype)
+    collection.foreach_get(attribute, array)
+    return array
+
+def getObjectByName(name, type):
+    object = bpy.data.objects.get(name)
+    if object is None or object.type != type:
+        return None
+    return object
+
+def readMeshState(object):
+    if object is None or object.type != "MESH":
+        return None
+    mesh = object.data
+    return {
+        "name" : object.name,
+        "vertices" : getAttribute(mesh.vertices, "co", numpy.float32, 3),
+        "edges" : getAttribute(mesh.edges, "vertices", numpy.int32, 2),
+        "loopStarts" : getAttribute(mesh.polygons, "loop_start", numpy.int32),
+        "loopTotals" : getAttribute(mesh.polygons, "loop_total", numpy.int32),
+        "loopVertices" : getAttribute(mesh.loops, "vertex_index", numpy.int32),
+        "loopEdges" : getAttribute(mesh.loops, "edge_index", numpy.int32),
+        "materialIndices" : getAttribute(mesh.polygons, "material_index", numpy.uint16),
+        "uvMaps" : [(uvLayer.name, getAttribute(uvLayer.data, "uv", numpy.float32, 2))
+                    for uvLayer in mesh.uv_layers]
+    }
+
+def writeMeshState(identifier, state):
+    object = getObjectByName(state["name"], "MESH")
+    if object is None or object.mode != "OBJECT":
+        return
+
+    mesh = object.data
+    if hasSameTopology(mesh, state):
+        mesh.vertices.foreach_set("co", state["vertices"])
+        mesh.polygons.foreach_set("material_index", state["materialIndices"])
+        for name, uvs in state["uvMaps"]:
+            mesh.uv_layers[name].data.foreach_set("uv", uvs)
+    else:
+        bmesh.new().to_mesh(mesh)
+        mesh.vertices.add(len(state["vertices"]) // 3)
+        mesh.edges.add(len(state["edges"]) // 2)
+        mesh.loops.add(len(state["loopVertices"]))
+        mesh.polygons.add(len(state["loopStarts"]))
+
+        mesh.vertices.foreach_set("co", state["vertices"])
+        mesh.edges.foreach_set("vertices", state["edges"])
+        mesh.loops.foreach_set("vertex_index", state["loopVertices"])
+        mesh.loops.foreach_set("edge_index", state["loopEdges"])
+        mesh.polygons.foreach_set("loop_start", state["loopStarts"])
+        mesh.polygons.foreach_set("loop_total", state["loopTotals"])
+        mesh.polygons.foreach_set("material_index", state["materialIndices"])
+        for name, uvs in state["uvMaps"]:
+            mesh.uv_layers.new(name = name).data.foreach_set("uv", uvs)
+
+    mesh.update()
+
+def hasSameTopology(mesh, state):
+    if len(mesh.vertices) * 3 != len(state["vertices"]): return False
+    if len(mesh.edges) * 2 != len(state["edges"]): return False
+    if len(mesh.polygons) != len(state["loopStarts"]): return False
+    if len(mesh.loops) != len(state["loopVertices"]): return False
+    if [uvLayer.name for uvLayer in mesh.uv_layers] != [name for name, _ in state["uvMaps"]]: return False
+    return (numpy.array_equal(getAttribute(mesh.edges, "vertices", numpy.int32, 2), state["edges"]) and
+            numpy.array_equal(getAttribute(mesh.loops, "vertex_index", numpy.int32), state["loopVertices"]))
+
+transformAttributes = ("location", "rotation_euler", "scale",
+                       "delta_location", "delta_rotation_euler", "delta_scale")
+
+def readTransformsState(object):
+    if object is None:
+        return None
+    values = [value for attribute in transformAttributes for value in getattr(object, attribute)]
+    return {"name" : object.name, "values" : numpy.array(values, dtype = numpy.float32)}
+
+def writeTransformsState(identifier, state):
+    object = bpy.data.objects.get(state["name"])
+    if object is None:
+        return
+    values = state["values"]
+    for i, attribute in enumerate(transformAttributes):
+        setattr(object, attribute, values[i * 3:i * 3 + 3])
+
+curveAttributes = ("bevel_depth", "bevel_resolution", "bevel_factor_start", "bevel_factor_end",
+                   "extrude", "offset", "resolution_u", "fill_mode")
+
+def readSplinesState(object):
+    if object is None or object.type != "CURVE":
+        return None
+
+    splines = []
+    for spline in object.data.splines:
+        if spline.type == "BEZIER":
+            points = spline.bezier_points
+            splines.append({
+                "type" : "BEZIER",
+                "cyclic" : spline.use_cyclic_u,
+                "points" : getAttribute(points, "co", numpy.float32, 3),
+                "leftHandles" : getAttribute(points, "handle_left", numpy.float32, 3),
+                "rightHandles" : getAttribute(points, "handle_right", numpy.float32, 3),
+                "radii" : getAttribute(points, "radius", numpy.float32),
+                "tilts" : getAttribute(points, "tilt", numpy.float32)})
+        else:
+            points = spline.points
+            splines.append({
+                "type" : spline.type,
+                "cyclic" : spline.use_cyclic_u,
+                "points" : getAttribute(points, "co", numpy.float32, 4),
+                "radii" : getAttribute(points, "radius", numpy.float32),
+                "tilts" : getAttribute(points, "tilt", numpy.float32)})
+    attributes = {attribute : getattr(object.data, attribute) for attribute in curveAttributes}
+    return {"name" : object.name, "splines" : splines, "attributes" : attributes}
+
+def writeSplinesState(identifier, state):
+    object = getObjectByName(state["name"], "CURVE")
+    if object is None:
+        return
+
+    for attribute, value in state["attributes"].items():
+        setattr(object.data, attribute, value)
+
+    bSplines = object.data.splines
+    bSplines.clear()
+    for spline in state["splines"]:
+        amount = len(spline["radii"])
+        if amount == 0:
+            continue
+
+        bSpline = bSplines.new(spline["type"])
+        bSpline.use_cyclic_u = spline["cyclic"]
+        if spline["type"] == "BEZIER":
+            points = bSpline.bezier_points
+            points.add(amount - 1)
+            for point in points:
+                point.handle_left_type = "FREE"
+                point.handle_right_type = "FREE"
+            points.foreach_set("co", spline["points"])
+            points.foreach_set("handle_left", spline["leftHandles"])
+            points.foreach_set("handle_right", spline["rightHandles"])
+        else:
+            points = bSpline.points
+            points.add(amount - 1)
+            points.foreach_set("co", spline["points"])
+        points.foreach_set("radius", spline["radii"])
+        points.foreach_set("tilt", spline["tilts"])
+
+def readInstancesState(objects, sourceObject, scenes):
+    return {
+        "amount" : len(objects),
+        "source" : None if sourceObject is None else sourceObject.name,
+        "scenes" : [scene.name for scene in scenes]
+    }
+
+def writeInstancesState(identifier, state):
+    try: node = getNodeByIdentifier(identifier)
+    except: return
+
+    scenes = {bpy.data.scenes[name] for name in state["scenes"] if name in bpy.data.scenes}
+    if node.copyFromSource:
+        sourceObject = None if state["source"] is None else bpy.data.objects.get(state["source"])
+        node.getInstances_WithSource(state["amount"], sourceObject, scenes)
+    else:
+        node.getInstances_WithoutSource(state["amount"], scenes)
+
+stateReaders = {
+    "MESH" : readMeshState,
+    "TRANSFORMS" : readTransformsState,
+    "SPLINES" : readSplinesState,
+    "INSTANCES" : readInstancesState
+}
+
+stateWriters = {
+    "MESH" : writeMeshState,
+    "TRANSFORMS" : writeTransformsState,
+    "SPLINES" : writeSplinesState,
+    "INSTANCES" : writeInstancesState
+}
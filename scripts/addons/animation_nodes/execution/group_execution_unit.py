@@ -1,7 +1,9 @@
+from . socket_values import SocketValues
 from . compile_scripts import compileScript
 from .. problems import ExecutionUnitNotSetup
 from . code_generator import (getInitialVariables,
                               iterSetupCodeLines,
+                              getSocketValueLoadLines,
                               getGlobalizeStatement,
                               linkOutputSocketsToTargets,
                               getFunction_IterNodeExecutionLines)
@@ -12,6 +14,8 @@ class GroupExecutionUnit:
         self.setupScript = ""
         self.setupCodeObject = None
         self.executionData = {}
+        self.socketValues = SocketValues({}, "")
+        self.isSetup = False
 
         self.generateScript(nodeByID)
         self.compileScript()
@@ -21,13 +25,23 @@ class GroupExecutionUnit:
     def setup(self):
         self.executionData = {}
         exec(self.setupCodeObject, self.executionData, self.executionData)
+        self.socketValues.store(self.executionData)
+        self.isSetup = True
         self.execute = self.executionData["main"]
 
+    def prepare(self):
+        self.socketValues.restore(self.executionData)
+
+    def reloadSocketValue(self, socketPointer):
+        self.socketValues.reload(socketPointer, self.executionData)
+
     def insertSubprogramFunctions(self, data):
         self.executionData.update(data)
 
     def finish(self):
         self.executionData.clear()
+        self.socketValues.clear()
+        self.isSetup = False
         self.execute = self.raiseNotSetupException
 
 
@@ -40,6 +54,7 @@ class GroupExecutionUnit:
         except: return
 
         variables = getInitialVariables(nodes)
+        self.socketValues = SocketValues(getSocketValueLoadLines(nodes, variables), repr(self.network.name))
         self.setupScript = "\n".join(self.iterSetupScriptLines(nodes, variables, nodeByID))
 
     def iterSetupScriptLines(self, nodes, variables, nodeByID):
@@ -0,0 +1,83 @@
+import bpy
+from mathutils import Vector, Matrix, Euler, Quaternion, Color
+from collections import defaultdict
+from .. utils.handlers import eventHandler
+from .. utils.operators import makeOperator
+
+# larger lists are never equal to another fingerprint
+maxFingerprintBytes = 2 ** 20
+
+class NodeCache:
+    '''
+    Stores the outputs of the last execution of a node together with the
+    key of the inputs that have been used. The version is increased every
+    time the outputs changed, so that dependent nodes can use it as input key.
+    '''
+    __slots__ = ("key", "outputs", "outputsFingerprint", "version")
+
+    def __init__(self):
+        self.key = None
+        self.outputs = ()
+        self.outputsFingerprint = None
+        self.version = 0
+
+    def store(self, key, outputs):
+        fingerprint = getFingerprint(outputs)
+        if fingerprint != self.outputsFingerprint:
+            self.version += 1
+        self.key = key
+        self.outputs = outputs
+        self.outputsFingerprint = fingerprint
+
+cacheByNodeIdentifier = defaultdict(NodeCache)
+idUpdateCounters = defaultdict(int)
+
+@makeOperator("an.reset_node_caches", "Reset Node Caches", redraw = True)
+def resetNodeCaches():
+    cacheByNodeIdentifier.clear()
+
+def getNodeCaches():
+    return cacheByNodeIdentifier
+
+@eventHandler("DEPSGRAPH_UPDATE_POST")
+def countIDUpdates(depsgraph):
+    for update in depsgraph.updates:
+        idUpdateCounters[update.id.original.as_pointer()] += 1
+
+
+# Fingerprints
+##########################################
+
+class Unknown:
+    '''Is never equal to anything else, not even to itself.'''
+    __slots__ = ()
+
+    def __eq__(self, other):
+        return False
+
+    def __ne__(self, other):
+        return True
+
+    __hash__ = None
+
+def getFingerprint(value):
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    if isinstance(value, tuple):
+        return tuple(getFingerprint(element) for element in value)
+    if isinstance(value, (Vector, Euler, Quaternion, Color)):
+        return (type(value), tuple(value))
+    if isinstance(value, Matrix):
+        return (Matrix, tuple(tuple(row) for row in value))
+    if isinstance(value, bpy.types.ID):
+        # IDs can change over time without being a new object
+        pointer = value.as_pointer()
+        return (pointer, idUpdateCounters[pointer], getCurrentFrame())
+    if hasattr(value, "asMemoryView"):
+        memory = value.asMemoryView()
+        if memory.nbytes <= maxFingerprintBytes:
+            return (type(value), memory.tobytes())
+    return Unknown()
+
+def getCurrentFrame():
+    return bpy.context.scene.frame_current_final
@@ -0,0 +1,176 @@
+import numpy
+from array import array
+
+class KeyframeRecorder:
+    '''
+    Collects the values of baked properties for every frame. Inserting
+    keyframes one by one is slow, so all keyframes of a property are
+    written into its fcurve at once in the end. Nothing is written when
+    the bake is cancelled.
+    '''
+    def __init__(self):
+        self.frame = None
+        self.isBaking = False
+        self.channels = {}
+        self.pendingKeyframes = []
+
+    def startBake(self):
+        self.reset()
+        self.isBaking = True
+
+    def finishBake(self, writeKeyframes = True):
+        if writeKeyframes:
+            self.writeKeyframes()
+        self.reset()
+
+    def record(self, owner, path, index = -1):
+        if not self.isBaking:
+            # the bake execution code is used without the bake operator
+            owner.keyframe_insert(path, index = index)
+            return
+        if self.frame is None:
+            return
+
+        value = owner.path_resolve(path)
+        if isinstance(value, str):
+            # enum values can't be stored as numbers easily
+            self.addPendingKeyframe(owner, path, index)
+        elif index == -1 and hasattr(value, "__len__"):
+            for i, item in enumerate(value):
+                self.recordValue(owner, path, i, i, item)
+        elif index == -1:
+            self.recordValue(owner, path, -1, 0, value)
+        else:
+            self.recordValue(owner, path, index, index, value[index])
+
+    def recordValue(self, owner, path, insertIndex, arrayIndex, value):
+        key = (owner.as_pointer(), path, arrayIndex)
+        if key not in self.channels:
+            try: channel = BakeChannel(owner.id_data, getPathFromID(owner, path), insertIndex, arrayIndex)
+            except: channel = None
+            self.channels[key] = channel
+
+        channel = self.channels[key]
+        if channel is None:
+            self.addPendingKeyframe(owner, path, insertIndex)
+        else:
+            channel.frames.append(self.frame)
+            channel.values.append(value)
+
+    def addPendingKeyframe(self, owner, path, index):
+        self.pendingKeyframes.append(PendingKeyframe(owner, path, index, self.frame))
+
+    def writeKeyframes(self):
+        for channel in self.channels.values():
+            if channel is not None:
+                channel.writeKeyframes()
+        for keyframe in self.pendingKeyframes:
+            keyframe.insert()
+
+    def reset(self):
+        self.frame = None
+        self.isBaking = False
+        self.channels.clear()
+        self.pendingKeyframes.clear()
+
+def getPathFromID(owner, path):
+    if owner == owner.id_data:
+        return path
+    return owner.path_from_id(path)
+
+class PendingKeyframe:
+    '''
+    Keyframe of a property that can't be collected in a channel. The value
+    is set again temporarily when the keyframe is inserted after the bake.
+    '''
+    def __init__(self, owner, path, index, frame):
+        self.owner = owner
+        self.path = path
+        self.index = index
+        self.frame = frame
+        self.value = getPathValue(owner, path)
+
+    def insert(self):
+        try:
+            currentValue = getPathValue(self.owner, self.path)
+            setPathValue(self.owner, self.path, self.value)
+            self.owner.keyframe_insert(self.path, index = self.index, frame = self.frame)
+            setPathValue(self.owner, self.path, currentValue)
+        except:
+            pass
+
+def getPathValue(owner, path):
+    value = owner.path_resolve(path)
+    if hasattr(value, "__len__") and not isinstance(value, str):
+        return tuple(value)
+    return value
+
+def setPathValue(owner, path, value):
+    if "." in path:
+        parentPath, name = path.rsplit(".", 1)
+        owner = owner.path_resolve(parentPath)
+    else:
+        name = path
+    setattr(owner, name, value)
+
+class BakeChannel:
+    def __init__(self, idData, dataPath, insertIndex, arrayIndex):
+        self.idData = idData
+        self.dataPath = dataPath
+        self.insertIndex = insertIndex
+        self.arrayIndex = arrayIndex
+        self.frames = array("f")
+        self.values = array("f")
+
+    def writeKeyframes(self):
+        fcurve = self.getFCurve()
+        if fcurve is None or len(self.frames) == 0:
+            return
+
+        frames = numpy.frombuffer(self.frames, dtype = numpy.float32)
+        values = numpy.frombuffer(self.values, dtype = numpy.float32)
+        points = fcurve.keyframe_points
+
+        # keyframes outside of the baked range are kept unchanged
+        oldFrames = getPointAttribute(points, "co").reshape(-1, 2)[:, 0]
+        inside = numpy.flatnonzero((oldFrames >= frames.min()) & (oldFrames <= frames.max()))
+        for index in reversed(inside.tolist()):
+            points.remove(points[index], fast = True)
+
+        # new points are appended, so the old points keep their own
+        # interpolation, easing and handle types
+        oldAmount = len(points)
+        points.add(len(frames))
+        newCoordinates = numpy.column_stack((frames, values)).ravel()
+        for attribute in ("co", "handle_left", "handle_right"):
+            data = getPointAttribute(points, attribute)
+            data[oldAmount * 2:] = newCoordinates
+            points.foreach_set(attribute, data)
+
+        # sorts the points and recalculates the automatic handles
+        fcurve.update()
+
+    def getFCurve(self):
+        fcurve = self.findFCurve()
+        if fcurve is None:
+            # creates the fcurve with the same group and flags as a normal keyframe
+            try: self.idData.keyframe_insert(self.dataPath, index = self.insertIndex, frame = self.frames[0])
+            except: return None
+            fcurve = self.findFCurve()
+        return fcurve
+
+    def findFCurve(self):
+        animationData = getattr(self.idData, "animation_data", None)
+        if animationData is None or animationData.action is None:
+            return None
+        return animationData.action.fcurves.find(self.dataPath, index = self.arrayIndex)
+
+def getPointAttribute(points, attribute):
+    data = numpy.empty(len(points) * 2, dtype = numpy.float32)
+    points.foreach_get(attribute, data)
+    return data
+
+recorder = KeyframeRecorder()
+
+def getKeyframeRecorder():
+    return recorder
@@ -1,9 +1,11 @@
 from .. sockets.info import toIdName
 from .. tree_info import getNodesByType
+from . socket_values import SocketValues
 from . compile_scripts import compileScript
 from .. problems import ExecutionUnitNotSetup
 from . code_generator import (getInitialVariables,
                               iterSetupCodeLines,
+                              getSocketValueLoadLines,
                               getCopyExpression,
                               iterNodeCommentLines,
                               getGlobalizeStatement,
@@ -18,6 +20,8 @@ class LoopExecutionUnit:
         self.setupScript = ""
         self.setupCodeObject = None
         self.executionData = {}
+        self.socketValues = SocketValues({}, "")
+        self.isSetup = False
 
         self.generateScript(nodeByID)
         self.compileScript()
@@ -27,13 +31,23 @@ class LoopExecutionUnit:
     def setup(self):
         self.executionData = {}
         exec(self.setupCodeObject, self.executionData, self.executionData)
+        self.socketValues.store(self.executionData)
+        self.isSetup = True
         self.execute = self.executionData["main"]
 
+    def prepare(self):
+        self.socketValues.restore(self.executionData)
+
+    def reloadSocketValue(self, socketPointer):
+        self.socketValues.reload(socketPointer, self.executionData)
+
     def insertSubprogramFunctions(self, data):
         self.executionData.update(data)
 
     def finish(self):
         self.executionData.clear()
+        self.socketValues.clear()
+        self.isSetup = False
         self.execute = self.raiseNotSetupException
 
 
@@ -47,6 +61,7 @@ class LoopExecutionUnit:
         except: return
 
         variables = getInitialVariables(nodes)
+        self.socketValues = SocketValues(getSocketValueLoadLines(nodes, variables), repr(self.network.name))
         self.setupScript = "\n".join(self.iterSetupScriptLines(nodes, variables, nodeByID))
 
     def iterSetupScriptLines(self, nodes, variables, nodeByID):
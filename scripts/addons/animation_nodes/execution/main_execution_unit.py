@@ -1,11 +1,17 @@
 import sys, traceback
 from .. import problems
+from . socket_values import SocketValues
 from . compile_scripts import compileScript
+from .. preferences import getExecutionCodeType
 from .. problems import ExecutionUnitNotSetup, ExceptionDuringExecution
-from . code_generator import (getInitialVariables,
+from . code_generator import (ExecutionOrder,
+                              getInitialVariables,
                               iterSetupCodeLines,
+                              getSocketValueLoadLines,
                               linkOutputSocketsToTargets,
-                              getFunction_IterNodeExecutionLines)
+                              getFunction_IterNodeExecutionLines,
+                              iterNodeExecutionLines_Incremental,
+                              linkOutputSocketsToTargets_WithoutCopies)
 
 class MainExecutionUnit:
     def __init__(self, network, nodeByID):
@@ -15,6 +21,8 @@ class MainExecutionUnit:
         self.setupCodeObject = None
         self.executeCodeObject = None
         self.executionData = {}
+        self.socketValues = SocketValues({}, "")
+        self.isSetup = False
 
         self.generateScripts(nodeByID)
         self.compileScripts()
@@ -24,13 +32,23 @@ class MainExecutionUnit:
     def setup(self):
         self.executionData = {}
         exec(self.setupCodeObject, self.executionData, self.executionData)
+        self.socketValues.store(self.executionData)
+        self.isSetup = True
         self.execute = self.executeUnit
 
+    def prepare(self):
+        self.socketValues.restore(self.executionData)
+
+    def reloadSocketValue(self, socketPointer):
+        self.socketValues.reload(socketPointer, self.executionData)
+
     def insertSubprogramFunctions(self, data):
         self.executionData.update(data)
 
     def finish(self):
         self.executionData.clear()
+        self.socketValues.clear()
+        self.isSetup = False
         self.execute = self.raiseNotSetupException
 
     def executeUnit(self):
@@ -55,14 +73,25 @@ class MainExecutionUnit:
 
         variables = getInitialVariables(nodes)
         self.setupScript = "\n".join(iterSetupCodeLines(nodes, variables))
+        self.socketValues = SocketValues(getSocketValueLoadLines(nodes, variables), repr(self.network.treeName))
         self.executeScript = "\n".join(self.iterExecutionScriptLines(nodes, variables, nodeByID))
 
     def iterExecutionScriptLines(self, nodes, variables, nodeByID):
+        if getExecutionCodeType() == "INCREMENTAL":
+            yield from self.iterIncrementalExecutionScriptLines(nodes, variables, nodeByID)
+            return
+
         iterNodeExecutionLines = getFunction_IterNodeExecutionLines()
+        executionOrder = ExecutionOrder(nodes, nodeByID)
 
         for node in nodes:
             yield from iterNodeExecutionLines(node, variables)
-            yield from linkOutputSocketsToTargets(node, variables, nodeByID)
+            yield from linkOutputSocketsToTargets(node, variables, nodeByID, executionOrder)
+
+    def iterIncrementalExecutionScriptLines(self, nodes, variables, nodeByID):
+        for node in nodes:
+            yield from iterNodeExecutionLines_Incremental(node, variables, nodeByID)
+            linkOutputSocketsToTargets_WithoutCopies(node, variables, nodeByID)
 
     def compileScripts(self):
         self.setupCodeObject = compileScript(self.setupScript, name = "setup: {}".format(repr(self.network.treeName)))
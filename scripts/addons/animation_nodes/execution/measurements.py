@@ -1,6 +1,11 @@
 import bpy
+import sys
+import csv
+import json
 import textwrap
-from collections import defaultdict
+import threading
+from collections import defaultdict, deque
+from .. utils.handlers import eventHandler
 from .. utils.timing import prettyTime
 from .. draw_handler import drawHandler
 from .. graphics.text_box import TextBox
@@ -8,12 +13,14 @@ from .. utils.operators import makeOperator
 from .. preferences import getExecutionCodeType
 
 class NodeMeasurements:
-    __slots__ = ("minTime", "totalTime", "calls")
+    __slots__ = ("minTime", "totalTime", "calls", "avoidedCopies", "avoidedCopyBytes")
 
     def __init__(self):
         self.totalTime = 0
         self.calls = 0
         self.minTime = 1e10
+        self.avoidedCopies = 0
+        self.avoidedCopyBytes = 0
 
     def registerTime(self, time):
         self.calls += 1
@@ -21,14 +28,21 @@ class NodeMeasurements:
         if time < self.minTime:
             self.minTime = time
 
+    def registerAvoidedCopy(self, data):
+        self.avoidedCopies += 1
+        self.avoidedCopyBytes += getOutputsSize((data, ))[1]
+
     def __repr__(self):
-        return textwrap.dedent("""\
+        text = textwrap.dedent("""\
             Min: {}
             Total: {}
             Calls: {:,d}\
             """.format(prettyTime(self.minTime),
                        prettyTime(self.totalTime),
                        self.calls))
+        if self.avoidedCopies > 0:
+            text += "\nAvoided Copies: {:,d} ({:,d} bytes)".format(self.avoidedCopies, self.avoidedCopyBytes)
+        return text
 
 measurementsByNodeIdentifier = defaultdict(NodeMeasurements)
 
@@ -50,3 +64,129 @@ def getMeasurementResultString(node):
     result = measurementsByNodeIdentifier[node.identifier]
     if result.calls == 0: return "Not Measured"
     else: return str(result)
+
+
+
+# Timeline
+##########################################
+
+class TimelineEvent:
+    __slots__ = ("identifier", "start", "end", "frame", "execution",
+                 "thread", "outputLength", "outputBytes")
+
+    def __init__(self, identifier, start, end, frame, execution, thread, outputLength, outputBytes):
+        self.identifier = identifier
+        self.start = start
+        self.end = end
+        self.frame = frame
+        self.execution = execution
+        self.thread = thread
+        self.outputLength = outputLength
+        self.outputBytes = outputBytes
+
+    @property
+    def duration(self):
+        return self.end - self.start
+
+class ExecutionTimeline:
+    '''
+    Ring buffer that contains the start and end time of every node execution
+    in MEASURE mode. Nodes in subprograms and loops get one event per call.
+    '''
+    def __init__(self, maxEvents = 200000):
+        self.events = deque(maxlen = maxEvents)
+        self.frame = 0
+        self.execution = 0
+
+    def startExecution(self):
+        self.execution += 1
+
+    def record(self, identifier, start, end, outputs):
+        outputLength, outputBytes = getOutputsSize(outputs)
+        self.events.append(TimelineEvent(identifier, start, end, self.frame, self.execution,
+                                         threading.get_ident(), outputLength, outputBytes))
+
+    def clear(self):
+        self.events.clear()
+
+    def getLastExecutionEvents(self):
+        events = []
+        for event in reversed(self.events):
+            if event.execution != self.execution: break
+            events.append(event)
+        events.reverse()
+        return events
+
+def getOutputsSize(outputs):
+    '''
+    Total length of all output lists and an estimation of the memory they use.
+    '''
+    totalLength = 0
+    totalBytes = 0
+    for value in outputs:
+        if hasattr(value, "asMemoryView"):
+            totalLength += len(value)
+            totalBytes += value.asMemoryView().nbytes
+        else:
+            try: totalLength += len(value)
+            except: pass
+            totalBytes += sys.getsizeof(value)
+    return totalLength, totalBytes
+
+timeline = ExecutionTimeline()
+
+def getTimeline():
+    return timeline
+
+@makeOperator("an.reset_timeline", "Reset Timeline", redraw = True)
+def resetTimeline():
+    timeline.clear()
+
+@eventHandler("FRAME_CHANGE_POST")
+def updateTimelineFrame(scene):
+    timeline.frame = scene.frame_current
+
+def iterTimelineEventsWithNodeInfo(events):
+    from .. tree_info import getNodeByIdentifier
+    infoByIdentifier = {}
+    for event in events:
+        if event.identifier not in infoByIdentifier:
+            try:
+                node = getNodeByIdentifier(event.identifier)
+                infoByIdentifier[event.identifier] = (node.name, node.nodeTree.name)
+            except:
+                infoByIdentifier[event.identifier] = (event.identifier, "")
+        yield event, infoByIdentifier[event.identifier]
+
+def exportTimelineAsChromeTrace(path):
+    '''
+    The file can be opened with chrome://tracing or https://ui.perfetto.dev.
+    '''
+    traceEvents = []
+    for event, (nodeName, treeName) in iterTimelineEventsWithNodeInfo(timeline.events):
+        traceEvents.append({
+            "name" : nodeName,
+            "cat" : treeName,
+            "ph" : "X",
+            "ts" : event.start * 1000000,
+            "dur" : event.duration * 1000000,
+            "pid" : event.frame,
+            "tid" : event.thread,
+            "args" : {
+                "identifier" : event.identifier,
+                "execution" : event.execution,
+                "outputLength" : event.outputLength,
+                "outputBytes" : event.outputBytes }})
+
+    with open(path, "w") as f:
+        json.dump({"traceEvents" : traceEvents, "displayTimeUnit" : "ms"}, f)
+
+def exportTimelineAsCSV(path):
+    with open(path, "w", newline = "") as f:
+        writer = csv.writer(f)
+        writer.writerow(["Tree", "Node", "Identifier", "Frame", "Execution", "Thread",
+                         "Start", "End", "Duration", "Output Length", "Output Bytes"])
+        for event, (nodeName, treeName) in iterTimelineEventsWithNodeInfo(timeline.events):
+            writer.writerow([treeName, nodeName, event.identifier, event.frame, event.execution,
+                             event.thread, event.start, event.end, event.duration,
+                             event.outputLength, event.outputBytes])
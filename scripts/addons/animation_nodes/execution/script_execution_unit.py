@@ -1,7 +1,9 @@
 from .. utils.code import isCodeValid, getSyntaxError, containsStarImport
+from . socket_values import SocketValues
 from . compile_scripts import compileScript
 from .. problems import ExecutionUnitNotSetup
-from . code_generator import getSocketValueExpression, iterSetupCodeLines, getInitialVariables
+from . code_generator import (getSocketValueExpression, iterSetupCodeLines,
+                              getInitialVariables, getSocketValueLoadLines)
 
 userCodeStartComment = "# User Code"
 
@@ -11,23 +13,38 @@ class ScriptExecutionUnit:
         self.setupScript = ""
         self.setupCodeObject = None
         self.executionData = {}
+        self.socketValues = SocketValues({}, "")
+        self.isSetup = False
 
         self.scriptUpdated(nodeByID)
 
     def scriptUpdated(self, nodeByID = None):
         self.generateScript(nodeByID)
         self.compileScript()
+        # the new code is used the next time the unit is set up
+        if self.isSetup:
+            self.finish()
 
     def setup(self):
         self.executionData = {}
         exec(self.setupCodeObject, self.executionData, self.executionData)
+        self.socketValues.store(self.executionData)
+        self.isSetup = True
         self.execute = self.executionData["main"]
 
+    def prepare(self):
+        self.socketValues.restore(self.executionData)
+
+    def reloadSocketValue(self, socketPointer):
+        self.socketValues.reload(socketPointer, self.executionData)
+
     def insertSubprogramFunctions(self, data):
         self.executionData.update(data)
 
     def finish(self):
         self.executionData.clear()
+        self.socketValues.clear()
+        self.isSetup = False
         self.execute = self.raiseNotSetupException
 
     def getCodes(self):
@@ -39,6 +56,7 @@ class ScriptExecutionUnit:
         userCode = node.executionCode
 
         variables = getInitialVariables([node])
+        self.socketValues = SocketValues(getSocketValueLoadLines([node], variables), repr(self.network.name))
 
         finalCode = []
         finalCode.extend(iterSetupCodeLines([node], variables))
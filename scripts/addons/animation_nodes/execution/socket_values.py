@@ -0,0 +1,41 @@
+from . compile_scripts import compileScript
+
+class SocketValues:
+    '''
+    Values of the unlinked sockets in the data of an execution unit that stays
+    set up between executions. The values are restored before every execution
+    because the execution code can overwrite them. Sockets whose value is not
+    static are loaded again every time.
+    '''
+    def __init__(self, linesBySocket, name):
+        self.linesBySocket = linesBySocket
+        self.name = name
+        self.storedValues = {}
+
+        volatileLines = [line for _, line, isStatic in linesBySocket.values() if not isStatic]
+        if len(volatileLines) > 0:
+            self.volatileCodeObject = compileScript("\n".join(volatileLines), name = "socket values: " + name)
+        else:
+            self.volatileCodeObject = None
+
+    def store(self, data):
+        self.storedValues = {variable : data[variable]
+                             for variable, _, isStatic in self.linesBySocket.values() if isStatic}
+
+    def restore(self, data):
+        data.update(self.storedValues)
+        if self.volatileCodeObject is not None:
+            exec(self.volatileCodeObject, data, data)
+
+    def reload(self, socketPointer, data):
+        entry = self.linesBySocket.get(socketPointer)
+        if entry is None:
+            return
+
+        variable, line, isStatic = entry
+        exec(compileScript(line, name = "socket value: " + self.name), data, data)
+        if isStatic:
+            self.storedValues[variable] = data[variable]
+
+    def clear(self):
+        self.storedValues = {}
@@ -2,77 +2,198 @@ import traceback
 from .. import problems
 from collections import defaultdict
 from . cache import clearExecutionCache
+from . incremental import resetNodeCaches
 from . measurements import resetMeasurements
 from . main_execution_unit import MainExecutionUnit
 from . loop_execution_unit import LoopExecutionUnit
 from . group_execution_unit import GroupExecutionUnit
 from . script_execution_unit import ScriptExecutionUnit
 from .. tree_info import getNetworksByType, getSubprogramNetworks
-from .. utils.nodes import getAnimationNodeTrees, iterAnimationNodes
+from .. utils.nodes import getAnimationNodeTrees
+from .. utils.handlers import eventHandler
 from .. problems import ExceptionDuringCodeCreation, CouldNotSetupExecutionUnits
 
 _mainUnitsByNodeTree = defaultdict(list)
 _subprogramUnitsByIdentifier = {}
-
-def createExecutionUnits(nodeByID):
-    reset()
+_unitsAreComplete = False
+_changedSocketPointers = set()
+
+def createExecutionUnits(nodeByID, changedTreeNames = None):
+    '''
+    Only the units of networks that have nodes in one of the changed trees
+    are recreated. All units are recreated when changedTreeNames is None.
+    '''
+    global _unitsAreComplete
+    if not _unitsAreComplete:
+        changedTreeNames = None
+
+    _unitsAreComplete = False
+    oldUnits = getExecutionUnits()
+    reset(changedTreeNames)
+    problemAmount = len(problems.currentProblems)
     try:
-        createMainUnits(nodeByID)
-        createSubprogramUnits(nodeByID)
+        createMainUnits(nodeByID, changedTreeNames)
+        createSubprogramUnits(nodeByID, changedTreeNames)
+        finishRemovedUnits(oldUnits)
+        # units that reported a problem have to be recreated next time
+        _unitsAreComplete = len(problems.currentProblems) == problemAmount
     except:
         print("\n"*5)
         traceback.print_exc()
         ExceptionDuringCodeCreation().report()
 
-def reset():
+def invalidateExecutionUnits():
+    global _unitsAreComplete
+    _unitsAreComplete = False
+
+def reset(changedTreeNames = None):
     resetMeasurements()
+    resetNodeCaches()
+
+    if changedTreeNames is None:
+        _mainUnitsByNodeTree.clear()
+        _subprogramUnitsByIdentifier.clear()
+        nodeTrees = getAnimationNodeTrees()
+    else:
+        nodeTrees = [tree for tree in getAnimationNodeTrees() if tree.name in changedTreeNames]
+
+    for nodeTree in nodeTrees:
+        for node in nodeTree.nodes:
+            if node.isAnimationNode:
+                for socket in node.outputs:
+                    socket.execution.neededCopies = 0
+                    socket.execution.avoidedCopies = 0
+
+def createMainUnits(nodeByID, changedTreeNames):
+    oldUnitsByNodeTree = dict(_mainUnitsByNodeTree)
     _mainUnitsByNodeTree.clear()
-    _subprogramUnitsByIdentifier.clear()
 
-    for node in iterAnimationNodes():
-        for socket in node.outputs:
-            socket.execution.neededCopies = 0
+    oldUnitByNodeIDs = {}
+    for units in oldUnitsByNodeTree.values():
+        for unit in units:
+            oldUnitByNodeIDs[frozenset(unit.network.nodeIDs)] = unit
 
-def createMainUnits(nodeByID):
     for network in getNetworksByType("Main"):
-        unit = MainExecutionUnit(network, nodeByID)
+        unit = None
+        if not networkIsInChangedTrees(network, changedTreeNames):
+            unit = oldUnitByNodeIDs.get(frozenset(network.nodeIDs))
+        if unit is None:
+            unit = MainExecutionUnit(network, nodeByID)
+        else:
+            unit.network = network
         _mainUnitsByNodeTree[network.treeName].append(unit)
 
-def createSubprogramUnits(nodeByID):
+def createSubprogramUnits(nodeByID, changedTreeNames):
+    oldUnitsByIdentifier = dict(_subprogramUnitsByIdentifier)
+    _subprogramUnitsByIdentifier.clear()
+
     for network in getSubprogramNetworks():
-        if network.type == "Group":
-            unit = GroupExecutionUnit(network, nodeByID)
-        if network.type == "Loop":
-            unit = LoopExecutionUnit(network, nodeByID)
-        if network.type == "Script":
-            unit = ScriptExecutionUnit(network, nodeByID)
+        unit = None
+        if not networkIsInChangedTrees(network, changedTreeNames):
+            unit = oldUnitsByIdentifier.get(network.identifier)
+            if unit is not None and set(unit.network.nodeIDs) != set(network.nodeIDs):
+                unit = None
+        if unit is None:
+            unit = createSubprogramUnit(network, nodeByID)
+        else:
+            unit.network = network
         _subprogramUnitsByIdentifier[network.identifier] = unit
 
+def createSubprogramUnit(network, nodeByID):
+    if network.type == "Group":
+        return GroupExecutionUnit(network, nodeByID)
+    if network.type == "Loop":
+        return LoopExecutionUnit(network, nodeByID)
+    if network.type == "Script":
+        return ScriptExecutionUnit(network, nodeByID)
+
+def networkIsInChangedTrees(network, changedTreeNames):
+    if changedTreeNames is None:
+        return True
+    return any(nodeID[0] in changedTreeNames for nodeID in network.nodeIDs)
+
+def finishRemovedUnits(oldUnits):
+    currentUnits = set(map(id, getExecutionUnits()))
+    for unit in oldUnits:
+        if id(unit) not in currentUnits:
+            unit.finish()
+
 
 def setupExecutionUnits():
+    '''
+    Units stay set up between executions. Only units that are not set up yet
+    run their setup script, the others only load the values of changed sockets.
+    '''
     try:
         if len(getAnimationNodeTrees()) == 0: return
         if not problems.canExecute(): return
 
-        for unit in getExecutionUnits():
-            unit.setup()
-
-        subprograms = {}
-        for identifier, unit in _subprogramUnitsByIdentifier.items():
-            subprograms["_subprogram" + identifier] = unit.execute
-
-        for unit in getExecutionUnits():
-            unit.insertSubprogramFunctions(subprograms)
+        units = getExecutionUnits()
+        changedSocketPointers = _changedSocketPointers | getAnimatedSocketPointers()
+        _changedSocketPointers.clear()
+
+        newUnits = []
+        for unit in units:
+            if unit.isSetup:
+                for socketPointer in changedSocketPointers:
+                    unit.reloadSocketValue(socketPointer)
+            else:
+                unit.setup()
+                newUnits.append(unit)
+
+        if len(newUnits) > 0:
+            subprograms = {}
+            for identifier, unit in _subprogramUnitsByIdentifier.items():
+                subprograms["_subprogram" + identifier] = unit.execute
+
+            for unit in units:
+                unit.insertSubprogramFunctions(subprograms)
+
+        for unit in units:
+            unit.prepare()
     except:
         print("\n"*5)
         traceback.print_exc()
         CouldNotSetupExecutionUnits().report()
 
 def finishExecutionUnits():
+    # the units stay set up for the next execution
+    clearExecutionCache()
+
+@eventHandler("FILE_LOAD_POST")
+@eventHandler("UNDO_POST")
+@eventHandler("REDO_POST")
+def resetExecutionUnitSetups():
+    '''The setup data references Blender data that can become invalid.'''
+    _changedSocketPointers.clear()
     for unit in getExecutionUnits():
         unit.finish()
 
-    clearExecutionCache()
+def socketValueChanged(socket):
+    _changedSocketPointers.add(socket.as_pointer())
+
+def getAnimatedSocketPointers():
+    '''
+    Animated and driven socket values change without calling propertyChanged,
+    so they have to be loaded again before every execution.
+    '''
+    socketPointers = set()
+    for nodeTree in getAnimationNodeTrees():
+        animationData = nodeTree.animation_data
+        if animationData is None:
+            continue
+
+        fcurves = list(animationData.drivers)
+        if animationData.action is not None:
+            fcurves.extend(animationData.action.fcurves)
+
+        for fcurve in fcurves:
+            socketPath, _, _ = fcurve.data_path.rpartition(".")
+            if ".inputs[" not in socketPath:
+                continue
+            try: socketPointers.add(nodeTree.path_resolve(socketPath).as_pointer())
+            except: pass
+    return socketPointers
 
 
 def getMainUnitsByNodeTree(nodeTree):
@@ -14,6 +14,7 @@ class KeyframePath(bpy.types.PropertyGroup):
 class SetKeyframesNode(bpy.types.Node, AnimationNode):
     bl_idname = "an_SetKeyframesNode"
     bl_label = "Set Keyframes"
+    options = {"IGNORES_ID_UPDATES", "WRITES_BLENDER_DATA"}
     bl_width_default = 200
 
     paths: CollectionProperty(type = KeyframePath)
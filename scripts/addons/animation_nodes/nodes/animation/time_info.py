@@ -4,6 +4,7 @@ from ... base_types import AnimationNode
 class TimeInfoNode(bpy.types.Node, AnimationNode):
     bl_idname = "an_TimeInfoNode"
     bl_label = "Time Info"
+    options = {"IGNORES_ID_UPDATES"}
     searchTags = ["Frame"]
 
     def create(self):
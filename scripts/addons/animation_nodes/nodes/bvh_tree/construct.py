@@ -2,6 +2,7 @@ import bpy
 from bpy.props import *
 from mathutils.bvhtree import BVHTree
 from ... base_types import AnimationNode
+from ... utils.spatial_tree_cache import getDataHash, getCachedSpatialTree, storeSpatialTree
 
 sourceTypeItems = [
     ("MESH_DATA", "Mesh", "", "NONE", 0),
@@ -44,7 +45,15 @@ class ConstructBVHTreeNode(bpy.types.Node, AnimationNode):
             return self.getFallbackBVHTree()
 
         if 0 <= polygonsIndices.getMinIndex() <= polygonsIndices.getMaxIndex() < len(vectorList):
-            return BVHTree.FromPolygons(vectorList, polygonsIndices, epsilon = max(epsilon, 0))
+            epsilon = max(epsilon, 0)
+            key = ("BVHTREE", epsilon, getDataHash(vectorList, polygonsIndices.indices,
+                                                   polygonsIndices.polyStarts, polygonsIndices.polyLengths))
+            bvhTree = getCachedSpatialTree(key)
+            if bvhTree is None:
+                bvhTree = BVHTree.FromPolygons(vectorList, polygonsIndices, epsilon = epsilon)
+                storeSpatialTree(key, bvhTree, len(vectorList) * 12 + len(polygonsIndices.indices) * 4
+                                               + len(polygonsIndices) * 128)
+            return bvhTree
 
     def execute_BMesh(self, bm, epsilon):
         return BVHTree.FromBMesh(bm, epsilon = max(epsilon, 0))
@@ -8,6 +8,7 @@ from ... base_types import AnimationNode
 class SetVertexColorNode(bpy.types.Node, AnimationNode):
     bl_idname = "an_SetVertexColorNode"
     bl_label = "Set Vertex Color"
+    options = {"IGNORES_ID_UPDATES", "WRITES_BLENDER_DATA"}
     errorHandlingType = "EXCEPTION"
 
     vertexColorName: StringProperty(name = "Vertex Color Group", default = "Col", update = propertyChanged)
@@ -29,4 +29,4 @@ class EvaluateFCurveNode(bpy.types.Node, AnimationNode):
             yield "evaluationFrame += self.nodeTree.scene.frame_current_final"
 
         yield "if fCurve is None: value = 0.0"
-        yield "else: value = fCurve.evaluate(evaluationFrame)"
+        yield "else: value = animation_nodes.utils.fcurve.evaluateFCurve(fCurve, evaluationFrame)"
@@ -11,6 +11,7 @@ dataTypes = {
 class BlendDataByNameNode(bpy.types.Node, AnimationNode):
     bl_idname = "an_BlendDataByNameNode"
     bl_label = "Data by Name"
+    options = {"UNKNOWN_DEPENDENCIES"}
     dynamicLabelType = "ALWAYS"
 
     onlySearchTags = True
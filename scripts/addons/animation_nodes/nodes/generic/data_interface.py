@@ -13,6 +13,7 @@ dataDirectionItems = {
 class DataInterfaceNode(bpy.types.Node, AnimationNode):
     bl_idname = "an_DataInterfaceNode"
     bl_label = "Data Interface"
+    options = {"KEEPS_INPUTS"}
 
     dataDirection: EnumProperty(name = "Data Direction", default = "IMPORT",
         items = dataDirectionItems, update = AnimationNode.refresh)
@@ -14,6 +14,7 @@ expressionByIdentifier = {}
 class ExpressionNode(bpy.types.Node, AnimationNode):
     bl_idname = "an_ExpressionNode"
     bl_label = "Expression"
+    options = {"UNKNOWN_DEPENDENCIES"}
     bl_width_default = 200
     dynamicLabelType = "HIDDEN_ONLY"
 
@@ -1,5 +1,7 @@
 import bpy
+from mathutils.kdtree import KDTree
 from ... base_types import AnimationNode
+from ... utils.spatial_tree_cache import getDataHash, getCachedSpatialTree, storeSpatialTree
 
 class ConstructKDTreeNode(bpy.types.Node, AnimationNode):
     bl_idname = "an_ConstructKDTreeNode"
@@ -9,10 +11,13 @@ class ConstructKDTreeNode(bpy.types.Node, AnimationNode):
         self.newInput("Vector List", "Vector List", "vectorList")
         self.newOutput("KDTree", "KDTree", "kdTree")
 
-    def getExecutionCode(self, required):
-        yield "kdTree = mathutils.kdtree.KDTree(len(vectorList))"
-        yield "for i, vector in enumerate(vectorList): kdTree.insert(vector, i)"
-        yield "kdTree.balance()"
-
-    def getUsedModules(self):
-        return ["mathutils"]
+    def execute(self, vectorList):
+        key = ("KDTREE", getDataHash(vectorList))
+        kdTree = getCachedSpatialTree(key)
+        if kdTree is None:
+            kdTree = KDTree(len(vectorList))
+            for i, vector in enumerate(vectorList):
+                kdTree.insert(vector, i)
+            kdTree.balance()
+            storeSpatialTree(key, kdTree, len(vectorList) * 48)
+        return kdTree
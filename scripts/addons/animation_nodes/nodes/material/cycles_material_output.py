@@ -12,6 +12,7 @@ allowedSocketTypes = {
 class CyclesMaterialOutputNode(bpy.types.Node, AnimationNode):
     bl_idname = "an_CyclesMaterialOutputNode"
     bl_label = "Cycles Material Output"
+    options = {"WRITES_BLENDER_DATA"}
     bl_width_default = 160
 
     def getPossibleSocketItems(self, context):
@@ -84,7 +85,7 @@ class CyclesMaterialOutputNode(bpy.types.Node, AnimationNode):
     def getBakeCode(self):
         yield "socket = self.getSelectedSocket()"
         yield "if socket is not None:"
-        yield "    socket.keyframe_insert('default_value')"
+        yield "    _keyframe_recorder.record(socket, 'default_value')"
 
     def edit(self):
         inputSocket = self.inputs.get("Data")
@@ -7,6 +7,7 @@ from ... base_types import AnimationNode
 class ViewportColorNode(bpy.types.Node, AnimationNode):
     bl_idname = "an_ViewportColorNode"
     bl_label = "Viewport Color"
+    options = {"WRITES_BLENDER_DATA"}
 
     materialName: StringProperty(update = propertyChanged)
 
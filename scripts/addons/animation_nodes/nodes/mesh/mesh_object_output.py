@@ -14,6 +14,7 @@ meshDataTypeItems = [
 class MeshObjectOutputNode(bpy.types.Node, AnimationNode):
     bl_idname = "an_MeshObjectOutputNode"
     bl_label = "Mesh Object Output"
+    options = {"IGNORES_ID_UPDATES", "WRITES_BLENDER_DATA"}
     bl_width_default = 180
     errorHandlingType = "MESSAGE"
 
@@ -88,6 +89,9 @@ class MeshObjectOutputNode(bpy.types.Node, AnimationNode):
 
         if s["Material Indices"].isUsed: yield "    self.setMaterialIndices(mesh, materialIndices)"
 
+    def getFrameCacheCode(self):
+        yield "animation_nodes.execution.frame_cache.recordOutput(self, 'MESH', object)"
+
     def isValidObject(self, object):
         if object is None: return False
         if object.type != "MESH" or object.mode != "OBJECT":
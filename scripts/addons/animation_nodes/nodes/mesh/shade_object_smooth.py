@@ -4,6 +4,7 @@ from ... base_types import AnimationNode, VectorizedSocket
 class ShadeObjectSmooth(bpy.types.Node, AnimationNode):
     bl_idname = "an_ShadeObjectSmoothNode"
     bl_label = "Shade Object Smooth"
+    options = {"IGNORES_ID_UPDATES", "WRITES_BLENDER_DATA"}
     codeEffects = [VectorizedSocket.CodeEffect]
 
     useObjectList: VectorizedSocket.newProperty()
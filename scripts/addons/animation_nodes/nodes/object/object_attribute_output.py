@@ -7,6 +7,7 @@ from ... base_types import AnimationNode, VectorizedSocket
 class ObjectAttributeOutputNode(bpy.types.Node, AnimationNode):
     bl_idname = "an_ObjectAttributeOutputNode"
     bl_label = "Object Attribute Output"
+    options = {"IGNORES_ID_UPDATES", "WRITES_BLENDER_DATA"}
     bl_width_default = 180
     errorHandlingType = "MESSAGE"
 
@@ -79,5 +80,5 @@ class ObjectAttributeOutputNode(bpy.types.Node, AnimationNode):
             yield "    if object is None: continue"
         else:
             yield "if object is not None:"
-        yield "    try: object.keyframe_insert({})".format(repr(self.attribute))
+        yield "    try: _keyframe_recorder.record(object, {})".format(repr(self.attribute))
         yield "    except: pass"
@@ -5,6 +5,7 @@ from ... utils.attributes import pathBelongsToArray
 class ObjectDataPathOutputNode(bpy.types.Node, AnimationNode):
     bl_idname = "an_ObjectDataPathOutputNode"
     bl_label = "Object Data Path Output"
+    options = {"IGNORES_ID_UPDATES", "WRITES_BLENDER_DATA"}
     errorHandlingType = "MESSAGE"
 
     def create(self):
@@ -46,10 +47,10 @@ class ObjectDataPathOutputNode(bpy.types.Node, AnimationNode):
 
     def getBakeCode(self):
         yield "if object is not None:"
-        yield "    try: object.keyframe_insert(path, index = arrayIndex)"
+        yield "    try: _keyframe_recorder.record(object, path, arrayIndex)"
         yield "    except:"
         yield "        dataPath, propName = self.getPropertyPath(object, path)"
-        yield "        try: dataPath.keyframe_insert(propName, index = arrayIndex)"
+        yield "        try: _keyframe_recorder.record(dataPath, propName, arrayIndex)"
         yield "        except: pass"
 
     def clearCache(self):
@@ -36,7 +36,7 @@ class ObjectInstancerNode(bpy.types.Node, AnimationNode):
     bl_idname = "an_ObjectInstancerNode"
     bl_label = "Object Instancer"
     bl_width_default = 160
-    options = {"NOT_IN_SUBPROGRAM"}
+    options = {"NOT_IN_SUBPROGRAM", "WRITES_BLENDER_DATA"}
 
     def copyFromSourceChanged(self, context):
         self.refresh()
@@ -118,6 +118,10 @@ class ObjectInstancerNode(bpy.types.Node, AnimationNode):
         else:
             yield "objects = self.getInstances_WithoutSource(instancesAmount, _scenes)"
 
+    def getFrameCacheCode(self):
+        sourceObject = "sourceObject" if self.copyFromSource else "None"
+        yield "animation_nodes.execution.frame_cache.recordOutput(self, 'INSTANCES', objects, {}, _scenes)".format(sourceObject)
+
     def getInstances_WithSource(self, instancesAmount, sourceObject, scenes):
         if sourceObject is None:
             self.removeAllObjects()
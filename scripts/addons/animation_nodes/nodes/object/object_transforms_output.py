@@ -6,6 +6,7 @@ from ... events import executionCodeChanged
 class ObjectTransformsOutputNode(bpy.types.Node, AnimationNode):
     bl_idname = "an_ObjectTransformsOutputNode"
     bl_label = "Object Transforms Output"
+    options = {"IGNORES_ID_UPDATES", "WRITES_BLENDER_DATA"}
     bl_width_default = 180
     codeEffects = [VectorizedSocket.CodeEffect]
 
@@ -118,15 +119,18 @@ class ObjectTransformsOutputNode(bpy.types.Node, AnimationNode):
 
         for i in range(3):
             if self.useLocation[i]:
-                yield "    object.keyframe_insert('{}', index = {})".format(self.locationPath, i)
+                yield "    _keyframe_recorder.record(object, '{}', {})".format(self.locationPath, i)
 
         for i in range(3):
             if self.useRotation[i]:
-                yield "    object.keyframe_insert('{}', index = {})".format(self.rotationPath, i)
+                yield "    _keyframe_recorder.record(object, '{}', {})".format(self.rotationPath, i)
 
         for i in range(3):
             if self.useScale[i]:
-                yield "    object.keyframe_insert('{}', index = {})".format(self.scalePath, i)
+                yield "    _keyframe_recorder.record(object, '{}', {})".format(self.scalePath, i)
+
+    def getFrameCacheCode(self):
+        yield "animation_nodes.execution.frame_cache.recordOutput(self, 'TRANSFORMS', object)"
 
     @property
     def locationPath(self):
@@ -14,6 +14,7 @@ attributes = [
 class ObjectVisibilityOutputNode(bpy.types.Node, AnimationNode):
     bl_idname = "an_ObjectVisibilityOutputNode"
     bl_label = "Object Visibility Output"
+    options = {"IGNORES_ID_UPDATES", "WRITES_BLENDER_DATA"}
     codeEffects = [VectorizedSocket.CodeEffect]
 
     useObjectList: VectorizedSocket.newProperty()
@@ -53,5 +54,5 @@ class ObjectVisibilityOutputNode(bpy.types.Node, AnimationNode):
         yield "if object is not None:"
         for name, _, attr, _ in attributes:
             if self.inputs[name].isUsed:
-                yield "    object.keyframe_insert('{}')".format(attr)
+                yield "    _keyframe_recorder.record(object, '{}')".format(attr)
         yield "    pass"
@@ -10,6 +10,7 @@ frameTypeItems = [
 class CopyTransformsNode(bpy.types.Node, AnimationNode):
     bl_idname = "an_CopyTransformsNode"
     bl_label = "Copy Transforms"
+    options = {"WRITES_BLENDER_DATA"}
     bl_width_default = 160
 
     def useCurrentTransformsChanged(self, context):
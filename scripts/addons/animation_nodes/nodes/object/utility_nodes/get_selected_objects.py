@@ -6,6 +6,7 @@ from .... utils.selection import getSortedSelectedObjects
 class GetSelectedObjectsNode(bpy.types.Node, AnimationNode):
     bl_idname = "an_GetSelectedObjectsNode"
     bl_label = "Get Selected Objects"
+    options = {"UNKNOWN_DEPENDENCIES"}
     searchTags = ["Get Active Object"]
     bl_width_default = 200
 
@@ -4,6 +4,7 @@ from .... base_types import AnimationNode
 class ResetObjectTransformsNode(bpy.types.Node, AnimationNode):
     bl_idname = "an_ResetObjectTransformsNode"
     bl_label = "Reset Object Transforms"
+    options = {"IGNORES_ID_UPDATES", "WRITES_BLENDER_DATA"}
 
     def create(self):
         self.newInput("Object", "Object", "object").defaultDrawType = "PROPERTY_ONLY"
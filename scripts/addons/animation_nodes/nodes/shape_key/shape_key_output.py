@@ -4,6 +4,7 @@ from ... base_types import AnimationNode, VectorizedSocket
 class ShapeKeyOutputNode(bpy.types.Node, AnimationNode):
     bl_idname = "an_ShapeKeyOutputNode"
     bl_label = "Shape Key Output"
+    options = {"WRITES_BLENDER_DATA"}
     bl_width_default = 160
     codeEffects = [VectorizedSocket.CodeEffect]
 
@@ -48,7 +49,7 @@ class ShapeKeyOutputNode(bpy.types.Node, AnimationNode):
     def getBakeCode(self):
         yield "if shapeKey is not None:"
         s = self.inputs
-        if s[1].isUsed: yield "    shapeKey.keyframe_insert('value')"
-        if s[2].isUsed: yield "    shapeKey.keyframe_insert('slider_min')"
-        if s[3].isUsed: yield "    shapeKey.keyframe_insert('slider_max')"
-        if s[4].isUsed: yield "    shapeKey.keyframe_insert('mute')"
+        if s[1].isUsed: yield "    _keyframe_recorder.record(shapeKey, 'value')"
+        if s[2].isUsed: yield "    _keyframe_recorder.record(shapeKey, 'slider_min')"
+        if s[3].isUsed: yield "    _keyframe_recorder.record(shapeKey, 'slider_max')"
+        if s[4].isUsed: yield "    _keyframe_recorder.record(shapeKey, 'mute')"
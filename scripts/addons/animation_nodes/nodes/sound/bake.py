@@ -1,15 +1,17 @@
 import bpy
 import os
+import time
+import numpy
 from bpy.props import *
 from ... data_structures import FloatList
 from ... utils.names import getRandomString
 from ... tree_info import getNodeByIdentifier
 from ... base_types import AnimationNode
 
-from ... utils.objects import enterObjectMode
 from ... utils.path import getAbsolutePathOfSound
-from ... utils.fcurve import getSingleFCurveWithDataPath
-from ... utils.blender_ui import getDpiFactor, executeInAreaType
+from ... utils.blender_ui import getDpiFactor, redrawAreaType
+from ... algorithms.sound_spectrum import (calculateFrequencyRangeAmplitudes, applyEnvelope,
+                                           iterFrequencyRangeAmplitudeChunks, getFrameAmount)
 from ... utils.sequence_editor import getOrCreateSequencer, getEmptyChannel
 
 class SoundFrequencyRange(bpy.types.PropertyGroup):
@@ -257,53 +259,66 @@ class BakeSpectrumData(bpy.types.Operator):
         try: self.node = getNodeByIdentifier(self.nodeIdentifier)
         except: self.node = None
         self.sound = bpy.data.sounds[self.soundName]
-        self.currentIndex = 0
-        self.spectrumData = []
-        self.counter = 0
-        context.window_manager.modal_handler_add(self)
-        self.timer = context.window_manager.event_timer_add(0.001, context.window)
+        self.ranges = [(item.low, item.high) for item in self.frequencyRanges]
+
+        samples, sampleRate = readSoundSamples(self.sound)
+        self.fps = getSceneFPS()
+        self.frameAmount = getFrameAmount(len(samples), sampleRate, self.fps)
+        self.chunks = []
+        self.bakedFrames = 0
+        self.chunkIterator = iterFrequencyRangeAmplitudeChunks(samples, sampleRate, self.fps, self.ranges)
+
+        wm = context.window_manager
+        wm.progress_begin(0, max(self.frameAmount, 1))
+        wm.modal_handler_add(self)
+        self.timer = wm.event_timer_add(0.001, window = context.window)
         self.setNodeMessage("Baking Started")
         return {"RUNNING_MODAL"}
 
-    def finish(self):
-        bpy.context.window_manager.event_timer_remove(self.timer)
-        self.setNodeMessage("")
-        return {"FINISHED"}
-
     def modal(self, context, event):
-        if "ESC" == event.type: return self.finish()
-        self.counter += 1
-        if self.counter % 20 != 0: return {"RUNNING_MODAL"}
-
-        if self.currentIndex < len(self.frequencyRanges):
-            item = self.frequencyRanges[self.currentIndex]
-            data = bake(self.sound, item.low, item.high, self.attack, self.release)
-            self.spectrumData.append(data)
-            self.currentIndex += 1
-            self.setNodeMessage("Frequency range {}-{} baked".format(item.low, item.high))
-        else:
-            self.storeBakedData()
-            return self.finish()
+        if event.type in ("RIGHTMOUSE", "ESC"):
+            self.chunkIterator.close()
+            return self.finish(context, "CANCELLED")
+
+        if event.type == "TIMER":
+            # calculate a few chunks per timer event so that the ui stays responsive
+            start = time.perf_counter()
+            for chunk in self.chunkIterator:
+                self.chunks.append(chunk)
+                self.bakedFrames += len(chunk)
+                if time.perf_counter() - start > 0.1:
+                    break
+            else:
+                self.storeBakedData()
+                return self.finish(context, "FINISHED")
+
+            context.window_manager.progress_update(self.bakedFrames)
+            self.setNodeMessage("Baked {} of {} frames".format(self.bakedFrames, self.frameAmount))
+            redrawAreaType("NODE_EDITOR")
 
-        context.area.tag_redraw()
         return {"RUNNING_MODAL"}
 
+    def finish(self, context, result):
+        wm = context.window_manager
+        wm.event_timer_remove(self.timer)
+        wm.progress_end()
+        self.setNodeMessage("")
+        redrawAreaType("NODE_EDITOR")
+        return {result}
+
     def storeBakedData(self):
-        item = self.getNewSpectrumItem()
-        frequencyAmount = len(self.frequencyRanges)
-
-        data = self.spectrumData
-        samples = FloatList(length = len(data[0]) * frequencyAmount)
-        for i, samplesForFrequency in enumerate(data):
-            samples[i::frequencyAmount] = samplesForFrequency
-        item.setSamples(samples, frequencyAmount)
-
-    def getNewSpectrumItem(self):
-        spectrumItem = self.sound.bakedData.spectrum.add()
-        spectrumItem.attack = self.attack
-        spectrumItem.release = self.release
-        spectrumItem.identifier = getRandomString(10)
-        return spectrumItem
+        if len(self.chunks) == 0:
+            amplitudes = numpy.zeros((0, len(self.ranges)), dtype = numpy.float32)
+        else:
+            amplitudes = numpy.concatenate(self.chunks)
+        amplitudes = applyEnvelope(amplitudes, self.fps, self.attack, self.release)
+
+        item = self.sound.bakedData.spectrum.add()
+        item.attack = self.attack
+        item.release = self.release
+        item.identifier = getRandomString(10)
+        # the samples of all frequency ranges are interleaved per frame
+        item.setSamples(FloatList.fromValues(amplitudes.reshape(-1)), len(self.ranges))
 
     def setNodeMessage(self, message):
         if self.node: self.node.bakeProgress = message
@@ -314,48 +329,37 @@ class BakeSpectrumData(bpy.types.Operator):
 
 def bake(sound, low = 0.0, high = 100000, attack = 0.005, release = 0.2):
     '''Returns a float list containing the sampled data'''
-    object = createObjectWithFCurveAsTarget()
-
-    oldAreaType = switchArea("GRAPH_EDITOR")
-    oldFrame = setCurrentFrame(0)
+    amplitudes = bakeFrequencyRanges(sound, [(low, high)], attack, release)
+    return FloatList.fromValues(amplitudes[:, 0])
+
+def bakeFrequencyRanges(sound, frequencyRanges, attack, release):
+    '''
+    Decodes the sound only once and returns an array with one row per frame
+    and one column per frequency range.
+    '''
+    samples, sampleRate = readSoundSamples(sound)
+    fps = getSceneFPS()
+    amplitudes = calculateFrequencyRangeAmplitudes(samples, sampleRate, fps, frequencyRanges)
+    return applyEnvelope(amplitudes, fps, attack, release)
+
+def readSoundSamples(sound):
+    '''Returns the mono samples and the sample rate of the sound.'''
+    import aud
     usedUnpacking, filepath = getRealFilePath(sound)
+    try:
+        audSound = aud.Sound(filepath)
+        sampleRate = audSound.specs[0]
+        data = audSound.data()
+    finally:
+        if usedUnpacking: os.remove(filepath)
+
+    if data.ndim == 2:
+        data = data.mean(axis = 1)
+    return data, sampleRate
 
-    bpy.ops.graph.sound_bake(
-        filepath = filepath,
-        low = low,
-        high = high,
-        attack = attack,
-        release = release)
-
-    if usedUnpacking: os.remove(filepath)
-    soundData = getSamplesFromFCurve(object)
-    removeObject(object)
-    setCurrentFrame(oldFrame)
-    switchArea(oldAreaType)
-    return soundData
-
-@executeInAreaType("VIEW_3D")
-def createObjectWithFCurveAsTarget():
-    enterObjectMode()
-    bpy.ops.object.add()
-    object = bpy.context.active_object
-    object.keyframe_insert(frame = 0, data_path = "location", index = 0)
-    return object
-
-def removeObject(object):
-    bpy.context.scene.objects.unlink(object)
-    bpy.data.objects.remove(object)
-
-def setCurrentFrame(frame):
-    oldFrame = bpy.context.scene.frame_current
-    bpy.context.scene.frame_current = frame
-    return oldFrame
-
-def switchArea(targetType):
-    area = bpy.context.area
-    oldType = area.type
-    area.type = targetType
-    return oldType
+def getSceneFPS():
+    render = bpy.context.scene.render
+    return render.fps / render.fps_base
 
 def getRealFilePath(sound):
     filepath = getAbsolutePathOfSound(sound)
@@ -376,14 +380,6 @@ def createAverageDataItem(sound, low, high, attack, release):
     item.identifier = getRandomString(10)
     return item
 
-def getSamplesFromFCurve(object):
-    fcurve = getSingleFCurveWithDataPath(object, "location")
-    samples = FloatList(length = len(fcurve.sampled_points) * 2)
-    fcurve.sampled_points.foreach_get("co", samples.asMemoryView())
-    return samples[1::2]
-
-
-
 # Bake Spectrum Data
 ################################
 
@@ -6,6 +6,7 @@ from ... data_structures.splines.to_blender import setSplinesOnBlenderObject
 class CurveObjectOutputNode(bpy.types.Node, AnimationNode):
     bl_idname = "an_CurveObjectOutputNode"
     bl_label = "Curve Object Output"
+    options = {"IGNORES_ID_UPDATES", "WRITES_BLENDER_DATA"}
     bl_width_default = 180
     errorHandlingType = "MESSAGE"
 
@@ -59,6 +60,9 @@ class CurveObjectOutputNode(bpy.types.Node, AnimationNode):
         if s["Bevel Object"].isUsed:        yield "    curve.bevel_object = bevelObject"
         if s["Fill Mode"].isUsed:           yield "    self.setFillMode(curve, fillMode)"
 
+    def getFrameCacheCode(self):
+        yield "animation_nodes.execution.frame_cache.recordOutput(self, 'SPLINES', object)"
+
     def setSplines(self, object, splines):
         setSplinesOnBlenderObject(object, splines)
 
@@ -74,10 +78,10 @@ class CurveObjectOutputNode(bpy.types.Node, AnimationNode):
         yield "    curve = object.data"
 
         s = self.inputs
-        if s["Bevel Depth"].isUsed:         yield "    curve.keyframe_insert('bevel_depth')"
-        if s["Bevel Resolution"].isUsed:    yield "    curve.keyframe_insert('bevel_resolution')"
-        if s["Bevel Start"].isUsed:         yield "    curve.keyframe_insert('bevel_factor_start')"
-        if s["Bevel End"].isUsed:           yield "    curve.keyframe_insert('bevel_factor_end')"
-        if s["Extrude"].isUsed:             yield "    curve.keyframe_insert('extrude')"
-        if s["Offset"].isUsed:              yield "    curve.keyframe_insert('offset')"
-        if s["Preview Resolution"].isUsed:  yield "    curve.keyframe_insert('resolution_u')"
+        if s["Bevel Depth"].isUsed:         yield "    _keyframe_recorder.record(curve, 'bevel_depth')"
+        if s["Bevel Resolution"].isUsed:    yield "    _keyframe_recorder.record(curve, 'bevel_resolution')"
+        if s["Bevel Start"].isUsed:         yield "    _keyframe_recorder.record(curve, 'bevel_factor_start')"
+        if s["Bevel End"].isUsed:           yield "    _keyframe_recorder.record(curve, 'bevel_factor_end')"
+        if s["Extrude"].isUsed:             yield "    _keyframe_recorder.record(curve, 'extrude')"
+        if s["Offset"].isUsed:              yield "    _keyframe_recorder.record(curve, 'offset')"
+        if s["Preview Resolution"].isUsed:  yield "    _keyframe_recorder.record(curve, 'resolution_u')"
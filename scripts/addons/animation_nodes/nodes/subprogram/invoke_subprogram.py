@@ -23,6 +23,7 @@ class InvokeSubprogramNode(bpy.types.Node, AnimationNode):
     bl_label = "Invoke Subprogram"
     bl_width_default = 160
     dynamicLabelType = "HIDDEN_ONLY"
+    options = {"KEEPS_INPUTS"}
 
     subprogramIdentifier: StringProperty(name = "Subprogram Identifier", default = "",
         update = AnimationNode.refresh)
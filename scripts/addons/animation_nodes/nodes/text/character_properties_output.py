@@ -5,6 +5,7 @@ from ... base_types import AnimationNode
 class CharacterPropertiesOutputNode(bpy.types.Node, AnimationNode):
     bl_idname = "an_CharacterPropertiesOutputNode"
     bl_label = "Character Properties Output"
+    options = {"IGNORES_ID_UPDATES", "WRITES_BLENDER_DATA"}
 
     allowNegativeIndex: BoolProperty(default = True)
 
@@ -4,6 +4,7 @@ from ... base_types import AnimationNode
 class TextBlockWriterNode(bpy.types.Node, AnimationNode):
     bl_idname = "an_TextBlockWriterNode"
     bl_label = "Text Block Writer"
+    options = {"IGNORES_ID_UPDATES", "WRITES_BLENDER_DATA"}
 
     def create(self):
         self.newInput("Text Block", "Text Block", "textBlock", defaultDrawType = "PROPERTY_ONLY")
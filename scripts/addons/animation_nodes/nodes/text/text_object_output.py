@@ -6,6 +6,7 @@ from ... base_types import AnimationNode, VectorizedSocket
 class TextObjectOutputNode(bpy.types.Node, AnimationNode):
     bl_idname = "an_TextObjectOutputNode"
     bl_label = "Text Object Output"
+    options = {"IGNORES_ID_UPDATES", "WRITES_BLENDER_DATA"}
     bl_width_default = 160
     codeEffects = [VectorizedSocket.CodeEffect]
     errorHandlingType = "MESSAGE"
@@ -125,16 +126,16 @@ class TextObjectOutputNode(bpy.types.Node, AnimationNode):
         yield "    textObject = object.data"
 
         s = self.inputs
-        if s["Size"].isUsed:                yield "    textObject.keyframe_insert('size')"
-        if s["Extrude"].isUsed:             yield "    textObject.keyframe_insert('extrude')"
-        if s["Shear"].isUsed:               yield "    textObject.keyframe_insert('shear')"
-        if s["Bevel Depth"].isUsed:         yield "    textObject.keyframe_insert('bevel_depth')"
-        if s["Bevel Resolution"].isUsed:    yield "    textObject.keyframe_insert('bevel_resolution')"
-
-        if s["Letter Spacing"].isUsed:      yield "    textObject.keyframe_insert('space_character')"
-        if s["Word Spacing"].isUsed:        yield "    textObject.keyframe_insert('space_word')"
-        if s["Line Spacing"].isUsed:        yield "    textObject.keyframe_insert('space_line')"
-
-        if s["X Offset"].isUsed:            yield "    textObject.keyframe_insert('offset_x')"
-        if s["Y Offset"].isUsed:            yield "    textObject.keyframe_insert('offset_y')"
-        if s["Align"].isUsed:               yield "    textObject.keyframe_insert('align')"
+        if s["Size"].isUsed:                yield "    _keyframe_recorder.record(textObject, 'size')"
+        if s["Extrude"].isUsed:             yield "    _keyframe_recorder.record(textObject, 'extrude')"
+        if s["Shear"].isUsed:               yield "    _keyframe_recorder.record(textObject, 'shear')"
+        if s["Bevel Depth"].isUsed:         yield "    _keyframe_recorder.record(textObject, 'bevel_depth')"
+        if s["Bevel Resolution"].isUsed:    yield "    _keyframe_recorder.record(textObject, 'bevel_resolution')"
+
+        if s["Letter Spacing"].isUsed:      yield "    _keyframe_recorder.record(textObject, 'space_character')"
+        if s["Word Spacing"].isUsed:        yield "    _keyframe_recorder.record(textObject, 'space_word')"
+        if s["Line Spacing"].isUsed:        yield "    _keyframe_recorder.record(textObject, 'space_line')"
+
+        if s["X Offset"].isUsed:            yield "    _keyframe_recorder.record(textObject, 'offset_x')"
+        if s["Y Offset"].isUsed:            yield "    _keyframe_recorder.record(textObject, 'offset_y')"
+        if s["Align"].isUsed:               yield "    _keyframe_recorder.record(textObject, 'align')"
@@ -4,6 +4,7 @@ from ... base_types import AnimationNode
 class TextSequenceOutputNode(bpy.types.Node, AnimationNode):
     bl_idname = "an_TextSequenceOutputNode"
     bl_label = "Text Sequence Output"
+    options = {"IGNORES_ID_UPDATES", "WRITES_BLENDER_DATA"}
     bl_width_default = 160
     errorHandlingType = "MESSAGE"
 
@@ -57,10 +58,10 @@ class TextSequenceOutputNode(bpy.types.Node, AnimationNode):
         yield "if getattr(sequence, 'type', '') == 'TEXT':"
         yield "    pass"
         s = self.inputs
-        if s["Size"].isUsed:        yield "    sequence.keyframe_insert('font_size')"
-        if s["Shadow"].isUsed:      yield "    sequence.keyframe_insert('use_shadow')"
-        if s["X Align"].isUsed:     yield "    sequence.keyframe_insert('align_x')"
-        if s["Y Align"].isUsed:     yield "    sequence.keyframe_insert('align_y')"
-        if s["X Location"].isUsed:  yield "    sequence.keyframe_insert('location', index = 0)"
-        if s["Y Location"].isUsed:  yield "    sequence.keyframe_insert('location', index = 1)"
-        if s["Wrap Width"].isUsed:  yield "    sequence.keyframe_insert('wrap_width')"
+        if s["Size"].isUsed:        yield "    _keyframe_recorder.record(sequence, 'font_size')"
+        if s["Shadow"].isUsed:      yield "    _keyframe_recorder.record(sequence, 'use_shadow')"
+        if s["X Align"].isUsed:     yield "    _keyframe_recorder.record(sequence, 'align_x')"
+        if s["Y Align"].isUsed:     yield "    _keyframe_recorder.record(sequence, 'align_y')"
+        if s["X Location"].isUsed:  yield "    _keyframe_recorder.record(sequence, 'location', 0)"
+        if s["Y Location"].isUsed:  yield "    _keyframe_recorder.record(sequence, 'location', 1)"
+        if s["Wrap Width"].isUsed:  yield "    _keyframe_recorder.record(sequence, 'wrap_width')"
@@ -30,6 +30,7 @@ drawableDataTypes = (Vector3DList, Matrix4x4List, Vector, Matrix)
 class Viewer3DNode(bpy.types.Node, AnimationNode):
     bl_idname = "an_Viewer3DNode"
     bl_label = "3D Viewer"
+    options = {"KEEPS_INPUTS"}
 
     def drawPropertyChanged(self, context):
         self.execute(self.getCurrentData())
@@ -1,41 +1,79 @@
 import bpy
+import time
 from bpy.props import *
-from .. preferences import getPreferences
+from .. utils.nodes import getAnimationNodeTrees
+from .. preferences import getExecutionCodeSettings
+from .. execution.keyframe_bake import getKeyframeRecorder
 
 class BakeAnimation(bpy.types.Operator):
     bl_idname = "an.bake_to_keyframes"
     bl_label = "Bake to Keyframes"
-    bl_description = "Playback animation and make keyframes (only supported nodes)"
+    bl_description = "Execute the trees for every frame and make keyframes (only supported nodes)"
 
     startFrame: IntProperty(default = 1)
     endFrame: IntProperty(default = 250)
 
     def invoke(self, context, event):
-        context.window_manager.modal_handler_add(self)
-        self.timer = context.window_manager.event_timer_add(0.001, context.window)
-
-        getPreferences().executionCode.type = "BAKE"
+        from .. update import updateEverything
+        settings = getExecutionCodeSettings()
+        self.oldExecutionCodeType = settings.type
+        settings.type = "BAKE"
+        updateEverything()
 
         self.scene = context.scene
-        self.scene.frame_set(self.startFrame)
+        self.oldFrame = self.scene.frame_current
+        self.frames = list(range(self.startFrame, self.endFrame + 1))
+        self.processedFrames = 0
+        self.nodeTrees = [tree for tree in getAnimationNodeTrees() if tree.autoExecution.enabled]
+
+        self.recorder = getKeyframeRecorder()
+        self.recorder.startBake()
+
+        wm = context.window_manager
+        wm.progress_begin(0, len(self.frames))
+        wm.modal_handler_add(self)
+        self.timer = wm.event_timer_add(0.001, window = context.window)
         return {"RUNNING_MODAL"}
 
     def modal(self, context, event):
         if event.type in ("RIGHTMOUSE", "ESC"):
-            return self.finish()
-
-        currentFrame = self.scene.frame_current
+            return self.finish(context, cancelled = True)
 
         if event.type == "TIMER":
-            self.scene.frame_set(currentFrame + 1)
-            self.scene.update()
-
-        if self.scene.frame_current == self.endFrame:
-            return self.finish()
+            # bake many frames per timer event, the timer only keeps the ui responsive
+            start = time.perf_counter()
+            while self.processedFrames < len(self.frames) and time.perf_counter() - start < 0.1:
+                self.bakeFrame(self.frames[self.processedFrames])
+                self.processedFrames += 1
+            context.window_manager.progress_update(self.processedFrames)
 
+        if self.processedFrames == len(self.frames):
+            return self.finish(context, cancelled = False)
         return {"RUNNING_MODAL"}
 
-    def finish(self):
-        getPreferences().executionCode.type = "DEFAULT"
-        bpy.context.window_manager.event_timer_remove(self.timer)
+    def bakeFrame(self, frame):
+        self.scene.frame_set(frame)
+        self.recorder.frame = frame
+        try:
+            for nodeTree in self.nodeTrees:
+                nodeTree.execute()
+        finally:
+            self.recorder.frame = None
+
+    def finish(self, context, cancelled):
+        from .. update import updateEverything
+        wm = context.window_manager
+        wm.event_timer_remove(self.timer)
+        wm.progress_end()
+
+        self.recorder.finishBake(writeKeyframes = not cancelled)
+
+        getExecutionCodeSettings().type = self.oldExecutionCodeType
+        updateEverything()
+        self.scene.frame_set(self.oldFrame)
+
+        if cancelled:
+            self.report({"INFO"}, "Bake cancelled")
+            return {"CANCELLED"}
+        self.report({"INFO"}, "Baked {} frames".format(self.processedFrames))
         return {"FINISHED"}
@@ -0,0 +1,86 @@
+import bpy
+import time
+from bpy.props import *
+from .. problems import canExecute
+from .. utils.blender_ui import redrawAll
+from .. execution.frame_cache import (startRecording, recordFrame, stopRecording,
+                                      clearFrameCache, getUncachedOutputNodes)
+
+class CacheFrames(bpy.types.Operator):
+    bl_idname = "an.cache_frames"
+    bl_label = "Cache Frames"
+    bl_description = "Execute the tree for every frame in the range and store the output data on disk"
+
+    treeName: StringProperty()
+
+    @classmethod
+    def poll(cls, context):
+        return canExecute()
+
+    def invoke(self, context, event):
+        self.nodeTree = bpy.data.node_groups.get(self.treeName)
+        if self.nodeTree is None:
+            return {"CANCELLED"}
+
+        uncachedNodes = getUncachedOutputNodes(self.nodeTree)
+        if len(uncachedNodes) > 0:
+            self.report({"ERROR"}, "The output of these nodes can't be cached: " + ", ".join(uncachedNodes))
+            return {"CANCELLED"}
+
+        settings = self.nodeTree.frameCache
+        self.scene = self.nodeTree.scene
+        self.frames = list(range(settings.startFrame, settings.endFrame + 1))
+        self.processedFrames = 0
+        self.oldFrame = self.scene.frame_current
+
+        self.cacheFile = startRecording(self.nodeTree)
+
+        wm = context.window_manager
+        wm.progress_begin(0, len(self.frames))
+        wm.modal_handler_add(self)
+        self.timer = wm.event_timer_add(0.001, window = context.window)
+        return {"RUNNING_MODAL"}
+
+    def modal(self, context, event):
+        if event.type in ("RIGHTMOUSE", "ESC"):
+            return self.finish(context)
+
+        if event.type == "TIMER":
+            # record a few frames per timer event so that the ui stays responsive
+            start = time.perf_counter()
+            while self.processedFrames < len(self.frames) and time.perf_counter() - start < 0.1:
+                frame = self.frames[self.processedFrames]
+                self.scene.frame_set(frame)
+                recordFrame(self.nodeTree, self.cacheFile, frame)
+                self.processedFrames += 1
+            context.window_manager.progress_update(self.processedFrames)
+
+        if self.processedFrames == len(self.frames):
+            return self.finish(context)
+        return {"RUNNING_MODAL"}
+
+    def finish(self, context):
+        wm = context.window_manager
+        wm.event_timer_remove(self.timer)
+        wm.progress_end()
+        stopRecording(self.nodeTree, self.cacheFile)
+        self.scene.frame_set(self.oldFrame)
+        self.report({"INFO"}, "Cached {} frames".format(self.processedFrames))
+        redrawAll()
+        return {"FINISHED"}
+
+
+class ClearFrameCache(bpy.types.Operator):
+    bl_idname = "an.clear_frame_cache"
+    bl_label = "Clear Frame Cache"
+    bl_description = "Remove the cache file of the tree"
+
+    treeName: StringProperty()
+
+    def execute(self, context):
+        nodeTree = bpy.data.node_groups.get(self.treeName)
+        if nodeTree is None:
+            return {"CANCELLED"}
+        clearFrameCache(nodeTree)
+        redrawAll()
+        return {"FINISHED"}
@@ -67,3 +67,31 @@ def execute_ScriptGeneration():
     nodeByID = createNodeByIdDict()
     units.createExecutionUnits(nodeByID)
     nodeByID.clear()
+
+
+class ExportExecutionTimeline(bpy.types.Operator):
+    bl_idname = "an.export_execution_timeline"
+    bl_label = "Export Timeline"
+    bl_description = "Export the measured node executions as Chrome trace (.json) or as .csv file"
+
+    filepath: StringProperty(subtype = "FILE_PATH")
+
+    fileFormat: EnumProperty(name = "Format", default = "CHROME_TRACE", items = [
+        ("CHROME_TRACE", "Chrome Trace", "Trace event format for chrome://tracing", "NONE", 0),
+        ("CSV", "CSV", "One row per node execution", "NONE", 1)])
+
+    def invoke(self, context, event):
+        extension = ".json" if self.fileFormat == "CHROME_TRACE" else ".csv"
+        self.filepath = "animation_nodes_timeline" + extension
+        context.window_manager.fileselect_add(self)
+        return {"RUNNING_MODAL"}
+
+    def execute(self, context):
+        from .. execution.measurements import exportTimelineAsChromeTrace, exportTimelineAsCSV
+        path = bpy.path.abspath(self.filepath)
+        if self.fileFormat == "CHROME_TRACE":
+            exportTimelineAsChromeTrace(path)
+        else:
+            exportTimelineAsCSV(path)
+        self.report({"INFO"}, "Timeline exported to {}".format(path))
+        return {"FINISHED"}
@@ -93,7 +93,8 @@ class ExecutionCodeProperties(bpy.types.PropertyGroup):
         ("DEFAULT", "Default", "", "NONE", 0),
         ("MONITOR", "Monitor Execution", "", "NONE", 1),
         ("MEASURE", "Measure Execution Times", "", "NONE", 2),
-        ("BAKE", "Bake", "", "NONE", 3)]
+        ("BAKE", "Bake", "", "NONE", 3),
+        ("INCREMENTAL", "Skip Unchanged Nodes", "", "NONE", 4)]
 
     type: EnumProperty(name = "Execution Code Type", default = "DEFAULT",
         description = "Different execution codes can be useful in different contexts",
@@ -111,6 +112,12 @@ class ExecutionCodeProperties(bpy.types.PropertyGroup):
         get = get_MeasureExecution, set = set_MeasureExecution,
         description = "Measure execution times of the individual nodes")
 
+    showTimeline: BoolProperty(name = "Show Timeline", default = False,
+        description = "Draw the node executions of the last measured execution in the node editor")
+
+    useCodeCache: BoolProperty(name = "Cache Compiled Code", default = True,
+        description = "Store compiled execution code on disk so that it can be reused after reopening a file")
+
 class DrawMeshIndicesProperties(bpy.types.PropertyGroup):
     bl_idname = "an_DrawMeshIndicesProperties"
     _drawVertices = _drawEdges = _drawPolygons = False
@@ -199,6 +206,9 @@ def getExecutionCodeSettings():
 def getExecutionCodeType():
     return getExecutionCodeSettings().type
 
+def codeCacheIsEnabled():
+    return getExecutionCodeSettings().useCodeCache
+
 def getColorSettings():
     return getPreferences().nodeColors
 
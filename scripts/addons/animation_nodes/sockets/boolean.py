@@ -13,6 +13,7 @@ class BooleanSocket(bpy.types.NodeSocket, AnimationNodeSocket):
     drawColor = (0.7, 0.7, 0.4, 1)
     storable = True
     comparable = True
+    staticValue = True
 
     value: BoolProperty(default = True, update = propertyChanged)
     showCreateCompareNodeButton: BoolProperty(default = False)
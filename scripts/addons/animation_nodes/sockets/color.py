@@ -10,6 +10,7 @@ class ColorSocket(bpy.types.NodeSocket, AnimationNodeSocket):
     drawColor = (0.8, 0.8, 0.2, 1)
     storable = True
     comparable = False
+    staticValue = True
 
     value: FloatVectorProperty(
         default = [0.5, 0.5, 0.5], subtype = "COLOR",
@@ -12,6 +12,7 @@ class EulerSocket(bpy.types.NodeSocket, AnimationNodeSocket):
     drawColor = (0.1, 0.0, 0.4, 1.0)
     storable = True
     comparable = False
+    staticValue = True
 
     value: FloatVectorProperty(default = [0, 0, 0], update = propertyChanged, subtype = "EULER")
 
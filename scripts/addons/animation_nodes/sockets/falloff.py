@@ -12,6 +12,7 @@ class FalloffSocket(bpy.types.NodeSocket, AnimationNodeSocket):
     drawColor = (0.32, 1, 0.18, 1)
     comparable = False
     storable = False
+    staticValue = True
 
     value: FloatProperty(default = 1, soft_min = 0, soft_max = 1, update = propertyChanged)
 
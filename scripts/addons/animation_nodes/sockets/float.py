@@ -18,6 +18,7 @@ class FloatSocket(bpy.types.NodeSocket, AnimationNodeSocket):
     drawColor = (0.4, 0.4, 0.7, 1)
     comparable = True
     storable = True
+    staticValue = True
 
     value: FloatProperty(default = 0.0,
         set = setValue, get = getValue,
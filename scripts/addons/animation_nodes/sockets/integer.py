@@ -17,6 +17,7 @@ class IntegerSocket(bpy.types.NodeSocket, AnimationNodeSocket):
     drawColor = (0.3, 0.4, 1.0, 1.0)
     comparable = True
     storable = True
+    staticValue = True
 
     value: IntProperty(default = 0,
         set = setValue, get = getValue,
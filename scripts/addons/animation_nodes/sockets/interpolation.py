@@ -25,6 +25,7 @@ class InterpolationSocket(bpy.types.NodeSocket, AnimationNodeSocket):
     drawColor = (0.7, 0.4, 0.3, 1)
     comparable = True
     storable = True
+    staticValue = True
 
     category: EnumProperty(name = "Interpolation Category", default = "LINEAR",
                             items = categoryItems, update = propertyChanged)
@@ -12,6 +12,7 @@ class QuaternionSocket(bpy.types.NodeSocket, AnimationNodeSocket):
     drawColor = (0.8, 0.6, 0.3, 1.0)
     storable = True
     comparable = False
+    staticValue = True
 
     value: FloatVectorProperty(default = [1, 0, 0, 0], size = 4, update = propertyChanged)
 
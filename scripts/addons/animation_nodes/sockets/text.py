@@ -11,6 +11,7 @@ class TextSocket(bpy.types.NodeSocket, AnimationNodeSocket):
     drawColor = (1, 1, 1, 1)
     comparable = True
     storable = True
+    staticValue = True
 
     value: StringProperty(default = "", update = propertyChanged, options = {"TEXTEDIT_UPDATE"})
 
@@ -12,6 +12,7 @@ class VectorSocket(bpy.types.NodeSocket, AnimationNodeSocket):
     drawColor = (0.15, 0.15, 0.8, 1.0)
     storable = True
     comparable = False
+    staticValue = True
 
     value: FloatVectorProperty(default = [0, 0, 0], update = propertyChanged, subtype = "XYZ")
 
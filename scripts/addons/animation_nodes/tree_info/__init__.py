@@ -32,10 +32,25 @@ def updateIfNecessary():
     if _needsUpdate:
         update()
 
-def treeChanged():
+def treeChanged(nodeTree = None):
+    '''
+    Pass the node tree that changed to only re-index this tree
+    during the next update. Without a tree all trees are re-indexed.
+    '''
     global _needsUpdate
     _needsUpdate = True
 
+    if getattr(nodeTree, "bl_idname", None) == "an_AnimationNodeTree":
+        _forestData.markTreeDirty(nodeTree.name)
+    else:
+        _forestData.markAllTreesDirty()
+
+def popChangedTreeNames():
+    '''
+    Names of all trees that have been re-indexed (or removed)
+    since the last call of this function.
+    '''
+    return _forestData.popChangedTreeNames()
 
 
 def getNodeByIdentifier(identifier):
@@ -81,6 +96,10 @@ def getUndefinedNodes(nodeByID):
     return [nodeByID[nodeID] for nodeID in _forestData.nodesByType["NodeUndefined"]]
 
 def iterLinkedSocketsWithInfo(socket, node, nodeByID):
+    for linkedSocket, _ in iterLinkedSocketsWithNodes(socket, node, nodeByID):
+        yield linkedSocket
+
+def iterLinkedSocketsWithNodes(socket, node, nodeByID):
     socketID = ((node.id_data.name, node.name), socket.is_output, socket.identifier)
     linkedIDs = _forestData.linkedSockets[socketID]
     for linkedID in linkedIDs:
@@ -89,7 +108,7 @@ def iterLinkedSocketsWithInfo(socket, node, nodeByID):
         sockets = linkedNode.outputs if linkedID[1] else linkedNode.inputs
         for socket in sockets:
             if socket.identifier == linkedIdentifier:
-                yield socket
+                yield socket, linkedNode
 
 
 # improve performance of higher level functions
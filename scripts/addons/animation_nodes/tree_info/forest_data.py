@@ -3,7 +3,16 @@ from collections import defaultdict
 from .. utils.nodes import getAnimationNodeTrees, iterAnimationNodesSockets
 
 class ForestData:
+    '''
+    Keeps one TreeData partition per node tree. Only the partitions of trees
+    that have been marked as dirty (or whose signature changed) are rebuilt,
+    the forest wide dictionaries are merged from the partitions afterwards.
+    '''
     def __init__(self):
+        self.treeDataByName = {}
+        self.dirtyTreeNames = set()
+        self.allTreesDirty = True
+        self.changedTreeNames = set()
         self._reset()
 
     def _reset(self):
@@ -20,18 +29,90 @@ class ForestData:
         self.reroutePairs = defaultdict(list)
 
         self.dataTypeBySocket = dict()
+        self.rerouteNodes = self.nodesByType["NodeReroute"]
+
+    def markTreeDirty(self, treeName):
+        self.dirtyTreeNames.add(treeName)
+
+    def markAllTreesDirty(self):
+        self.allTreesDirty = True
 
     def update(self):
+        trees = getAnimationNodeTrees()
+        treeNames = {tree.name for tree in trees}
+        oldTreeDataByName = self.treeDataByName
+        changedTreeNames = set(oldTreeDataByName.keys() - treeNames)
+
+        self.treeDataByName = {}
+        for tree in trees:
+            signature = getTreeSignature(tree)
+            treeData = oldTreeDataByName.get(tree.name)
+            if (self.allTreesDirty or treeData is None or
+                tree.name in self.dirtyTreeNames or
+                treeData.signature != signature):
+                treeData = TreeData(tree, signature)
+                changedTreeNames.add(tree.name)
+            self.treeDataByName[tree.name] = treeData
+
+        self.allTreesDirty = False
+        self.dirtyTreeNames.clear()
+        self.changedTreeNames.update(changedTreeNames)
+
+        if len(changedTreeNames) > 0 or len(self.nodes) == 0:
+            self.mergeTreeData()
+
+    def mergeTreeData(self):
         self._reset()
-        self.insertNodeTrees()
+        for treeData in self.treeDataByName.values():
+            self.nodes.extend(treeData.nodes)
+            for idName, nodeIDs in treeData.nodesByType.items():
+                self.nodesByType[idName].update(nodeIDs)
+            self.typeByNode.update(treeData.typeByNode)
+            self.nodeByIdentifier.update(treeData.nodeByIdentifier)
+            self.animationNodes.update(treeData.animationNodes)
+            self.socketsByNode.update(treeData.socketsByNode)
+            self.linkedSockets.update(treeData.linkedSockets)
+            self.linkedSocketsWithReroutes.update(treeData.linkedSocketsWithReroutes)
+            self.reroutePairs.update(treeData.reroutePairs)
+            self.dataTypeBySocket.update(treeData.dataTypeBySocket)
+
+    def popChangedTreeNames(self):
+        changedTreeNames = self.changedTreeNames
+        self.changedTreeNames = set()
+        return changedTreeNames
+
+
+def getTreeSignature(tree):
+    '''
+    Cheap fingerprint that catches changes which might not trigger the
+    update callback of the tree (e.g. undo or renaming nodes).
+    '''
+    return (tuple(tree.nodes.keys()), len(tree.links))
+
+
+class TreeData:
+    def __init__(self, tree, signature):
+        self.signature = signature
+
+        self.nodes = []
+        self.nodesByType = defaultdict(set)
+        self.typeByNode = defaultdict(None)
+        self.nodeByIdentifier = defaultdict(None)
+        self.animationNodes = set()
+
+        self.socketsByNode = defaultdict(lambda: ([], []))
+
+        self.linkedSockets = defaultdict(list)
+        self.linkedSocketsWithReroutes = defaultdict(list)
+        self.reroutePairs = defaultdict(list)
+
+        self.dataTypeBySocket = dict()
+
+        self.insertNodes(tree.nodes, tree.name)
+        self.insertLinks(tree.links, tree.name)
         self.rerouteNodes = self.nodesByType["NodeReroute"]
         self.findLinksSkippingReroutes()
 
-    def insertNodeTrees(self):
-        for tree in getAnimationNodeTrees():
-            self.insertNodes(tree.nodes, tree.name)
-            self.insertLinks(tree.links, tree.name)
-
     def insertNodes(self, nodes, treeName):
         appendNode = self.nodes.append
         nodesByType = self.nodesByType
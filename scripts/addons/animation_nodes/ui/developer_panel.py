@@ -44,6 +44,12 @@ class DeveloperPanel(bpy.types.Panel):
         if executionCode.type == "MEASURE":
             row.operator("an.reset_measurements", text = "", icon = "RECOVER_LAST")
 
+            row = col.row(align = True)
+            row.prop(executionCode, "showTimeline", text = "Timeline", toggle = True)
+            row.operator("an.export_execution_timeline", text = "", icon = "EXPORT").fileFormat = "CHROME_TRACE"
+            row.operator("an.export_execution_timeline", text = "", icon = "TEXT").fileFormat = "CSV"
+            row.operator("an.reset_timeline", text = "", icon = "X")
+
         row = col.row(align = True)
         row.operator("an.print_current_execution_code", text = "Print", icon = "CONSOLE")
         row.operator("an.write_current_execution_code", text = "Write", icon = "TEXT")
@@ -51,6 +57,10 @@ class DeveloperPanel(bpy.types.Panel):
         subrow.active = executionCodeTextBlockName in bpy.data.texts
         subrow.operator("an.select_area", text = "", icon = "ZOOM_SELECTED").callback = setupTextEditorCallback
 
+        row = col.row(align = True)
+        row.prop(executionCode, "useCodeCache")
+        row.operator("an.clear_code_cache", text = "", icon = "TRASH")
+
     def drawProfilingSettings(self, layout, preferences):
         profiling = preferences.developer.profiling
 
@@ -0,0 +1,50 @@
+import bpy
+from .. execution.frame_cache import getCachedFrameAmount, getUncachedOutputNodes
+
+class FrameCachePanel(bpy.types.Panel):
+    bl_idname = "an_frame_cache_panel"
+    bl_label = "Frame Cache"
+    bl_space_type = "NODE_EDITOR"
+    bl_region_type = "TOOLS"
+    bl_options = {"DEFAULT_CLOSED"}
+
+    @classmethod
+    def poll(cls, context):
+        tree = cls.getTree()
+        if tree is None: return False
+        return tree.bl_idname == "an_AnimationNodeTree"
+
+    def draw_header(self, context):
+        tree = self.getTree()
+        self.layout.prop(tree.frameCache, "enabled", text = "")
+
+    def draw(self, context):
+        layout = self.layout
+
+        tree = context.space_data.edit_tree
+        frameCache = tree.frameCache
+
+        layout.prop(frameCache, "directory", text = "")
+
+        row = layout.row(align = True)
+        row.prop(frameCache, "startFrame", text = "Start")
+        row.prop(frameCache, "endFrame", text = "End")
+
+        row = layout.row(align = True)
+        props = row.operator("an.cache_frames", icon = "FILE_CACHE")
+        props.treeName = tree.name
+        props = row.operator("an.clear_frame_cache", text = "", icon = "X")
+        props.treeName = tree.name
+
+        layout.label(text = "Cached Frames: {}".format(getCachedFrameAmount(tree)))
+
+        uncachedNodes = getUncachedOutputNodes(tree)
+        if len(uncachedNodes) > 0:
+            col = layout.column(align = True)
+            col.label(text = "Can't be cached:", icon = "ERROR")
+            for name in uncachedNodes:
+                col.label(text = name)
+
+    @classmethod
+    def getTree(cls):
+        return bpy.context.space_data.edit_tree
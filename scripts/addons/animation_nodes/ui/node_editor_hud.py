@@ -1,6 +1,10 @@
 import bpy
 from .. utils.timing import prettyTime
 from .. draw_handler import drawHandler
+from .. graphics.rectangle import Rectangle
+from .. tree_info import getNodeByIdentifier
+from .. preferences import getExecutionCodeSettings
+from .. execution.measurements import getTimeline
 from .. utils.blender_ui import getDpi, getDpiFactor
 from .. graphics.drawing_2d import drawText, setTextDrawingDpi
 
@@ -25,3 +29,69 @@ def drawNodeEditorHud():
     executionTime = prettyTime(tree.lastExecutionInfo.executionTime)
     drawText(executionTime, left + 10 * dpiFactor, top - 20 * dpiFactor,
         size = 11, color = (1, 1, 1, 0.5))
+
+
+# Timeline of the last measured execution
+############################################
+
+timelineColors = [
+    (0.85, 0.45, 0.25, 0.8),
+    (0.30, 0.60, 0.85, 0.8),
+    (0.45, 0.75, 0.35, 0.8),
+    (0.80, 0.70, 0.30, 0.8)]
+
+@drawHandler("SpaceNodeEditor", "WINDOW")
+def drawExecutionTimeline():
+    tree = bpy.context.getActiveAnimationNodeTree()
+    if tree is None:
+        return
+
+    settings = getExecutionCodeSettings()
+    if settings.type != "MEASURE" or not settings.showTimeline:
+        return
+
+    events = getTimeline().getLastExecutionEvents()
+    if len(events) == 0:
+        return
+
+    setTextDrawingDpi(getDpi())
+    dpiFactor = getDpiFactor()
+
+    region = bpy.context.region
+    left = 10 * dpiFactor
+    width = region.width - 20 * dpiFactor
+    rowHeight = 16 * dpiFactor
+    bottom = 10 * dpiFactor
+
+    startTime = min(event.start for event in events)
+    endTime = max(event.end for event in events)
+    duration = max(endTime - startTime, 1e-9)
+
+    for event, depth in iterEventsWithDepth(events):
+        x1 = left + (event.start - startTime) / duration * width
+        x2 = left + (event.end - startTime) / duration * width
+        y1 = bottom + depth * rowHeight
+        Rectangle(x1, y1, max(x2, x1 + 1), y1 + rowHeight - 1).draw(
+            color = timelineColors[depth % len(timelineColors)])
+
+        if x2 - x1 > 60 * dpiFactor:
+            try: name = getNodeByIdentifier(event.identifier).name
+            except: name = event.identifier
+            drawText("{} ({})".format(name, prettyTime(event.duration)),
+                x1 + 3 * dpiFactor, y1 + 4 * dpiFactor, size = 9, color = (1, 1, 1, 0.9))
+
+    drawText("Frame {} - {}".format(events[-1].frame, prettyTime(duration)),
+        left, bottom + (maxDepth(events) + 1) * rowHeight + 5 * dpiFactor,
+        size = 11, color = (1, 1, 1, 0.5))
+
+def iterEventsWithDepth(events):
+    '''Events of nodes in subprograms are drawn above the invoking node.'''
+    openEnds = []
+    for event in sorted(events, key = lambda event: (event.start, -event.end)):
+        while len(openEnds) > 0 and openEnds[-1] <= event.start:
+            openEnds.pop()
+        yield event, len(openEnds)
+        openEnds.append(event.end)
+
+def maxDepth(events):
+    return max(depth for _, depth in iterEventsWithDepth(events))
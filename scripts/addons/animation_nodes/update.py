@@ -4,7 +4,9 @@ from . utils.timing import measureTime
 from . tree_info import getOriginNodes
 from . ui.node_colors import colorNetworks
 from . nodes.subprogram import subprogram_sockets
-from . execution.units import createExecutionUnits
+from . execution.auto_execution import resetDependencies
+from . execution.frame_cache import resetTreeSignatures
+from . execution.units import createExecutionUnits, invalidateExecutionUnits
 from . node_link_conversion import correctForbiddenNodeLinks
 from . utils.nodes import iterAnimationNodes, getAnimationNodeTrees, createNodeByIdDict
 
@@ -29,9 +31,14 @@ def updateEverything():
     nodesByNetwork = checkNetworks(nodeByID)
     checkIdentifiers()
 
+    changedTreeNames = tree_info.popChangedTreeNames()
     if problems.canCreateExecutionUnits():
-        createExecutionUnits(nodeByID)
+        createExecutionUnits(nodeByID, changedTreeNames)
+    else:
+        invalidateExecutionUnits()
 
+    resetDependencies()
+    resetTreeSignatures()
     colorNetworks(nodesByNetwork, nodeByID)
 
     nodeByID.clear()
@@ -1,5 +1,7 @@
 import bpy
 from . names import toDataPath
+from . handlers import eventHandler
+from .. data_structures import FloatList, IntegerList
 
 
 # Misc
@@ -30,20 +32,20 @@ def getArrayValueAtFrame(object, dataPath, frame, arraySize = 3):
     for index in range(arraySize):
         fCurve = getFCurveWithIndex(fCurves, index)
         if fCurve is None: values[index] = getattr(object, dataPath)[index]
-        else: values[index] = fCurve.evaluate(frame)
+        else: values[index] = evaluateFCurve(fCurve, frame)
     return values
 
 def getSingleValueAtFrame(object, dataPath, frame):
     fCurves = getFCurvesWithDataPath(object, dataPath)
     if len(fCurves) == 0:
         return getattr(object, dataPath)
-    return fCurves[0].evaluate(frame)
+    return evaluateFCurve(fCurves[0], frame)
 
 def getSingleValueOfArrayAtFrame(object, dataPath, index, frame):
     fCurves = getFCurvesWithDataPath(object, dataPath)
     fCurve = getFCurveWithIndex(fCurves, index)
     if fCurve is None: return getattr(object, dataPath)[index]
-    return fCurve.evaluate(frame)
+    return evaluateFCurve(fCurve, frame)
 
 def getMultipleValuesOfArrayAtFrame(object, dataPath, indices, frame):
     fCurves = getFCurvesWithDataPath(object, dataPath)
@@ -51,7 +53,7 @@ def getMultipleValuesOfArrayAtFrame(object, dataPath, indices, frame):
     for i, index in enumerate(indices):
         fCurve = getFCurveWithIndex(fCurves, index)
         if fCurve is None: values[i] = getattr(object, dataPath)[index]
-        else: values[i] = fCurve.evaluate(frame)
+        else: values[i] = evaluateFCurve(fCurve, frame)
     return values
 
 
@@ -70,8 +72,9 @@ def getArrayValueAtMultipleFrames(object, dataPath, frames, arraySize = 3):
             for i, frame in enumerate(frames):
                 values[i][index] = value
         else:
+            sampledFCurve = getSampledFCurve(fCurve)
             for i, frame in enumerate(frames):
-                values[i][index] = fCurve.evaluate(frame)
+                values[i][index] = sampledFCurve.evaluate(frame)
     return values
 
 def getFCurveWithIndex(fCurves, index):
@@ -81,6 +84,92 @@ def getFCurveWithIndex(fCurves, index):
 
 
 
+# sampled fcurves
+###################################
+
+# limits the memory used by fcurves that are evaluated at very many frames
+maxCachedFrames = 100000
+
+class SampledFCurve:
+    '''
+    Remembers the values of a fcurve at the whole frames that have been
+    evaluated already. Only requested frames are sampled, so long keyframe
+    ranges don't have to be sampled completely after every change.
+    '''
+    __slots__ = ("fCurve", "fingerprint", "values", "useCache")
+
+    def __init__(self, fCurve, fingerprint):
+        self.fCurve = fCurve
+        self.fingerprint = fingerprint
+        self.values = {}
+        # modifiers can have settings that are not part of the fingerprint
+        self.useCache = len(fCurve.modifiers) == 0
+
+    def evaluate(self, frame):
+        if not self.useCache or frame != int(frame):
+            return self.fCurve.evaluate(frame)
+        value = self.values.get(frame)
+        if value is None:
+            value = self.fCurve.evaluate(frame)
+            if len(self.values) < maxCachedFrames:
+                self.values[frame] = value
+        return value
+
+sampledFCurves = {}
+validatedSampledFCurves = set()
+
+def evaluateFCurve(fCurve, frame):
+    return getSampledFCurve(fCurve).evaluate(frame)
+
+def getSampledFCurve(fCurve):
+    '''
+    The samples are checked against the keyframes only once per execution,
+    all further lookups in the same execution are constant time.
+    '''
+    pointer = fCurve.as_pointer()
+    sampledFCurve = sampledFCurves.get(pointer)
+    if sampledFCurve is not None and pointer in validatedSampledFCurves:
+        return sampledFCurve
+
+    fingerprint = getFCurveFingerprint(fCurve)
+    if sampledFCurve is None or sampledFCurve.fingerprint != fingerprint:
+        sampledFCurve = SampledFCurve(fCurve, fingerprint)
+        sampledFCurves[pointer] = sampledFCurve
+    else:
+        sampledFCurve.fCurve = fCurve
+    validatedSampledFCurves.add(pointer)
+    return sampledFCurve
+
+floatKeyframeAttributes = (("co", 2), ("handle_left", 2), ("handle_right", 2),
+                           ("back", 1), ("amplitude", 1), ("period", 1))
+enumKeyframeAttributes = ("interpolation", "easing")
+
+def getFCurveFingerprint(fCurve):
+    keyframes = fCurve.keyframe_points
+    amount = len(keyframes)
+
+    floatData = FloatList(length = amount * 9)
+    floatMemory = floatData.asMemoryView()
+    offset = 0
+    for name, size in floatKeyframeAttributes:
+        keyframes.foreach_get(name, floatMemory[offset:offset + amount * size])
+        offset += amount * size
+
+    enumData = IntegerList(length = amount * 2)
+    enumMemory = enumData.asMemoryView()
+    for i, name in enumerate(enumKeyframeAttributes):
+        keyframes.foreach_get(name, enumMemory[i * amount:(i + 1) * amount])
+
+    return (floatMemory.tobytes(), enumMemory.tobytes(),
+            fCurve.extrapolation, fCurve.mute, len(fCurve.modifiers))
+
+@eventHandler("FILE_LOAD_POST")
+def clearSampledFCurves():
+    sampledFCurves.clear()
+    validatedSampledFCurves.clear()
+
+
+
 # remove fcurves
 ########################
 
@@ -98,6 +187,7 @@ cache = {}
 
 def clearCache():
     cache.clear()
+    validatedSampledFCurves.clear()
 
 def getFCurvesWithDataPath(object, dataPath, storeInCache = True):
     identifier = (object.type, object.name, dataPath)
@@ -17,6 +17,9 @@ fileSavePreHandlers = []
 fileLoadPostHandlers = []
 addonLoadPostHandlers = []
 frameChangePostHandlers = []
+depsgraphUpdatePostHandlers = []
+undoPostHandlers = []
+redoPostHandlers = []
 
 renderPreHandlers = []
 renderInitHandlers = []
@@ -30,6 +33,9 @@ def eventHandler(event):
         if event == "FILE_LOAD_POST": fileLoadPostHandlers.append(function)
         if event == "ADDON_LOAD_POST": addonLoadPostHandlers.append(function)
         if event == "FRAME_CHANGE_POST": frameChangePostHandlers.append(function)
+        if event == "DEPSGRAPH_UPDATE_POST": depsgraphUpdatePostHandlers.append(function)
+        if event == "UNDO_POST": undoPostHandlers.append(function)
+        if event == "REDO_POST": redoPostHandlers.append(function)
 
         if event == "RENDER_INIT": renderInitHandlers.append(function)
         if event == "RENDER_PRE": renderPreHandlers.append(function)
@@ -70,6 +76,23 @@ def frameChangedPost(scene):
     for handler in frameChangePostHandlers:
         handler(scene)
 
+@persistent
+def depsgraphUpdatePost(scene, depsgraph = None):
+    if depsgraph is None:
+        depsgraph = bpy.context.evaluated_depsgraph_get()
+    for handler in depsgraphUpdatePostHandlers:
+        handler(depsgraph)
+
+@persistent
+def undoPost(scene):
+    for handler in undoPostHandlers:
+        handler()
+
+@persistent
+def redoPost(scene):
+    for handler in redoPostHandlers:
+        handler()
+
 @persistent
 def renderInitialized(scene):
     for handler in renderInitHandlers:
@@ -87,9 +110,12 @@ def renderCompleted(scene):
 
 def register():
     bpy.app.handlers.frame_change_post.append(frameChangedPost)
+    bpy.app.handlers.depsgraph_update_post.append(depsgraphUpdatePost)
     bpy.app.timers.register(always, persistent = True)
     bpy.app.handlers.load_post.append(loadPost)
     bpy.app.handlers.save_pre.append(savePre)
+    bpy.app.handlers.undo_post.append(undoPost)
+    bpy.app.handlers.redo_post.append(redoPost)
 
     bpy.app.handlers.render_complete.append(renderCompleted)
     bpy.app.handlers.render_init.append(renderInitialized)
@@ -101,8 +127,11 @@ def register():
 
 def unregister():
     bpy.app.handlers.frame_change_post.remove(frameChangedPost)
+    bpy.app.handlers.depsgraph_update_post.remove(depsgraphUpdatePost)
     bpy.app.handlers.load_post.remove(loadPost)
     bpy.app.handlers.save_pre.remove(savePre)
+    bpy.app.handlers.undo_post.remove(undoPost)
+    bpy.app.handlers.redo_post.remove(redoPost)
     bpy.app.timers.unregister(always)
 
     bpy.app.handlers.render_complete.remove(renderCompleted)
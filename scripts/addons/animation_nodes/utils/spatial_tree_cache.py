@@ -0,0 +1,60 @@
+import hashlib
+from collections import OrderedDict
+from . handlers import eventHandler
+
+# estimated bytes of all cached trees, the least recently used are removed
+memoryBudget = 512 * 2 ** 20
+
+class SpatialTreeCache:
+    '''
+    Stores KDTrees and BVHTrees by a hash of the data they have been built from.
+    Trees are immutable once they are built, so the same object can be
+    returned in different executions.
+    '''
+    def __init__(self, memoryBudget):
+        self.memoryBudget = memoryBudget
+        self.memoryUsage = 0
+        self.entries = OrderedDict()
+
+    def get(self, key):
+        entry = self.entries.get(key)
+        if entry is None:
+            return None
+        self.entries.move_to_end(key)
+        return entry[0]
+
+    def store(self, key, tree, size):
+        if size > self.memoryBudget:
+            return
+        if key in self.entries:
+            self.memoryUsage -= self.entries.pop(key)[1]
+        self.entries[key] = (tree, size)
+        self.memoryUsage += size
+        while self.memoryUsage > self.memoryBudget:
+            _, (_, removedSize) = self.entries.popitem(last = False)
+            self.memoryUsage -= removedSize
+
+    def clear(self):
+        self.entries.clear()
+        self.memoryUsage = 0
+
+cache = SpatialTreeCache(memoryBudget)
+
+def getCachedSpatialTree(key):
+    return cache.get(key)
+
+def storeSpatialTree(key, tree, size):
+    cache.store(key, tree, size)
+
+def getDataHash(*lists):
+    '''Hash of the raw memory of lists that have an asMemoryView method.'''
+    sha = hashlib.sha1()
+    for data in lists:
+        memory = data.asMemoryView()
+        sha.update(str(memory.nbytes).encode())
+        sha.update(memory.cast("B"))
+    return sha.digest()
+
+@eventHandler("FILE_LOAD_POST")
+def clearSpatialTreeCache():
+    cache.clear()
@@ -29,7 +29,6 @@ from bpy.props import (
 import bpy
 import time
 import numpy
-import math
 
 
 
@@ -327,113 +326,89 @@ class OBJECT_OT_bake_vertex_color(bpy.types.Operator):
         '''
         Transfer pixel colors to vertex color of the active object\n
         '''
-        image = bpy.data.images[image_name]
-
-        width = image.size[0]
-        height = image.size[1]
-
         # Set object mode to vertex paint
         object = context.active_object
+        mesh = object.data
         bpy.ops.object.mode_set(mode='VERTEX_PAINT')
 
+        # Create vertex color if needed
+        if mesh.vertex_colors.find(self.vertex_color_name) < 0:
+            mesh.vertex_colors.new(name=self.vertex_color_name)
+
         # Save image pixel values to array
-        image_pixels = []
         image_pixels = self.image_to_pixel_array(context, image_name)
+        height, width = image_pixels.shape[:2]
+
+        # Read the uv coordinates of all loops at once
+        loop_count = len(mesh.loops)
+        uv_coords = numpy.empty(loop_count * 2, dtype=numpy.float32)
+        mesh.uv_layers.active.data.foreach_get('uv', uv_coords)
+        uv_coords = uv_coords.reshape(loop_count, 2).astype(numpy.float64)
 
-        for face in object.data.polygons:
-            for loop_id in face.loop_indices:
-                uv_coord = object.data.uv_layers.active.data[loop_id].uv
-                # Refit uv coordinates between 0-1
-                uv_coord.x = abs(uv_coord.x) % 1
-                uv_coord.y = abs(uv_coord.y) % 1
-
-                # Create vertex color if needed
-                if context.active_object.data.vertex_colors.find(self.vertex_color_name) < 0:
-                    context.active_object.data.vertex_colors.new(name=self.vertex_color_name)
-
-                # Transfer pixel color to vertex color
-                r, g, b, a = 0, 1, 2, 3
-                target_vertex_color = context.active_object.data.vertex_colors[self.vertex_color_name].data[loop_id]
-                pixel_average_value = self.pixel_sample(context, image_pixels, uv_coord.x, uv_coord.y, 0)
-                # Sample larger pixel radius if alpha is below 1 (indicates non ray hit)
-                if pixel_average_value[a] < 1:
-                    pixel_average_value = self.pixel_sample(context, image_pixels, uv_coord.x, uv_coord.y, 1)
-                target_vertex_color.color = pixel_average_value
-                
+        # Refit uv coordinates between 0-1 and convert them to pixel coordinates
+        uv_coords = numpy.abs(uv_coords) % 1
+        x = numpy.floor(uv_coords[:, 0] * width).astype(numpy.int64)
+        y = numpy.floor(uv_coords[:, 1] * height).astype(numpy.int64)
+
+        # Transfer pixel color to vertex color
+        a = 3
+        pixel_average_values = self.pixel_sample(context, image_pixels, x, y, 0)
+        # Sample larger pixel radius if alpha is below 1 (indicates non ray hit)
+        missed = pixel_average_values[:, a] < 1
+        pixel_average_values[missed] = self.pixel_sample(context, image_pixels, x[missed], y[missed], 1)
+
+        mesh.vertex_colors[self.vertex_color_name].data.foreach_set('color', pixel_average_values.ravel())
+        mesh.update()
 
     def pixel_sample(self, context, image_pixels, x, y, sample_size):
         '''
-        image_pixels = array with pixels from an image, sorted like array[y][x][r,g,b,a] \n
-        returns r,g,b,a color as list from sampled pixel(s) at the normalized x,y coordinates. \n
+        image_pixels = array with pixels from an image, shaped like array[y][x][r,g,b,a] \n
+        returns array with the average r,g,b,a color of the sampled pixel(s) at every x,y pixel coordinate. \n
         Set sample_size = 0 to sample one pixel only, 1 to sample 3x3 pixels, 2 to sample 5x5 pixels etc. \n
-        x and y should be normalized coordinates (i.e. between 0-1) \n
+        x and y should be arrays with integer pixel coordinates of the same length \n
         Pixels with alpha = 0 will not be sampled
         '''
-        width = len(image_pixels[0])
-        # height = len(image_pixels[0][0])
-        height = width
-        r, g, b, a = 0, 1, 2, 3
-
-        # Convert normalized coordinates to pixel coordinates
-        x = math.floor(x * width)
-        y = math.floor(y * height)
-
-        # Sample pixels in a 3x3 box around sample pixel. Only sample inside of image (hence min/max)
-        pixel_average = [0,0,0,0]
-        pixel_sample_count = 0
-
-        sample_x_start = max(x - sample_size, 0)
-        sample_x_end = min(x + sample_size + 1, width)
-        sample_y_start = max(y - sample_size, 0)
-        sample_y_end = min(y + sample_size + 1, height)
-
-        for sampleY in range(sample_y_start, sample_y_end):
-            for sampleX in range(sample_x_start,sample_x_end):
-                # Avoid sampling pixels without alpha   
-                #print('working with pixel X:' + str(sampleX) +", Y:"+ str(sampleY))
-                #print(image_pixels[sampleY][sampleX])
-                if image_pixels[sampleY][sampleX][a] > 0: 
-                    #print('checking pixel at x: ' + str(sampleX) + ', y: ' + str(sampleY) + ' had NOT 0 alpha')
-                    pixel_average[r] += image_pixels[sampleY][sampleX][r]
-                    pixel_average[g] += image_pixels[sampleY][sampleX][g]
-                    pixel_average[b] += image_pixels[sampleY][sampleX][b]
-                    pixel_average[a] += image_pixels[sampleY][sampleX][a]
-                    pixel_sample_count += 1
-        
-        if pixel_sample_count > 0:
-            pixel_average[r] = pixel_average[r] / pixel_sample_count
-            pixel_average[g] = pixel_average[g] / pixel_sample_count
-            pixel_average[b] = pixel_average[b] / pixel_sample_count
-            pixel_average[a] = pixel_average[a] / pixel_sample_count
+        height, width = image_pixels.shape[:2]
+        a = 3
+
+        pixel_sum = numpy.zeros((len(x), 4), dtype=numpy.float32)
+        pixel_sample_count = numpy.zeros(len(x), dtype=numpy.int32)
+
+        # Sample pixels in a box around sample pixel, one offset for all samples at a time
+        for offset_y in range(-sample_size, sample_size + 1):
+            for offset_x in range(-sample_size, sample_size + 1):
+                sample_x = x + offset_x
+                sample_y = y + offset_y
+                # Only sample inside of image
+                inside = (sample_x >= 0) & (sample_x < width) & (sample_y >= 0) & (sample_y < height)
+                pixels = image_pixels[numpy.clip(sample_y, 0, height - 1), numpy.clip(sample_x, 0, width - 1)]
+                # Avoid sampling pixels without alpha
+                sampled = inside & (pixels[:, a] > 0)
+                pixel_sum += pixels * sampled[:, None]
+                pixel_sample_count += sampled
+
+        return pixel_sum / numpy.maximum(pixel_sample_count, 1)[:, None]
 
-        return pixel_average
-        
     def image_to_pixel_array(self, context, image_name):
         '''
-        returns list/array with image pixels like 
+        returns numpy array with image pixels shaped like
         array[y][x][r,g,b,a]
         '''
 
         image = bpy.data.images[image_name]
         width = image.size[0]
         height = image.size[1]
-        r, g, b, a = 0, 1, 2, 3
 
-        # Separate pixels in list per channel
         # Save image pixel values. First pixels values (rgba) are stored in bpy.data.images[image_name].pixels[0:3] and so on
-        image_pixel_list = list(image.pixels[:])
-        image_pixels = []
-
-        # Arrange pixel values in a proper array of lists
-        # NOTE: Since we split up per row, the x, y coordinates will be switched like this: image_pixels[y][x]
-        for i in range(0,len(image_pixel_list), 4):
-            pixel = []
-            for j in range(0,4):
-                pixel.append(image_pixel_list[i+j])
-            image_pixels.append(pixel)
-        image_pixels = numpy.array_split(image_pixels, width)
-
-        return image_pixels
+        image_pixels = numpy.empty(width * height * 4, dtype=numpy.float32)
+        if hasattr(image.pixels, 'foreach_get'):
+            image.pixels.foreach_get(image_pixels)
+        else:
+            # foreach_get on pixels is only available since Blender 2.83
+            image_pixels[:] = image.pixels[:]
+
+        # NOTE: Since the pixels are stored per row, the x, y coordinates will be switched like this: image_pixels[y][x]
+        return image_pixels.reshape(height, width, 4)
 
     def create_material_if_missing(self, context):
         # Create material if there is no material assigned to the active object
@@ -2,20 +2,24 @@
 import struct
 import io
 import time
+import numpy
 
 from .utils import *
 
 
 def force_read_bytes(stream, bytes_cnt):
-    output = bytes()
+    output = bytearray(bytes_cnt)
+    view = memoryview(output)
+    read_cnt = 0
 
-    while len(output) != bytes_cnt:
-        buf = stream.read(bytes_cnt - len(output))
+    while read_cnt != bytes_cnt:
+        buf = stream.read(bytes_cnt - read_cnt)
 
         if len(buf) == 0:
             raise RuntimeError('Not enough output from the UVP process')
 
-        output += buf
+        view[read_cnt:read_cnt + len(buf)] = buf
+        read_cnt += len(buf)
 
     return output
 
@@ -32,7 +36,7 @@ def force_read_float(stream):
 
 def force_read_ints(stream, count):
     buf = force_read_bytes(stream, 4 * count)
-    return struct.unpack('i' * count, buf)
+    return numpy.frombuffer(buf, dtype=numpy.int32)
 
 
 def force_read_floats(stream, count):
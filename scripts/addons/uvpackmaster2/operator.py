@@ -431,7 +431,7 @@ class UVP2_OT_PackOperatorGeneric(bpy.types.Operator):
             if self.prefs.write_to_file:
                 out_filepath = os.path.join(tempfile.gettempdir(), 'uv_islands.data')
                 out_file = open(out_filepath, 'wb')
-                out_file.write(self.p_context.serialized_maps)
+                self.p_context.write_serialized_maps(out_file)
                 out_file.close()
 
             uvp_args_final = [get_uvp_execpath(), '-E', '-e', str(UvTopoAnalysisLevel.PROCESS_SELF_INTERSECT), '-t', str(self.prefs.thread_count)] + self.get_uvp_args()
@@ -468,7 +468,7 @@ class UVP2_OT_PackOperatorGeneric(bpy.types.Operator):
                                              **popen_args)
 
             out_stream = self.uvp_proc.stdin
-            out_stream.write(self.p_context.serialized_maps)
+            self.p_context.write_serialized_maps(out_stream)
             out_stream.flush()
 
             self.start_time = time.time()
@@ -5,8 +5,9 @@ from .utils import *
 from .prefs import is_blender28
 
 import time
-import struct 
+import numpy
 
+import bpy
 from mathutils import Vector, Matrix
 import bmesh
 
@@ -35,6 +36,12 @@ class IslandParamInfo:
 
         return int(round((cls.MAX_VALUE - cls.MIN_VALUE) * f_value + cls.MIN_VALUE))
 
+    @classmethod
+    def vcolors_to_params(cls, vcolors):
+        f_values = vcolors[:, 0]
+
+        return numpy.round((cls.MAX_VALUE - cls.MIN_VALUE) * f_values + cls.MIN_VALUE).astype(numpy.int32)
+
     @classmethod
     def param_to_vcolor(cls, param_value):
         value = (float(param_value) - cls.MIN_VALUE) / (cls.MAX_VALUE - cls.MIN_VALUE)
@@ -83,6 +90,70 @@ class RotStepIslandParamInfo(IslandParamInfo):
         return str(value)
     
 
+def get_loop_indices(loop_starts, loop_totals):
+    # Indices of all loops of the given faces, in face order
+    loop_cnt = int(loop_totals.sum())
+    face_offsets = numpy.cumsum(loop_totals) - loop_totals
+    return numpy.repeat(loop_starts - face_offsets, loop_totals) + numpy.arange(loop_cnt)
+
+
+def concat_arrays(arrays, dtype):
+    if len(arrays) == 0:
+        return numpy.empty(0, dtype=dtype)
+
+    return numpy.ascontiguousarray(numpy.concatenate(arrays), dtype=dtype)
+
+
+class MeshArrays:
+    """Per-face and per-loop data of an edited mesh, read in bulk with foreach_get"""
+
+    VCOLOR_COMPONENTS = 4 if is_blender28() else 3
+
+    def __init__(self, obj, uv_layer_name):
+        # Write the edit-mode bmesh to the mesh datablock so the bulk accessors see the current state.
+        # Face and vertex indices of the mesh match the indices of the bmesh elements.
+        obj.update_from_editmode()
+
+        self.mesh = obj.data
+        self.face_count = len(self.mesh.polygons)
+        self.loop_count = len(self.mesh.loops)
+
+        self.loop_start = self.read(self.mesh.polygons, 'loop_start', self.face_count, numpy.int32)
+        self.loop_total = self.read(self.mesh.polygons, 'loop_total', self.face_count, numpy.int32)
+        self.face_select = self.read(self.mesh.polygons, 'select', self.face_count, numpy.bool_)
+        self.face_hide = self.read(self.mesh.polygons, 'hide', self.face_count, numpy.bool_)
+        self.vert_idx = self.read(self.mesh.loops, 'vertex_index', self.loop_count, numpy.int32)
+
+        self.uv_layer_name = uv_layer_name
+        self.uv_data = self.mesh.uv_layers[uv_layer_name].data
+        self.uvs = self.read(self.uv_data, 'uv', self.loop_count * 2, numpy.float32).reshape(-1, 2)
+
+    def write_uvs(self):
+        # The layer is looked up again, its data is reallocated when the edit mode changes
+        self.mesh.uv_layers[self.uv_layer_name].data.foreach_set('uv', self.uvs.ravel())
+
+    @staticmethod
+    def read(collection, attr, size, dtype):
+        array = numpy.empty(size, dtype=dtype)
+        collection.foreach_get(attr, array)
+        return array
+
+    def get_face_uv_select(self):
+        if self.face_count == 0:
+            return numpy.empty(0, dtype=numpy.bool_)
+
+        uv_select = self.read(self.uv_data, 'select', self.loop_count, numpy.bool_)
+        return numpy.logical_and.reduceat(uv_select, self.loop_start)
+
+    def get_material_indices(self):
+        return self.read(self.mesh.polygons, 'material_index', self.face_count, numpy.int32)
+
+    def get_loop_vcolors(self, vcolor_chname):
+        # Callers index the result with loop_start to get the color of the first loop of every face
+        vcolor_data = self.mesh.vertex_colors[vcolor_chname].data
+        return self.read(vcolor_data, 'color', self.loop_count * self.VCOLOR_COMPONENTS, numpy.float32).reshape(-1, self.VCOLOR_COMPONENTS)
+
+
 class PackContext:
     # b_context = None
     # bm = None
@@ -123,14 +194,18 @@ class PackContext:
         else:
             self.objs = [self.context.active_object]
 
+        self.island_bm_map = dict()
+        self.uv_island_faces_list = None
+        self.island_bboxes = None
+
+        self.init_bmeshes()
+
+    def init_bmeshes(self):
         self.bms = []
         self.uv_layers = []
         self.face_idx_offsets = []
         self.vert_idx_offsets = []
 
-        self.island_bm_map = dict()
-        self.uv_island_faces_list = None
-
         next_face_idx_offset = 0
         next_vert_idx_offset = 0
 
@@ -148,80 +223,96 @@ class PackContext:
             self.vert_idx_offsets.append(next_vert_idx_offset)
             next_vert_idx_offset += len(bm.verts)
 
+    def read_mesh_arrays(self):
+        return [MeshArrays(obj, self.uv_layers[bm_idx].name) for bm_idx, obj in enumerate(self.objs)]
+
+    def write_mesh_uvs(self, mesh_arrays):
+        # The edit-mode bmesh overrides the mesh datablock, so the new UVs are written
+        # in object mode and the bmeshes are recreated after entering edit mode again.
+        bpy.ops.object.mode_set(mode='OBJECT')
+
+        for arrays in mesh_arrays:
+            arrays.write_uvs()
+
+        bpy.ops.object.mode_set(mode='EDIT')
+        self.init_bmeshes()
+
     def serialize_uv_maps(self, send_unselected, send_groups, send_rot_step, group_method=None):
         serialize_start = time.time()
-        serialized_maps = bytes()
         face_cnt = 0
 
-        face_id_len_array = []
-        uv_coord_array = []
-        vert_idx_array = []
-    
+        face_id_len_arrays = []
+        uv_coord_arrays = []
+        vert_idx_arrays = []
+        face_flags_arrays = []
+        face_groups_arrays = []
+        rot_step_arrays = []
+
         serialization_flags = 0
 
         if send_unselected:
             serialization_flags |= UvMapSerializationFlags.CONTAINS_FLAGS
-            face_flags_array = []
 
         if send_groups:
             serialization_flags |= UvMapSerializationFlags.CONTAINS_GROUPS
             self.create_group_map(group_method)
-            face_groups_array = []
 
         if send_rot_step:
             serialization_flags |= UvMapSerializationFlags.CONTAINS_ROT_STEP
 
-            rot_step_array = []
             rot_step_layers = []
             for bm in self.bms:
                 rot_step_layers.append(self.get_or_create_vcolor_layer(bm, RotStepIslandParamInfo.get_vcolor_chname(), RotStepIslandParamInfo.get_default_vcolor()))
 
         for bm_idx, bm in enumerate(self.bms):
             obj = self.objs[bm_idx]
-            uv_layer = self.uv_layers[bm_idx]
-            faces = self.get_visible_faces(bm) if send_unselected else self.get_selected_faces(bm, uv_layer)
-            
-            for face in faces:
-                face_id_len_array.append(face.index + self.face_idx_offsets[bm_idx])
-                face_id_len_array.append(len(face.verts))
+            arrays = MeshArrays(obj, self.uv_layers[bm_idx].name)
 
-                if send_unselected:
-                    face_flags = 0
-                    if self.face_is_selected(bm, uv_layer, face):
-                        face_flags |= UvFaceInputFlags.SELECTED
-                        face_cnt = face_cnt + 1
+            selected_mask = self.get_selected_face_mask(arrays)
+            face_mask = self.get_visible_face_mask(arrays) if send_unselected else selected_mask
 
-                    face_flags_array.append(face_flags)
-                else:
-                    face_cnt = face_cnt + 1
+            face_ids = numpy.flatnonzero(face_mask).astype(numpy.int32) + self.face_idx_offsets[bm_idx]
+            face_loop_starts = arrays.loop_start[face_mask]
+            face_loop_totals = arrays.loop_total[face_mask]
 
-                if send_groups:
-                    face_groups_array.append(self.get_face_group(group_method, bm_idx, obj, face))
+            face_id_len_arrays.append(numpy.column_stack((face_ids, face_loop_totals)).ravel())
 
-                if send_rot_step:
-                    rot_step_array.append(RotStepIslandParamInfo.vcolor_to_param(self.get_vcolor(rot_step_layers[bm_idx], face)))
+            if send_unselected:
+                face_selected = selected_mask[face_mask]
+                face_cnt += int(numpy.count_nonzero(face_selected))
+                face_flags_arrays.append(numpy.where(face_selected, UvFaceInputFlags.SELECTED, 0).astype(numpy.int32))
+            else:
+                face_cnt += len(face_ids)
 
-                for loop in face.loops:
-                    uv_tuple = loop[uv_layer].uv.to_tuple(5)
-                    uv_coord_array.append(uv_tuple[0])
-                    uv_coord_array.append(uv_tuple[1])
-                    vert_idx_array.append(loop.vert.index + self.vert_idx_offsets[bm_idx])
-
-        serialized_maps += struct.pack('i', serialization_flags)
-        serialized_maps += struct.pack('i', int(len(face_id_len_array) / 2))
-        serialized_maps += struct.pack('i' * len(face_id_len_array), *face_id_len_array)
-        serialized_maps += struct.pack('i', len(vert_idx_array))
-        serialized_maps += struct.pack('f' * len(uv_coord_array), *uv_coord_array)
-        serialized_maps += struct.pack('i' * len(vert_idx_array), *vert_idx_array)
+            if send_groups:
+                face_groups_arrays.append(self.get_face_groups(group_method, bm_idx, obj, arrays)[face_mask])
+
+            if send_rot_step:
+                vcolors = arrays.get_loop_vcolors(rot_step_layers[bm_idx].name)
+                rot_step_arrays.append(RotStepIslandParamInfo.vcolors_to_params(vcolors[face_loop_starts]))
+
+            loop_indices = get_loop_indices(face_loop_starts, face_loop_totals)
+            uv_coord_arrays.append(numpy.round(arrays.uvs[loop_indices], 5).astype(numpy.float32))
+            vert_idx_arrays.append(arrays.vert_idx[loop_indices] + self.vert_idx_offsets[bm_idx])
+
+        face_id_len_array = concat_arrays(face_id_len_arrays, numpy.int32)
+        vert_idx_array = concat_arrays(vert_idx_arrays, numpy.int32)
+
+        serialized_maps = [
+            numpy.array([serialization_flags, len(face_id_len_array) // 2], dtype=numpy.int32),
+            face_id_len_array,
+            numpy.array([len(vert_idx_array)], dtype=numpy.int32),
+            concat_arrays(uv_coord_arrays, numpy.float32),
+            vert_idx_array]
 
         if (serialization_flags & UvMapSerializationFlags.CONTAINS_FLAGS) > 0:
-            serialized_maps += struct.pack('i' * len(face_flags_array), *face_flags_array)
+            serialized_maps.append(concat_arrays(face_flags_arrays, numpy.int32))
 
         if (serialization_flags & UvMapSerializationFlags.CONTAINS_GROUPS) > 0:
-            serialized_maps += struct.pack('i' * len(face_groups_array), *face_groups_array)
+            serialized_maps.append(concat_arrays(face_groups_arrays, numpy.int32))
 
         if (serialization_flags & UvMapSerializationFlags.CONTAINS_ROT_STEP) > 0:
-            serialized_maps += struct.pack('i' * len(rot_step_array), *rot_step_array)
+            serialized_maps.append(concat_arrays(rot_step_arrays, numpy.int32))
 
         if in_debug_mode():
             print('UV serialization time: ' + str(time.time() - serialize_start))
@@ -229,32 +320,70 @@ class PackContext:
         self.serialized_maps = serialized_maps
         return face_cnt
 
+    def write_serialized_maps(self, stream):
+        # Every array is written directly from its own buffer, no joined copy is created
+        for array in self.serialized_maps:
+            stream.write(memoryview(array))
+
+    def get_selected_face_mask(self, arrays):
+        if self.context.tool_settings.use_uv_select_sync:
+            return arrays.face_select
+        else:
+            return arrays.face_select & arrays.get_face_uv_select()
+
+    def get_visible_face_mask(self, arrays):
+        if self.context.tool_settings.use_uv_select_sync:
+            return ~arrays.face_hide
+        else:
+            return arrays.face_select
+
     def calc_island_bbox(self, island_idx):
+        if self.island_bboxes is None:
+            self.island_bboxes = self.calc_island_bboxes()
 
-        x_coords = []
-        y_coords = []
+        bbox_min, bbox_max = self.island_bboxes
+        return [Vector(bbox_min[island_idx]), Vector(bbox_max[island_idx])]
 
-        bm_idx = self.island_bm_map[island_idx]
-        bm = self.bms[bm_idx]
-        face_idx_offset = self.face_idx_offsets[bm_idx]
-        uv_layer = self.uv_layers[bm_idx]
+    def calc_island_bboxes(self):
+        island_cnt = len(self.uv_island_faces_list)
+        bbox_min = numpy.zeros((island_cnt, 2), dtype=numpy.float32)
+        bbox_max = numpy.zeros((island_cnt, 2), dtype=numpy.float32)
+
+        for bm_idx, arrays in enumerate(self.read_mesh_arrays()):
+            island_indices = [idx for idx in range(island_cnt) if self.island_bm_map[idx] == bm_idx]
+
+            if len(island_indices) == 0:
+                continue
+
+            loop_indices, island_loop_starts = self.get_island_loop_indices(bm_idx, arrays, island_indices)
+            island_uvs = arrays.uvs[loop_indices]
 
-        for face_idx in self.uv_island_faces_list[island_idx]:
-            orig_face_idx = face_idx - face_idx_offset
+            bbox_min[island_indices] = numpy.minimum.reduceat(island_uvs, island_loop_starts, axis=0)
+            bbox_max[island_indices] = numpy.maximum.reduceat(island_uvs, island_loop_starts, axis=0)
 
-            face = bm.faces[orig_face_idx]
-            for loop in face.loops:
-                x_coords.append(loop[uv_layer].uv[0])
-                y_coords.append(loop[uv_layer].uv[1])
+        return bbox_min, bbox_max
 
-        return [Vector((min(x_coords), min(y_coords))), Vector((max(x_coords), max(y_coords)))]
+    def get_island_loop_indices(self, bm_idx, arrays, island_indices):
+        # Loops of the given islands placed one island after another, together with the
+        # position of the first loop of every island for segmented reductions
+        island_faces_list = [self.uv_island_faces_list[idx] for idx in island_indices]
+        face_indices = numpy.concatenate(island_faces_list) - self.face_idx_offsets[bm_idx]
 
+        face_loop_totals = arrays.loop_total[face_indices]
+        loop_indices = get_loop_indices(arrays.loop_start[face_indices], face_loop_totals)
+
+        island_face_counts = numpy.array([len(island_faces) for island_faces in island_faces_list])
+        island_face_starts = numpy.cumsum(island_face_counts) - island_face_counts
+        island_loop_counts = numpy.add.reduceat(face_loop_totals, island_face_starts)
+
+        return loop_indices, numpy.cumsum(island_loop_counts) - island_loop_counts
 
     def set_islands(self, selected_count, islands):
         if selected_count > len(islands):
             raise RuntimeError('Unexpected output from the UVP process')
 
         self.uv_island_faces_list = islands
+        self.island_bboxes = None
 
         curr_bm_idx = 0
         for island_idx in range(selected_count):
@@ -278,32 +407,40 @@ class PackContext:
 
             self.island_bm_map[island_idx] = curr_bm_idx
 
-    def get_face_group(self, group_method, bm_idx, obj, face):
+    def get_face_groups(self, group_method, bm_idx, obj, arrays):
         if group_method == UvGroupingMethod.MATERIAL.code:
 
-            mat_idx = face.material_index
+            mat_indices = arrays.get_material_indices()
 
-            if not (mat_idx >= 0 and mat_idx < len(obj.material_slots)):
+            if len(mat_indices) > 0 and (mat_indices.min() < 0 or mat_indices.max() >= len(obj.material_slots)):
                 raise RuntimeError('Grouping by material error: invalid material id')
 
-            mat = obj.material_slots[mat_idx]
+            slot_groups = []
+            for mat in obj.material_slots:
+                if mat is None:
+                    slot_groups.append(-1)
+                else:
+                    slot_groups.append(self.material_map[mat.name])
 
-            if mat is None:
+            face_groups = numpy.array(slot_groups, dtype=numpy.int32)[mat_indices]
+
+            if numpy.any(face_groups < 0):
                 raise RuntimeError('Grouping by material error: some faces belong to an empty material slot')
 
-            return self.material_map[mat.name]
+            return face_groups
 
         elif group_method == UvGroupingMethod.MESH.code:
 
-            return self.mesh_map[bm_idx][face.index]
+            return self.mesh_map[bm_idx]
 
         elif group_method == UvGroupingMethod.OBJECT.code:
 
-            return bm_idx
+            return numpy.full(arrays.face_count, bm_idx, dtype=numpy.int32)
 
         elif group_method == UvGroupingMethod.MANUAL.code:
 
-            return GroupIslandParamInfo.vcolor_to_param(self.get_vcolor(self.manual_group_layers[bm_idx], face))
+            vcolors = arrays.get_loop_vcolors(self.manual_group_layers[bm_idx].name)
+            return GroupIslandParamInfo.vcolors_to_params(vcolors[arrays.loop_start])
 
         raise RuntimeError('Unexpected grouping method encountered')
 
@@ -337,8 +474,8 @@ class PackContext:
 
         for bm_idx in range(len(self.bms)):
 
-            mesh_map = dict()
             bm = self.bms[bm_idx]
+            mesh_map = numpy.empty(len(bm.faces), dtype=numpy.int32)
 
             faces_left = set(range(len(bm.faces)))
 
@@ -520,12 +657,9 @@ class PackContext:
         else:
             matrix_multiply = lambda a, b: a * b
 
-        for i_solution in pack_solution.island_solutions:
-            bm_idx = self.island_bm_map[i_solution.island_idx]
-            bm = self.bms[bm_idx]
-            uv_layer = self.uv_layers[bm_idx]
-            face_idx_offset = self.face_idx_offsets[bm_idx]
+        solutions_per_bm = [[] for bm in self.bms]
 
+        for i_solution in pack_solution.island_solutions:
             i_solution.post_scale_offset.x /= pack_ratio
             
             matrix = Matrix.Translation(i_solution.post_scale_offset)
@@ -539,15 +673,36 @@ class PackContext:
             matrix = matrix_multiply(matrix, Matrix.Scale(i_solution.pre_scale, 4, (1.0, 0.0, 0.0)))
             matrix = matrix_multiply(matrix, Matrix.Scale(pack_ratio, 4, (1.0, 0.0, 0.0)))
 
-            island_faces = self.uv_island_faces_list[i_solution.island_idx]
+            # UVs have no z coordinate, so only the 2D affine part of the matrix is needed
+            affine = ((matrix[0][0], matrix[0][1], matrix[0][3]),
+                      (matrix[1][0], matrix[1][1], matrix[1][3]))
 
-            for face_idx in island_faces:
-                orig_face_idx = face_idx - face_idx_offset
-                face = bm.faces[orig_face_idx]
-                for loop in face.loops:
-                    uv = loop[uv_layer].uv
-                    transformed_uv = matrix_multiply(matrix, Vector((uv[0], uv[1], 0.0)))
-                    loop[uv_layer].uv = (transformed_uv[0], transformed_uv[1])
+            bm_idx = self.island_bm_map[i_solution.island_idx]
+            solutions_per_bm[bm_idx].append((i_solution.island_idx, affine))
+
+        if len(pack_solution.island_solutions) == 0:
+            return
+
+        mesh_arrays = self.read_mesh_arrays()
+
+        for bm_idx, arrays in enumerate(mesh_arrays):
+            solutions = solutions_per_bm[bm_idx]
+
+            if len(solutions) == 0:
+                continue
+
+            island_indices = [island_idx for island_idx, affine in solutions]
+            affines = numpy.array([affine for island_idx, affine in solutions], dtype=numpy.float64)
+
+            loop_indices, island_loop_starts = self.get_island_loop_indices(bm_idx, arrays, island_indices)
+            island_loop_counts = numpy.diff(numpy.append(island_loop_starts, len(loop_indices)))
+            loop_affines = numpy.repeat(affines, island_loop_counts, axis=0)
+
+            uvs = arrays.uvs[loop_indices].astype(numpy.float64)
+            transformed_uvs = numpy.einsum('nij,nj->ni', loop_affines[:, :, :2], uvs) + loop_affines[:, :, 2]
+            arrays.uvs[loop_indices] = transformed_uvs
+
+        self.write_mesh_uvs(mesh_arrays)
 
     def get_or_create_vcolor_layer(self, bm, vcolor_chname, default_value):
         